@@ -0,0 +1,51 @@
+# benchmarks/bench_binary_reader.py
+"""
+Compare trimesh.load_mesh against the memory-mapped binary STL reader used
+by STLFileHandler, and check that both give the same signature.
+
+Run from the repository root:
+    python -m benchmarks.bench_binary_reader --files 50 --subdivisions 6
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_single_load import write_library
+from cadRedundancyAnalyzer.handlers.stl_handler import STLFileHandler
+
+
+def run(paths, handler):
+    """Extract every signature with a handler, returning (seconds, signatures)"""
+    start = time.perf_counter()
+    signatures = [handler.extract_geometry(path) for path in paths]
+    return time.perf_counter() - start, signatures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=50, help="Number of STL files to generate")
+    parser.add_argument("--subdivisions", type=int, default=6, help="Icosphere subdivisions (mesh size)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = write_library(Path(temp_dir), args.files, args.subdivisions)
+        megabytes = sum(os.path.getsize(path) for path in paths) / 1e6
+
+        trimesh_time, expected = run(paths, STLFileHandler(fast_binary=False))
+        reader_time, signatures = run(paths, STLFileHandler())
+
+    identical = sum(a == b for a, b in zip(expected, signatures))
+    print(f"Files:              {args.files} ({megabytes:.1f} MB)")
+    print(f"trimesh.load_mesh:  {trimesh_time:.3f}s ({megabytes / trimesh_time:.0f} MB/s)")
+    print(f"Binary reader:      {reader_time:.3f}s ({megabytes / reader_time:.0f} MB/s)")
+    print(f"Speedup:            {trimesh_time / reader_time:.2f}x")
+    print(f"Identical signatures: {identical}/{args.files}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_import_time.py
+"""
+Measure the startup cost of the analyzer: importing it, creating a
+ComponentAnalyzer, and then analyzing a first binary and a first ASCII STL
+file, each in a fresh interpreter. Also reports whether trimesh and scipy
+were imported by then, and the cost of importing trimesh on its own.
+
+Format handlers are imported from the handler registry when the first file
+of their type is parsed, and trimesh only when a file needs it (ASCII or
+malformed STL), so jobs that only read cached results or saved indexes
+never pay for it.
+
+Run from the repository root:
+    python -m benchmarks.bench_import_time --repeat 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each step runs after the previous ones in the same fresh interpreter
+STEPS = {
+    "import analyzer": "from cadRedundancyAnalyzer.core.analyzer import ComponentAnalyzer",
+    "create ComponentAnalyzer": "analyzer = ComponentAnalyzer()",
+    "analyze first binary STL": "analyzer.process_file(BINARY, ROOT)",
+    "analyze first ASCII STL": "analyzer.process_file(ASCII, ROOT)",
+}
+
+# Times each step and reports which heavy modules were loaded after it
+_SCRIPT = """
+import json, sys, time
+BINARY, ASCII, ROOT = {binary!r}, {ascii!r}, {root!r}
+timings = []
+for name, code in {steps!r}:
+    start = time.perf_counter()
+    exec(code)
+    timings.append([name, time.perf_counter() - start, 'trimesh' in sys.modules, 'scipy' in sys.modules])
+print(json.dumps(timings))
+"""
+
+
+def write_parts(directory: Path):
+    """A one-triangle binary STL and ASCII STL file"""
+    import numpy as np
+
+    from benchmarks.synthetic_library import write_binary_stl
+
+    binary = directory / "binary.stl"
+    write_binary_stl(binary, np.array([[[0, 0, 0], [1, 0, 0], [0, 1, 0]]], dtype=np.float64))
+    ascii_path = directory / "ascii.stl"
+    ascii_path.write_text("solid part\nfacet normal 0 0 1\nouter loop\nvertex 0 0 0\nvertex 1 0 0\n"
+                          "vertex 0 1 0\nendloop\nendfacet\nendsolid part\n")
+    return str(binary), str(ascii_path)
+
+
+def run_fresh(script: str) -> list:
+    """Run a script in a fresh interpreter and return its JSON output"""
+    output = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement; medians are shown")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        binary, ascii_path = write_parts(Path(temp_dir))
+        script = _SCRIPT.format(binary=binary, ascii=ascii_path, root=temp_dir, steps=list(STEPS.items()))
+        runs = [run_fresh(script) for _ in range(args.repeat)]
+
+    trimesh_script = _SCRIPT.format(binary="", ascii="", root="", steps=[("import trimesh", "import trimesh")])
+    trimesh_seconds = statistics.median(run_fresh(trimesh_script)[0][1] for _ in range(args.repeat))
+
+    total = 0.0
+    for index, name in enumerate(STEPS):
+        seconds = statistics.median(run[index][1] for run in runs)
+        total += seconds
+        _, _, trimesh_loaded, scipy_loaded = runs[0][index]
+        print(f"{name:<26} {seconds * 1000:8.1f} ms   (cumulative {total * 1000:7.1f} ms)   "
+              f"trimesh {'loaded' if trimesh_loaded else 'not loaded'}, "
+              f"scipy {'loaded' if scipy_loaded else 'not loaded'}")
+    print(f"{'import trimesh alone':<26} {trimesh_seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_similarity_engine.py
+"""
+Compare the scalar and vectorized similarity engines.
+
+Times the raw scoring step (one part against the whole library) and
+find_duplicates end to end on random signatures.
+
+Run from the repository root:
+    python -m benchmarks.bench_similarity_engine --parts 20000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.models import GeometricSignature
+from cadRedundancyAnalyzer.core.similarity import SimilarityDetector, WEIGHTS
+from cadRedundancyAnalyzer.core.vectorized import BatchScorer, SignatureStore
+
+
+def random_library(count: int, seed: int = 0):
+    """Random (filename, signature) pairs, roughly 8 near-copies per shape"""
+    rng = random.Random(seed)
+    bases = [(rng.uniform(1, 100), rng.uniform(1, 100), rng.uniform(1, 100)) for _ in range(max(1, count // 8))]
+    library = []
+    for i in range(count):
+        width, depth, height = (value * rng.uniform(0.98, 1.02) for value in rng.choice(bases))
+        library.append((f"part{i}.stl", GeometricSignature(
+            bounding_box=(0.0, 0.0, 0.0, width, depth, height),
+            volume=width * depth * height,
+            surface_area=2 * (width * depth + depth * height + width * height),
+            geometric_hash=f"h{i}"
+        )))
+    return library
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parts", type=int, default=20000, help="Number of random signatures")
+    parser.add_argument("--threshold", type=float, default=0.95, help="Similarity threshold")
+    args = parser.parse_args()
+
+    library = random_library(args.parts)
+    signatures = [sig for _, sig in library]
+    detector = SimilarityDetector()
+
+    # Scoring step: one part against the whole library
+    start = time.perf_counter()
+    for sig in signatures:
+        detector.calculate_similarity(signatures[0], sig)
+    scalar_time = time.perf_counter() - start
+
+    store = SignatureStore.from_signatures(signatures)
+    scorer = BatchScorer(WEIGHTS)
+    start = time.perf_counter()
+    scorer.score_one_vs_many(store, 0)
+    vector_time = time.perf_counter() - start
+
+    print(f"Parts:                         {args.parts}")
+    print(f"Scoring 1 vs N, scalar:        {scalar_time * 1000:.2f} ms")
+    print(f"Scoring 1 vs N, vectorized:    {vector_time * 1000:.2f} ms ({scalar_time / vector_time:.0f}x)")
+
+    # End to end grouping
+    for engine in ["scalar", "vectorized"]:
+        start = time.perf_counter()
+        groups = SimilarityDetector(engine=engine).find_duplicates(library, args.threshold)
+        print(f"find_duplicates, {engine:<10}    {time.perf_counter() - start:.2f} s, {len(groups)} groups")
+
+
+if __name__ == "__main__":
+    main()
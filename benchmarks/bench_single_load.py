@@ -0,0 +1,84 @@
+# benchmarks/bench_single_load.py
+"""
+Compare the legacy two-call extraction (get_metadata + extract_geometry)
+against the single-load STLFileHandler.analyze path.
+
+Run from the repository root:
+    python -m benchmarks.bench_single_load --files 200 --subdivisions 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import trimesh
+
+from cadRedundancyAnalyzer.handlers.stl_handler import STLFileHandler
+
+
+def write_library(target_dir: Path, count: int, subdivisions: int):
+    """Write `count` icospheres of varying radius as binary STL files"""
+    paths = []
+    for i in range(count):
+        sphere = trimesh.creation.icosphere(subdivisions=subdivisions, radius=1.0 + i * 0.01)
+        path = target_dir / f"part_{i:05d}.stl"
+        sphere.export(str(path))
+        paths.append(str(path))
+    return paths
+
+
+def run(paths, extract):
+    """Run an extraction function over all paths, returning (seconds, parse count)"""
+    parses = []
+    original_load = trimesh.load_mesh
+
+    def counting_load(*args, **kwargs):
+        parses.append(args[0])
+        return original_load(*args, **kwargs)
+
+    trimesh.load_mesh = counting_load
+    try:
+        start = time.perf_counter()
+        for path in paths:
+            extract(path)
+        elapsed = time.perf_counter() - start
+    finally:
+        trimesh.load_mesh = original_load
+
+    return elapsed, len(parses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200, help="Number of STL files to generate")
+    parser.add_argument("--subdivisions", type=int, default=4, help="Icosphere subdivisions (mesh size)")
+    args = parser.parse_args()
+
+    # Trimesh path on both sides: this measures parse count, not the binary reader
+    handler = STLFileHandler(fast_binary=False)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = write_library(Path(temp_dir), args.files, args.subdivisions)
+
+        def legacy(path):
+            handler.get_metadata(path, "Bench")
+            handler.extract_geometry(path)
+
+        def single_load(path):
+            handler.analyze(path, "Bench")
+
+        legacy_time, legacy_parses = run(paths, legacy)
+        single_time, single_parses = run(paths, single_load)
+
+    print(f"Files:              {args.files}")
+    print(f"Legacy path:        {legacy_time:.3f}s, {legacy_parses} parses")
+    print(f"Single-load path:   {single_time:.3f}s, {single_parses} parses")
+    print(f"Speedup:            {legacy_time / single_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# benchmarks/bench_suite.py
+"""
+Benchmark the scan and match hot paths on synthetic libraries and guard
+against regressions.
+
+For each library size a synthetic STL library is generated (see
+benchmarks.synthetic_library) and measured in a fresh process: discovery,
+scan_directory (discovery and parsing), find_duplicates, peak resident
+memory, and how many exact, near and rotated copies ended up grouped with
+their original. With --repeat the best of several runs is kept, which
+steadies the small sizes. Results can be saved as a JSON baseline; a later run
+against that baseline flags every time or memory figure more than
+--tolerance above it (ignoring changes of a few milliseconds or
+megabytes), and every recall below it, and exits with status 1.
+
+Run from the repository root:
+    python -m benchmarks.bench_suite --sizes 1000 10000 100000 --save-baseline baseline.json
+    python -m benchmarks.bench_suite --sizes 1000 10000 100000 --baseline baseline.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_library import generate_library, load_manifest
+from cadRedundancyAnalyzer.core.analyzer import ComponentAnalyzer
+from cadRedundancyAnalyzer.discovery.filesystem import FileSystemCrawler
+
+BASELINE_VERSION = 1
+
+# Figures where higher is worse, compared with --tolerance, and the absolute
+# growth below which a change is noise whatever the percentage
+COST_FIGURES = {"discover_seconds": 0.05, "scan_seconds": 0.05, "find_duplicates_seconds": 0.05,
+                "peak_rss_mb": 5.0}
+# Figures where lower is worse, compared exactly
+QUALITY_FIGURES = ("recall_exact", "recall_near", "recall_rotated")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident memory of this process, where the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def recall(manifest: dict, root: str, groups: List[List[str]]) -> Dict[str, float]:
+    """Share of the copies of each kind that were grouped with their family's original"""
+    group_of = {}
+    for number, group in enumerate(groups):
+        for path in group:
+            group_of[Path(path).relative_to(root).as_posix()] = number
+
+    originals = {family: path for path, kind, family in manifest['files'] if kind == "original"}
+    found: Dict[str, List[int]] = {}
+    for path, kind, family in manifest['files']:
+        if kind == "original":
+            continue
+        group = group_of.get(path)
+        found.setdefault(kind, []).append(group is not None and group == group_of.get(originals[family]))
+    return {f'recall_{kind}': sum(hits) / len(hits) for kind, hits in sorted(found.items())}
+
+
+def measure(root: str, workers: int, threshold: float, descriptors: bool) -> dict:
+    """Time discovery, scanning and matching of one library in this process"""
+    start = time.perf_counter()
+    files = sum(1 for _ in FileSystemCrawler().iter_entries(root))
+    discover_seconds = time.perf_counter() - start
+
+    analyzer = ComponentAnalyzer(descriptors=descriptors)
+    start = time.perf_counter()
+    analyzer.scan_directory(root, workers=workers)
+    scan_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    groups = analyzer.find_duplicates(threshold)
+    find_duplicates_seconds = time.perf_counter() - start
+
+    result = {
+        'files': files,
+        'errors': len(analyzer.errors),
+        'groups': len(groups),
+        'discover_seconds': discover_seconds,
+        'scan_seconds': scan_seconds,
+        'files_per_second': files / scan_seconds if scan_seconds else 0.0,
+        'find_duplicates_seconds': find_duplicates_seconds,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    result.update(recall(load_manifest(root), root, groups))
+    return result
+
+
+def _measure_into(results, *args):
+    results.put(measure(*args))
+
+
+def measure_isolated(root: str, workers: int, threshold: float, descriptors: bool) -> dict:
+    """measure() in a fresh process, so peak memory and warm caches do not carry over between sizes"""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_measure_into, args=(results, root, workers, threshold, descriptors))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def best_of(repeat: int, root: str, workers: int, threshold: float, descriptors: bool) -> dict:
+    """measure_isolated() repeated, keeping the lowest of each time and memory figure"""
+    best = measure_isolated(root, workers, threshold, descriptors)
+    for _ in range(repeat - 1):
+        result = measure_isolated(root, workers, threshold, descriptors)
+        for figure in COST_FIGURES:
+            if result[figure] is not None:
+                best[figure] = min(best[figure], result[figure])
+    best['files_per_second'] = best['files'] / best['scan_seconds'] if best['scan_seconds'] else 0.0
+    return best
+
+
+def library_for(size: int, seed: int, library_dir: Optional[str], temp_dir: str) -> str:
+    """Root of a generated library of `size` parts, reusing one in library_dir when it matches"""
+    root = os.path.join(library_dir or temp_dir, f"parts_{size}_seed_{seed}")
+    manifest = load_manifest(root)
+    if manifest is None or manifest['parts'] != size or manifest['seed'] != seed:
+        generate_library(root, size, seed)
+    return root
+
+
+def regressions(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Descriptions of every figure that got worse than the baseline"""
+    found = []
+    for size, result in results.items():
+        reference = baseline.get(size)
+        if reference is None:
+            continue
+        for figure, noise in COST_FIGURES.items():
+            current, previous = result.get(figure), reference.get(figure)
+            if current is not None and previous and current - previous > max(previous * tolerance, noise):
+                found.append(f"{size} parts: {figure} {current:.3f} vs baseline {previous:.3f} "
+                             f"(+{(current / previous - 1) * 100:.0f}%)")
+        for figure in QUALITY_FIGURES:
+            current, previous = result.get(figure), reference.get(figure)
+            if current is not None and previous is not None and current < previous:
+                found.append(f"{size} parts: {figure} {current:.3f} vs baseline {previous:.3f}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Library sizes")
+    parser.add_argument("--seed", type=int, default=0, help="Library generator seed")
+    parser.add_argument("--workers", type=int, default=1, help="scan_directory worker processes")
+    parser.add_argument("--threshold", type=float, default=0.95, help="Similarity threshold")
+    parser.add_argument("--descriptors", action="store_true", help="Compute and match on shape descriptors")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per size; the best figures are kept")
+    parser.add_argument("--library-dir", help="Keep generated libraries here and reuse them on later runs")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write the results as a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown or memory growth over the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in args.sizes:
+            root = library_for(size, args.seed, args.library_dir, temp_dir)
+            result = best_of(args.repeat, root, args.workers, args.threshold, args.descriptors)
+            results[str(size)] = result
+            peak = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else "n/a"
+            print(f"{size:>7} parts: discover {result['discover_seconds']:.2f}s, "
+                  f"scan {result['scan_seconds']:.2f}s ({result['files_per_second']:.0f} files/s), "
+                  f"find_duplicates {result['find_duplicates_seconds']:.2f}s, peak {peak}, "
+                  f"{result['groups']} groups, recall exact {result.get('recall_exact', 0):.2f} "
+                  f"near {result.get('recall_near', 0):.2f} rotated {result.get('recall_rotated', 0):.2f}")
+
+    settings = {'seed': args.seed, 'workers': args.workers, 'threshold': args.threshold,
+                'descriptors': args.descriptors}
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'version': BASELINE_VERSION, 'settings': settings, 'python': platform.python_version(),
+                       'machine': platform.machine(), 'results': results}, f, indent=2)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('version') != BASELINE_VERSION:
+            sys.exit(f"Unsupported baseline version in {args.baseline}")
+        if baseline.get('settings') != settings:
+            print(f"Warning: baseline settings {baseline.get('settings')} differ from {settings}")
+        found = regressions(results, baseline['results'], args.tolerance)
+        for regression in found:
+            print(f"REGRESSION {regression}")
+        if found:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# benchmarks/synthetic_library.py
+"""
+Generate a synthetic STL library with known duplicates.
+
+Parts are trimesh primitives (boxes, cylinders, cones, capsules and
+spheres) of random size, laid out as <root>/Project_NNN/Assembly_NN/part_NNNNNN.stl
+so the first directory under the root is the project. A controlled share of
+the parts are copies of an earlier part:
+
+    exact    byte-identical copy of the part's file
+    near     the part scaled by up to +-1% per axis, or with its vertices
+             perturbed by up to 0.1% of its size
+    rotated  the part rotated and moved at random (matches on shape
+             descriptors, not on axis-aligned bounding boxes)
+
+Every part belongs to a family (the original and its copies); manifest.json
+in the root lists each file's kind and family. The same seed and rates
+always give the same library.
+
+Run from the repository root:
+    python -m benchmarks.synthetic_library /tmp/library --parts 10000
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import trimesh
+
+from cadRedundancyAnalyzer.handlers.stl_reader import HEADER_SIZE, TRIANGLE_DTYPE
+
+MANIFEST = "manifest.json"
+SHAPES = ("box", "cylinder", "cone", "capsule", "sphere")
+
+
+class LibraryPart(NamedTuple):
+    path: str  # relative to the library root, '/'-separated
+    kind: str  # "original", "exact", "near" or "rotated"
+    family: int  # index of the original part
+
+
+def family_mesh(seed: int, family: int) -> trimesh.Trimesh:
+    """The original mesh of a family, rebuilt from the seed so copies never need it kept"""
+    rng = np.random.default_rng([seed, family])
+    shape = SHAPES[rng.integers(len(SHAPES))]
+    width, depth, height = rng.uniform(2.0, 100.0, 3)
+    if shape == "box":
+        return trimesh.creation.box(extents=(width, depth, height))
+    if shape == "cylinder":
+        return trimesh.creation.cylinder(radius=width / 2, height=height, sections=24)
+    if shape == "cone":
+        return trimesh.creation.cone(radius=width / 2, height=height, sections=24)
+    if shape == "capsule":
+        return trimesh.creation.capsule(height=height, radius=width / 4, count=[12, 12])
+    sphere = trimesh.creation.icosphere(subdivisions=2, radius=1.0)
+    sphere.apply_scale((width / 2, depth / 2, height / 2))
+    return sphere
+
+
+def random_rotation(rng: np.random.Generator) -> np.ndarray:
+    """A uniformly random 3x3 rotation matrix"""
+    q, r = np.linalg.qr(rng.normal(size=(3, 3)))
+    q = q * np.sign(np.diag(r))
+    if np.linalg.det(q) < 0:
+        q[:, 0] = -q[:, 0]
+    return q
+
+
+def copy_triangles(mesh: trimesh.Trimesh, kind: str, rng: np.random.Generator) -> np.ndarray:
+    """Triangles of a near or rotated copy of a mesh"""
+    vertices = np.array(mesh.vertices)
+    if kind == "near":
+        if rng.random() < 0.5:
+            vertices = vertices * rng.uniform(0.99, 1.01, 3)
+        else:
+            size = np.ptp(vertices, axis=0).max()
+            vertices = vertices + rng.uniform(-0.001, 0.001, vertices.shape) * size
+    elif kind == "rotated":
+        vertices = vertices @ random_rotation(rng).T + rng.uniform(-100.0, 100.0, 3)
+    return vertices[mesh.faces]
+
+
+def write_binary_stl(path: Path, triangles: np.ndarray):
+    """Write (n, 3, 3) triangle vertices as a binary STL file"""
+    records = np.zeros(len(triangles), dtype=TRIANGLE_DTYPE)
+    records['vertices'] = triangles
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    records['normal'] = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    with open(path, 'wb') as f:
+        f.write(b'synthetic library part'.ljust(HEADER_SIZE - 4, b' '))
+        f.write(np.uint32(len(triangles)).tobytes())
+        f.write(records.tobytes())
+
+
+def generate_library(root: str, parts: int, seed: int = 0, exact_rate: float = 0.1, near_rate: float = 0.1,
+                     rotated_rate: float = 0.05, projects: int = 20, assemblies: int = 10) -> List[LibraryPart]:
+    """
+    Write a synthetic library under root and its manifest.
+
+    Args:
+        root: Directory to write into (created if missing)
+        parts: Number of STL files
+        seed: Random seed; the same arguments always give the same files
+        exact_rate, near_rate, rotated_rate: Share of the parts that are
+            exact, near and rotated copies of an earlier part
+        projects: Number of project directories under the root
+        assemblies: Number of assembly directories per project
+
+    Returns:
+        The parts, in file order
+    """
+    rng = np.random.default_rng(seed)
+    root_path = Path(root)
+    library: List[LibraryPart] = []
+    originals: List[int] = []  # part index of each family's original
+
+    for index in range(parts):
+        draw = rng.random()
+        kind = "original"
+        if originals:
+            if draw < exact_rate:
+                kind = "exact"
+            elif draw < exact_rate + near_rate:
+                kind = "near"
+            elif draw < exact_rate + near_rate + rotated_rate:
+                kind = "rotated"
+
+        project = rng.integers(projects)
+        relative = f"Project_{project:03d}/Assembly_{rng.integers(assemblies):02d}/part_{index:06d}.stl"
+        path = root_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if kind == "original":
+            family = len(originals)
+            originals.append(index)
+            write_binary_stl(path, np.asarray(family_mesh(seed, family).triangles))
+        else:
+            family = int(rng.integers(len(originals)))
+            if kind == "exact":
+                path.write_bytes((root_path / library[originals[family]].path).read_bytes())
+            else:
+                write_binary_stl(path, copy_triangles(family_mesh(seed, family), kind, rng))
+        library.append(LibraryPart(relative, kind, family))
+
+    manifest = {
+        'seed': seed, 'parts': parts,
+        'rates': {'exact': exact_rate, 'near': near_rate, 'rotated': rotated_rate},
+        'files': [list(part) for part in library],
+    }
+    with open(root_path / MANIFEST, 'w') as f:
+        json.dump(manifest, f)
+    return library
+
+
+def load_manifest(root: str) -> Optional[dict]:
+    """The manifest of a generated library, or None if there is none"""
+    path = Path(root) / MANIFEST
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="Directory to write the library into")
+    parser.add_argument("--parts", type=int, default=1000, help="Number of STL files")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--exact-rate", type=float, default=0.1, help="Share of exact copies")
+    parser.add_argument("--near-rate", type=float, default=0.1, help="Share of near-duplicates")
+    parser.add_argument("--rotated-rate", type=float, default=0.05, help="Share of rotated copies")
+    args = parser.parse_args()
+
+    library = generate_library(args.root, args.parts, args.seed, args.exact_rate, args.near_rate,
+                               args.rotated_rate)
+    kinds = {}
+    for part in library:
+        kinds[part.kind] = kinds.get(part.kind, 0) + 1
+    print(f"Wrote {len(library)} parts to {args.root}: " +
+          ", ".join(f"{count} {kind}" for kind, count in sorted(kinds.items())))
+
+
+if __name__ == "__main__":
+    main()
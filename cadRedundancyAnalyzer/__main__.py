@@ -0,0 +1,6 @@
+# cadRedundancyAnalyzer/__main__.py
+import sys
+
+from cadRedundancyAnalyzer.cli import main
+
+sys.exit(main())
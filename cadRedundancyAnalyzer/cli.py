@@ -0,0 +1,179 @@
+# cadRedundancyAnalyzer/cli.py
+"""
+Command-line interface: cad-redundancy scan / match / query.
+
+    python -m cadRedundancyAnalyzer scan C:/Projects/CAD_Library --workers 8 --index library-index
+    python -m cadRedundancyAnalyzer scan //server/cad --listing-threads 16 --readers 8 --index library-index
+    python -m cadRedundancyAnalyzer match --index library-index --threshold 0.95 > groups.jsonl
+    python -m cadRedundancyAnalyzer query new/bracket.stl --index library-index -k 5
+
+Only what a command needs is imported: format handlers (and trimesh behind
+them) load when the first file of their type is parsed, so commands that
+work from a saved index never import them. Duplicate groups are written as
+they are found, one JSON line per group or one CSV row per member.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import ExitStack
+from typing import IO, Iterable, List, Optional, Tuple
+
+from cadRedundancyAnalyzer.core.analyzer import ComponentAnalyzer
+from cadRedundancyAnalyzer.core.cache import SignatureCache
+from cadRedundancyAnalyzer.core.grouping import GroupSummary
+
+PROG = 'cad-redundancy'
+FORMATS = ('jsonl', 'csv')
+
+GROUP_CSV_HEADER = ('group', 'path', 'representative', 'min_similarity', 'max_similarity')
+MATCH_CSV_HEADER = ('path', 'score')
+
+
+def write_groups(groups: Iterable[GroupSummary], stream: IO[str], output_format: str = 'jsonl') -> int:
+    """
+    Write duplicate groups to a stream as they come, and return how many were written.
+
+    "jsonl" writes one JSON object per group (group number, size,
+    representative, lowest and highest match score, members); "csv" writes
+    a header and then one row per member, so groups can be flattened into
+    spreadsheets and databases.
+    """
+    writer = csv.writer(stream) if output_format == 'csv' else None
+    if writer is not None:
+        writer.writerow(GROUP_CSV_HEADER)
+
+    written = 0
+    for written, group in enumerate(groups, 1):
+        if writer is not None:
+            for path in group.members:
+                writer.writerow((written, path, group.representative,
+                                 group.min_similarity, group.max_similarity))
+        else:
+            stream.write(json.dumps({
+                'group': written,
+                'size': len(group.members),
+                'representative': group.representative,
+                'min_similarity': group.min_similarity,
+                'max_similarity': group.max_similarity,
+                'members': group.members,
+            }) + '\n')
+    return written
+
+
+def write_matches(matches: List[Tuple[str, float]], stream: IO[str], output_format: str = 'jsonl'):
+    """Write (path, score) query matches, best first, one JSON line or CSV row each"""
+    if output_format == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(MATCH_CSV_HEADER)
+        writer.writerows(matches)
+    else:
+        for path, score in matches:
+            stream.write(json.dumps({'path': path, 'score': score}) + '\n')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=PROG, description="Find duplicate and similar parts in CAD libraries.")
+    commands = parser.add_subparsers(dest='command', required=True, metavar='COMMAND')
+
+    # Where the parts come from: a directory to scan, or a saved index
+    source = argparse.ArgumentParser(add_help=False)
+    source.add_argument('--workers', type=int, default=1,
+                        help="Worker processes for parsing and for scoring pairs (default: 1)")
+    source.add_argument('--readers', type=int, default=0,
+                        help="Threads reading files ahead of parsing, for network shares (default: 0)")
+    source.add_argument('--listing-threads', type=int, default=1,
+                        help="Directory listings in flight while crawling, for network shares (default: 1)")
+    source.add_argument('--cache', metavar='DB', help="SQLite signature cache; unchanged files are not parsed again")
+    source.add_argument('--descriptors', action='store_true',
+                        help="Compute and match on pose-invariant shape descriptors")
+    source.add_argument('--dedup', action='store_true', help="Parse only the first of each set of identical files")
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument('--format', choices=FORMATS, default='jsonl', help="Output format (default: jsonl)")
+    output.add_argument('--output', '-o', metavar='PATH', help="Write to a file instead of standard output")
+
+    scan = commands.add_parser('scan', parents=[source], help="Scan a directory and save its analysis as an index",
+                               description="Scan a directory of CAD files and save the analysis as an index.")
+    scan.add_argument('root', help="Directory to scan")
+    scan.add_argument('--index', metavar='DIR', help="Save the analyzed parts as an index directory")
+    scan.add_argument('--journal', metavar='PATH', help="Checkpoint progress to a journal database")
+    scan.add_argument('--resume', action='store_true', help="Resume the scan checkpointed in --journal")
+
+    match = commands.add_parser('match', parents=[source, output], help="Write duplicate groups as they are found",
+                                description="Find duplicate groups in a directory or a saved index and write "
+                                            "each group as soon as it is found.")
+    match.add_argument('root', nargs='?', help="Directory to scan (or use --index)")
+    match.add_argument('--index', metavar='DIR', help="Match the parts of a saved index instead of scanning")
+    match.add_argument('--threshold', type=float, default=0.95, help="Similarity threshold, 0-1 (default: 0.95)")
+
+    query = commands.add_parser('query', parents=[source, output], help="List the parts most similar to one file",
+                                description="List the stored parts most similar to one CAD file, best first.")
+    query.add_argument('file', help="CAD file to look up")
+    query.add_argument('root', nargs='?', help="Directory to scan (or use --index)")
+    query.add_argument('--index', metavar='DIR', help="Query a saved index instead of scanning")
+    query.add_argument('-k', type=int, default=10, help="Most matches to list (default: 10)")
+    query.add_argument('--threshold', type=float, default=0.0, help="Minimum similarity score, 0-1 (default: 0)")
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the command line; returns the exit status"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command != 'scan' and (args.root is None) == (args.index is None):
+        parser.error(f"{args.command}: give either a directory to scan or --index")
+    if args.command == 'scan' and args.resume and not args.journal:
+        parser.error("scan: --resume needs --journal")
+
+    logging.basicConfig(format=f"{PROG}: %(levelname)s: %(message)s", level=logging.WARNING)
+    try:
+        with ExitStack() as stack:
+            analyzer = _load(args, stack)
+            if args.command == 'scan':
+                if args.index:
+                    analyzer.save_index(args.index)
+                    print(f"Index saved to {args.index}", file=sys.stderr)
+                return 0
+
+            stream = open(args.output, 'w', newline='') if args.output else sys.stdout
+            if args.output:
+                stack.enter_context(stream)
+            if args.command == 'match':
+                start = time.perf_counter()
+                count = write_groups(analyzer.iter_duplicates(args.threshold), stream, args.format)
+                print(f"{count} duplicate groups in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+            else:
+                write_matches(analyzer.query_similar(args.file, args.k, args.threshold), stream, args.format)
+            stream.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError) as e:
+        print(f"{PROG}: error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _load(args: argparse.Namespace, stack: ExitStack) -> ComponentAnalyzer:
+    """Analyzer holding the parts of args.index, or of a scan of args.root"""
+    cache = stack.enter_context(SignatureCache(args.cache)) if args.cache else None
+    analyzer = ComponentAnalyzer(cache=cache, descriptors=args.descriptors)
+    analyzer.similarity_detector.workers = args.workers
+
+    if args.command != 'scan' and args.index:
+        analyzer.load_index(args.index)
+        return analyzer
+
+    start = time.perf_counter()
+    analyzer.scan_directory(args.root, workers=args.workers, readers=args.readers, dedup_content=args.dedup,
+                            journal=getattr(args, 'journal', None), resume=getattr(args, 'resume', False),
+                            listing_threads=args.listing_threads)
+    print(f"Scanned {len(analyzer.table)} parts ({len(analyzer.errors)} errors) "
+          f"in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return analyzer
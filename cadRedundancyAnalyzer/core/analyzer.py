@@ -1,22 +1,88 @@
 # cadRedundancyAnalyzer/core/analyzer.py
-from typing import List, Dict
+import logging
+import os
+import time
+from dataclasses import replace
 from pathlib import Path
+from typing import List, Dict, Iterator, Optional, Set, Tuple, Union
 
+import numpy as np
+
+from cadRedundancyAnalyzer.core.cache import SignatureCache
+from cadRedundancyAnalyzer.core.grouping import GroupSummary
+from cadRedundancyAnalyzer.core.incremental import IncrementalDuplicateIndex
+from cadRedundancyAnalyzer.core.ingest import ContentIndex
+from cadRedundancyAnalyzer.core.journal import ScanJournal
+from cadRedundancyAnalyzer.core.metrics import RunMetrics, timed
 from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature
-from cadRedundancyAnalyzer.core.similarity import SimilarityDetector
-from cadRedundancyAnalyzer.handlers.stl_handler import STLFileHandler
-from cadRedundancyAnalyzer.discovery.filesystem import FileSystemCrawler
+from cadRedundancyAnalyzer.core.parallel import (
+    DEFAULT_MAX_INFLIGHT_BYTES, analyze_cad_file, analyze_files_parallel, analyze_files_pipelined
+)
+from cadRedundancyAnalyzer.core.query import SimilarityIndex
+from cadRedundancyAnalyzer.core.similarity import WEIGHTS, SimilarityDetector
+from cadRedundancyAnalyzer.core.table import ComponentList, ComponentTable, SignatureMapping
+from cadRedundancyAnalyzer.core.vectorized import BatchScorer
+from cadRedundancyAnalyzer.handlers.registry import HandlerRegistry, RegistryHandler
+from cadRedundancyAnalyzer.discovery.filesystem import FileEntry, FileSystemCrawler
+
+logger = logging.getLogger(__name__)
 
 
 class ComponentAnalyzer:
     """Main class for analyzing CAD components and finding duplicates"""
 
-    def __init__(self):
-        self.components: List[ComponentMetadata] = []
-        self.geometric_signatures: Dict[str, GeometricSignature] = {}
-        self.handler = STLFileHandler()
-        self.similarity_detector = SimilarityDetector()
-        self.crawler = FileSystemCrawler()
+    def __init__(self, cache: Optional[SignatureCache] = None, descriptors: bool = False,
+                 metrics: Optional[RunMetrics] = None, registry: Optional[HandlerRegistry] = None):
+        """
+        Args:
+            cache: Optional persistent SignatureCache consulted before parsing a
+                file; files whose path, size and mtime are cached are not parsed
+            descriptors: Compute pose-invariant shape descriptors for every part
+                and let the similarity detector score on them, so rotated or
+                moved copies of a part still match
+            metrics: Optional RunMetrics shared with the crawler, handler and
+                similarity detector. Scans add per-file times, file, byte,
+                error and cache counters; its report is published at the end
+                of every scan_directory() and find_duplicates()
+            registry: HandlerRegistry of the formats to discover and parse
+                (default: the built-in and installed handlers). Each format's
+                handler is imported when the first file of its type is
+                parsed, and created with `descriptors` and `metrics`
+        """
+        self.table = ComponentTable()
+        self.errors: List[Tuple[str, str]] = []  # (file_path, error message)
+        self.metrics = metrics
+        self.handler = RegistryHandler(registry, descriptors=descriptors, metrics=metrics)
+        self.similarity_detector = SimilarityDetector(use_descriptors=descriptors, metrics=metrics)
+        self.crawler = FileSystemCrawler(supported_extensions=self.handler.registry.extensions(), metrics=metrics)
+        self.cache = cache
+        self.incremental: Optional[IncrementalDuplicateIndex] = None
+        self.identical_files: List[List[str]] = []  # byte-identical groups of the last deduplicating scan
+        self._content: Optional[ContentIndex] = None  # set during a deduplicating scan
+        self._journal: Optional[ScanJournal] = None  # set during a journaled scan
+        # (table version, index, table row of each index position)
+        self._query_index: Optional[Tuple[int, SimilarityIndex, np.ndarray]] = None
+
+    @property
+    def components(self) -> ComponentList:
+        """
+        Metadata of the processed components, as a list-like view of the table.
+
+        append() updates a component's metadata, or holds a new one until
+        its signature is set in geometric_signatures.
+        """
+        return ComponentList(self.table, self._store)
+
+    @property
+    def geometric_signatures(self) -> SignatureMapping:
+        """
+        Signatures of the processed components by file path, as a dict-like view of the table.
+
+        Assigning a signature adds or updates a component and deleting one
+        removes it, keeping incremental groups current like process_file()
+        and remove_component().
+        """
+        return SignatureMapping(self.table, self._store, self.remove_component)
 
     def process_file(self, file_path: str, root_path: str):
         """
@@ -26,20 +92,186 @@ class ComponentAnalyzer:
             file_path: Full path to the CAD file
             root_path: Root directory being scanned (for project extraction)
         """
-        if not self.handler.can_handle(file_path):
-            raise ValueError(f"Handler cannot process file: {file_path}")
+        self._process(file_path, root_path)
+
+    def _scan_file(self, entry: FileEntry, root_path: str):
+        """Process a discovered file, journaling it, or restore it if a resumed scan completed it"""
+        restored = self._journal_lookup(entry)
+        if restored is not None:
+            self._store(entry.path, *restored)
+            return
+
+        metadata, signature = self._process(entry.path, root_path, entry)
+        if self._journal is not None:
+            self._journal.record(entry, metadata, signature)
+
+    def _journal_lookup(self, entry: FileEntry) -> Optional[Tuple[ComponentMetadata, GeometricSignature]]:
+        """Analysis of a file completed by an earlier run of a resumed scan"""
+        if self._journal is None:
+            return None
+        restored = self._journal.completed(entry, require_descriptor=getattr(self.handler, 'descriptors', False))
+        if restored is not None:
+            if self._content is not None:
+                self._content.add(entry)
+            if self.metrics is not None:
+                self.metrics.count('files_resumed')
+        return restored
+
+    def _process(self, file_path: str, root_path: str,
+                 entry: Optional[FileEntry] = None) -> Tuple[ComponentMetadata, GeometricSignature]:
+        """Process a file, reusing the crawler's stat data when available"""
+        if self.cache is None:
+            # Get metadata and geometric signature from a single parse
+            metadata, signature = self._analyze(file_path, root_path, entry)
+        else:
+            if entry is None:
+                stat = os.stat(file_path)
+                entry = FileEntry(file_path, stat.st_size, stat.st_mtime_ns)
+            metadata, signature = self._analyze_cached(entry, root_path)
+
+        self._store(file_path, metadata, signature)
+        return metadata, signature
+
+    def _analyze_cached(self, entry: FileEntry, root_path: str) -> Tuple[ComponentMetadata, GeometricSignature]:
+        """Analyze a file through the cache, parsing and caching it on a miss"""
+        cached = self._cache_lookup(entry, root_path)
+        if cached is not None:
+            if self._content is not None:
+                self._content.add(entry)
+            return cached
+
+        metadata, signature = self._analyze(entry.path, root_path, entry)
+        self.cache.put(entry.path, entry.size, entry.mtime_ns, metadata, signature)
+        return metadata, signature
+
+    def _analyze(self, file_path: str, root_path: str,
+                 entry: Optional[FileEntry]) -> Tuple[ComponentMetadata, GeometricSignature]:
+        """Parse a file, or copy the analysis of a byte-identical file seen earlier in the scan"""
+        if self._content is not None and entry is not None:
+            original = self._content_original(entry)
+            if original is not None:
+                return self._copy_analysis(original, file_path, root_path)
+            self._content.add(entry)
+        return analyze_cad_file(self.handler, self.crawler, file_path, root_path)
+
+    def _content_original(self, entry: FileEntry) -> Optional[str]:
+        """Earlier file of the scan with the same bytes as entry, counting the lookup in the metrics"""
+        with timed(self.metrics, 'content_hash'):
+            original = self._content.original_of(entry)
+        if original is not None and self.metrics is not None:
+            self.metrics.count('content_copies')
+        return original
+
+    def _copy_analysis(self, original: str, file_path: str,
+                       root_path: str) -> Tuple[ComponentMetadata, GeometricSignature]:
+        """The stored analysis of an identical file, with this file's own path, name and project"""
+        row = self.table.row_of(original)
+        if row is None:
+            raise ValueError(f"Same content as {original}, which could not be analyzed")
+        metadata = replace(self.table.metadata(row), file_path=file_path, file_name=Path(file_path).name,
+                           project_id=self.crawler.extract_project_info(Path(file_path), root_path))
+        return metadata, self.table.signature(row)
+
+    def _cache_lookup(self, entry: FileEntry,
+                      root_path: str) -> Optional[Tuple[ComponentMetadata, GeometricSignature]]:
+        """Cached analysis of a file, with the project of the current scan root"""
+        cached = self.cache.get(entry.path, entry.size, entry.mtime_ns,
+                                require_descriptor=getattr(self.handler, 'descriptors', False))
+        if self.metrics is not None:
+            self.metrics.count('cache_hits' if cached is not None else 'cache_misses')
+        if cached is None:
+            return None
+
+        # The project depends on the scan root, not on the file
+        metadata, signature = cached
+        project_id = self.crawler.extract_project_info(Path(entry.path), root_path)
+        if metadata.project_id != project_id:
+            metadata = replace(metadata, project_id=project_id)
+        return metadata, signature
+
+    def _store(self, file_path: str, metadata: ComponentMetadata, signature: GeometricSignature):
+        """Add an analyzed component to the analyzer"""
+        self.table.add(file_path, metadata, signature)
+        if self.incremental is not None:
+            self.incremental.add(file_path, signature)
+
+    def enable_incremental(self, threshold: float = 0.95):
+        """
+        Keep duplicate groups up to date as components are added and removed.
+
+        Builds an IncrementalDuplicateIndex over the components processed so
+        far. From then on every processed file is matched against the index
+        on arrival, and duplicate_groups() returns the current groups without
+        a full regroup. Incremental groups are connected components of the
+        matches, so they can differ from the greedy find_duplicates groups
+        when similarity is not transitive.
+
+        Args:
+            threshold: Similarity threshold (0.0-1.0) of the maintained groups
+        """
+        self.incremental = IncrementalDuplicateIndex(self.similarity_detector, threshold)
+        for row in self.table.rows().tolist():
+            self.incremental.add(self.table.path(row), self.table.signature(row))
+
+    def add_component(self, file_path: str, root_path: str) -> List[str]:
+        """
+        Process a new CAD file in incremental mode.
+
+        Args:
+            file_path: Full path to the CAD file
+            root_path: Root directory of the library (for project extraction)
+
+        Returns:
+            The duplicate group the new component joined (empty if none),
+            suitable for raising a duplicate alert
+        """
+        self._require_incremental()
+        self.process_file(file_path, root_path)
+        return self.incremental.group(file_path)
+
+    def remove_component(self, file_path: str):
+        """
+        Remove a component, e.g. when its file was deleted.
 
-        # Extract project info from path
-        path = Path(file_path)
-        project_id = self.crawler.extract_project_info(path, root_path)
+        Args:
+            file_path: Full path the component was processed under
+        """
+        if file_path not in self.table:
+            raise KeyError(f"Unknown component: {file_path}")
+
+        self.table.remove(file_path)
+        if self.incremental is not None:
+            self.incremental.remove(file_path)
 
-        # Get metadata and geometric signature
-        metadata = self.handler.get_metadata(file_path, project_id)
-        signature = self.handler.extract_geometry(file_path)
+    def update_component(self, file_path: str, root_path: str) -> List[str]:
+        """
+        Re-process a changed CAD file in incremental mode.
 
-        # Store them
-        self.components.append(metadata)
-        self.geometric_signatures[file_path] = signature
+        Returns:
+            The duplicate group the component is in after the update (empty if none)
+        """
+        self._require_incremental()
+        if file_path in self.table:
+            self.remove_component(file_path)
+        return self.add_component(file_path, root_path)
+
+    def duplicate_groups(self) -> List[List[str]]:
+        """Current duplicate groups maintained in incremental mode"""
+        self._require_incremental()
+        return self.incremental.groups()
+
+    def _require_incremental(self):
+        if self.incremental is None:
+            raise RuntimeError("Incremental mode is not enabled; call enable_incremental() first")
+
+    def _record_error(self, file_path: str, error: str):
+        """Log error but continue processing other files"""
+        self.errors.append((file_path, error))
+        if self._journal is not None:
+            self._journal.record_failure(file_path, error)
+        if self.metrics is not None:
+            self.metrics.count('errors')
+        logger.warning("Error processing %s: %s", file_path, error)
 
     def find_duplicates(self, threshold: float = 0.95) -> List[List[str]]:
         """
@@ -51,24 +283,259 @@ class ComponentAnalyzer:
         Returns:
             List of duplicate groups, where each group is a list of file paths
         """
-        # Create list of (filepath, signature) tuples for similarity detector
-        signatures = [(filepath, sig) for filepath, sig in self.geometric_signatures.items()]
-
-        # Use similarity detector to find duplicates
-        duplicate_groups = self.similarity_detector.find_duplicates(signatures, threshold)
+        # Hand the table's signature columns to the similarity detector
+        with timed(self.metrics, 'find_duplicates'):
+            duplicate_groups = self.similarity_detector.find_duplicates_in_store(
+                self.table.paths(), self.table.signature_store(), threshold
+            )
 
+        if self.metrics is not None:
+            self.metrics.publish()
         return duplicate_groups
 
-    def scan_directory(self, root_path: str):
+    def iter_duplicates(self, threshold: float = 0.95) -> Iterator[GroupSummary]:
+        """
+        Yield duplicate groups as they are found, for writing them out while matching goes on.
+
+        Same groups as find_duplicates, in the same order, each as a
+        GroupSummary (members, representative, lowest and highest match
+        score). With the detector's default seed grouping no group is kept
+        once yielded (see SimilarityDetector.iter_duplicates_in_store). The
+        metrics report is published when the generator is exhausted.
+
+        Args:
+            threshold: Similarity threshold (0.0-1.0)
+        """
+        yield from self.similarity_detector.iter_duplicates_in_store(
+            self.table.paths(), self.table.signature_store(), threshold
+        )
+        if self.metrics is not None:
+            self.metrics.publish()
+
+    def save_index(self, directory: str):
+        """
+        Save the analyzed components as an index directory (see ComponentTable.save).
+
+        Another analyzer - on this machine or another - can open it with
+        load_index() instead of parsing the CAD files again.
+        """
+        self.table.save(directory)
+
+    def load_index(self, directory: str, mmap: bool = True):
+        """
+        Replace the analyzed components with a saved index.
+
+        Args:
+            directory: Directory written by save_index()
+            mmap: Memory-map the columns instead of reading them into memory
+
+        Incremental mode has to be enabled again afterwards.
+        """
+        self.table = ComponentTable.load(directory, mmap=mmap)
+        self.incremental = None
+        self._query_index = None
+
+    def query_similar(self, query: Union[str, GeometricSignature], k: int = 10,
+                      threshold: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Find the stored components most similar to one part.
+
+        The first query builds a SimilarityIndex over the table; later
+        queries reuse it until components are added or removed.
+
+        Args:
+            query: Path of a CAD file to parse, or its GeometricSignature
+            k: Number of matches to return at most
+            threshold: Minimum similarity score (0.0-1.0)
+
+        Returns:
+            (file path, score) pairs, best first, scored like calculate_similarity(query, stored)
+        """
+        if isinstance(query, GeometricSignature):
+            signature = query
+        else:
+            signature = self.handler.extract_geometry(query)
+
+        if self._query_index is None or self._query_index[0] != self.table.version:
+            detector = self.similarity_detector
+            scorer = BatchScorer(WEIGHTS, detector.descriptor_threshold if detector.use_descriptors else None)
+            rows = self.table.rows()
+            self._query_index = (self.table.version, SimilarityIndex(self.table.signature_store(rows), scorer), rows)
+        _, index, rows = self._query_index
+
+        matches = index.query(self.table.query_store(signature), k, threshold)
+        return [(self.table.path(rows[position]), score) for position, score in matches]
+
+    def scan_directory(self, root_path: str, workers: int = 1, batch_size: int = 64,
+                       dedup_content: bool = False, readers: int = 0,
+                       max_inflight_bytes: int = DEFAULT_MAX_INFLIGHT_BYTES,
+                       journal: Optional[str] = None, resume: bool = False,
+                       listing_threads: Optional[int] = None):
         """
         Scan an entire directory for CAD files and process them all.
 
+        Errors on individual files are collected in `errors` (and logged)
+        and do not stop the scan. With a cache, entries for files under
+        root_path that no longer exist are evicted at the end of the scan.
+
         Args:
             root_path: Root directory to scan
+            workers: Number of worker processes. 1 (default) processes files
+                in this process; more sends batches of files to a process pool
+            batch_size: Number of files per worker task when workers > 1
+            dedup_content: Parse only the first of each set of byte-identical
+                files. Files are hashed only when another file has the same
+                size; copies take the first file's signature and metadata with
+                their own path, name and project. The groups found are left
+                in `identical_files`
+            readers: Number of threads reading files into memory ahead of
+                parsing. 0 (default) reads each file as it is parsed; more
+                runs the scan as a pipeline (see analyze_files_pipelined) in
+                which discovery, reading and parsing overlap - worthwhile
+                when files sit on a network share
+            max_inflight_bytes: Most bytes of read-ahead files held in memory
+                at once by a pipelined scan
+            journal: Path of a ScanJournal database that checkpoints every
+                completed file with its analysis, and every failed file with
+                its error, while the scan runs
+            resume: Continue the scan journaled in `journal`: files it
+                completed (and that have not changed since) are restored
+                without parsing; files that failed are retried
+            listing_threads: Directory listings in flight at once while
+                discovering files (see FileSystemCrawler); above 1 the tree
+                is crawled concurrently in the background, which hides
+                listing latency on network shares. Default: the crawler's
+                own setting
+
+        Raises:
+            ValueError: If resume is set without a journal, or the journal
+                holds no scan of root_path to resume
         """
-        for cad_file in self.crawler.discover_files(root_path):
+        if resume and journal is None:
+            raise ValueError("resume=True needs the journal of the scan to resume")
+        if listing_threads is not None:
+            self.crawler.listing_threads = listing_threads
+        if journal is not None:
+            self._journal = ScanJournal(journal)
             try:
-                self.process_file(str(cad_file), root_path)
-            except Exception as e:
-                # Log error but continue processing other files
-                print(f"Error processing {cad_file}: {e}")
\ No newline at end of file
+                self._journal.start(root_path, resume)
+            except ValueError:
+                self._close_journal()
+                raise
+
+        self._content = ContentIndex() if dedup_content else None
+        try:
+            with timed(self.metrics, 'scan'):
+                seen: Set[str] = set()
+                entries = self._discover(root_path, seen)
+
+                if workers > 1 or readers > 0:
+                    self._scan_parallel(entries, root_path, workers, batch_size, readers, max_inflight_bytes)
+                else:
+                    for entry in entries:
+                        start = time.perf_counter()
+                        try:
+                            self._scan_file(entry, root_path)
+                        except Exception as e:
+                            self._record_error(entry.path, str(e))
+                        else:
+                            self._count_file(entry)
+                        if self.metrics is not None:
+                            self.metrics.file_done(entry.path, time.perf_counter() - start)
+
+                if self.cache is not None:
+                    self.cache.evict_missing(root_path, seen)
+                    self.cache.flush()
+
+                # Hand back the room the columns kept for growth
+                self.table.trim()
+
+            if self._content is not None:
+                self.identical_files = self._content.groups()
+            if self._journal is not None:
+                self._journal.finish()
+        finally:
+            # process_file() outside a scan never deduplicates or journals
+            self._content = None
+            self._close_journal()
+
+        if self.metrics is not None:
+            self.metrics.publish()
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _count_file(self, entry: FileEntry):
+        """Count an analyzed file towards the files and bytes of the run"""
+        if self.metrics is not None:
+            self.metrics.count('files')
+            self.metrics.count('bytes', entry.size)
+
+    def _discover(self, root_path: str, seen: Set[str]) -> Iterator[FileEntry]:
+        """Discovered files with their stat data, remembering each path in `seen`"""
+        for entry in self.crawler.iter_entries(root_path):
+            seen.add(entry.path)
+            yield entry
+
+    def _scan_parallel(self, entries: Iterator[FileEntry], root_path: str, workers: int, batch_size: int,
+                       readers: int, max_inflight_bytes: int):
+        """Process discovered files in a process pool or a pipeline, merging in discovery order"""
+        discovered: Dict[str, FileEntry] = {}  # entries of files not yet merged
+
+        def tracked_entries():
+            for entry in entries:
+                discovered[entry.path] = entry
+                yield entry
+
+        lookup = None
+        misses: Set[str] = set()  # files to cache once analyzed
+        restored: Set[str] = set()  # files restored from the journal, not journaled again
+        if self.cache is not None or self._content is not None or self._journal is not None:
+            def lookup(file_path: str):
+                entry = discovered[file_path]
+                found = self._journal_lookup(entry)
+                if found is not None:
+                    restored.add(file_path)
+                    return found
+                if self.cache is not None:
+                    cached = self._cache_lookup(entry, root_path)
+                    if cached is not None:
+                        if self._content is not None:
+                            self._content.add(entry)
+                        return cached
+                    misses.add(file_path)
+                if self._content is not None:
+                    original = self._content_original(entry)
+                    if original is not None:
+                        # Resolved once the original's result is in the table
+                        return lambda: self._copy_analysis(original, file_path, root_path)
+                    self._content.add(entry)
+                return None
+
+        if readers > 0:
+            results = analyze_files_pipelined(self.handler, self.crawler, tracked_entries(), root_path, workers,
+                                              readers, max_inflight_bytes, batch_size=batch_size,
+                                              lookup=lookup, metrics=self.metrics)
+        else:
+            file_paths = (entry.path for entry in tracked_entries())
+            results = analyze_files_parallel(self.handler, self.crawler, file_paths, root_path, workers,
+                                             batch_size, lookup, self.metrics)
+
+        for file_path, metadata, signature, error in results:
+            entry = discovered.pop(file_path)
+            parsed = file_path in misses
+            misses.discard(file_path)
+            was_restored = file_path in restored
+            restored.discard(file_path)
+            if error is not None:
+                self._record_error(file_path, error)
+                continue
+
+            self._store(file_path, metadata, signature)
+            self._count_file(entry)
+            if parsed:
+                self.cache.put(file_path, entry.size, entry.mtime_ns, metadata, signature)
+            if self._journal is not None and not was_restored:
+                self._journal.record(entry, metadata, signature)
@@ -0,0 +1,377 @@
+# cadRedundancyAnalyzer/core/blocked.py
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from cadRedundancyAnalyzer.core.candidates import minimum_ratios
+from cadRedundancyAnalyzer.core.vectorized import BatchScorer, DescriptorColumns, SignatureStore
+
+DEFAULT_TILE_SIZE = 1024
+
+# Source rows per spill file of SpilledEdges; one file is loaded at a time
+DEFAULT_SPILL_ROWS = 65536
+
+# One directed edge in a spill file
+EDGE_RECORD = np.dtype([('source', '<i8'), ('target', '<i8'), ('score', '<f8')])
+
+# (name, shape, dtype) of each shared array, sent once to every worker
+SharedSpec = Dict[str, Tuple[str, tuple, str]]
+
+# (sources, targets, scores, pairs scored) of one tile
+TileEdges = Tuple[np.ndarray, np.ndarray, np.ndarray, int]
+
+# State installed once per worker process by the pool initializer
+_worker_blocks: List[shared_memory.SharedMemory] = []
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_store: Optional[SignatureStore] = None
+_worker_scorer: Optional[BatchScorer] = None
+_worker_threshold = 0.0
+
+
+class SharedArrays:
+    """
+    NumPy arrays copied into shared memory blocks.
+
+    The creating process owns the blocks and unlinks them on close(); other
+    processes attach to them by name from `spec` without copying.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self._blocks = []
+        self.spec: SharedSpec = {}
+        for name, array in arrays.items():
+            block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            self._blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.spec[name] = (block.name, array.shape, array.dtype.str)
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self) -> 'SharedArrays':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach_arrays(spec: SharedSpec) -> Tuple[Dict[str, np.ndarray], List[shared_memory.SharedMemory]]:
+    """Views of shared arrays, plus the blocks that must stay open while they are used"""
+    arrays = {}
+    blocks = []
+    for name, (block_name, shape, dtype) in spec.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+def _store_arrays(store: SignatureStore) -> Dict[str, np.ndarray]:
+    """Every column of a store, by name"""
+    arrays = {'volume': store.volume, 'surface_area': store.surface_area,
+              'dims': store.dims, 'hash_codes': store.hash_codes}
+    if store.descriptors is not None:
+        descriptors = store.descriptors
+        arrays.update(extents=descriptors.extents, inertia=descriptors.inertia,
+                      histograms=descriptors.histograms, bins=descriptors.bins)
+    return arrays
+
+
+def _store_from_arrays(arrays: Dict[str, np.ndarray]) -> SignatureStore:
+    descriptors = None
+    if 'bins' in arrays:
+        descriptors = DescriptorColumns(arrays['extents'], arrays['inertia'], arrays['histograms'], arrays['bins'])
+    return SignatureStore(arrays['volume'], arrays['surface_area'], arrays['dims'], arrays['hash_codes'],
+                          descriptors)
+
+
+def asymmetric_rows(store: SignatureStore) -> np.ndarray:
+    """
+    Rows whose scores may differ with the pair's order.
+
+    The scorer's min / max keep their first argument against NaN, so only
+    pairs with a NaN value can score differently in each direction.
+    """
+    features = [store.volume[:, None], store.surface_area[:, None], store.dims]
+    nan = np.isnan(np.hstack(features)).any(axis=1)
+    if store.descriptors is not None:
+        descriptors = store.descriptors
+        described = np.hstack([descriptors.extents, descriptors.inertia, descriptors.histograms])
+        nan |= (descriptors.bins > 0) & np.isnan(described).any(axis=1)
+    return nan
+
+
+class EdgeIndex:
+    """
+    Matching pairs of a store as sorted adjacency lists.
+
+    Offers the candidates() of a CandidateIndex - here only the rows a part
+    matches - and a match() that looks their scores up, so the grouping code
+    can replay edges scored elsewhere.
+    """
+
+    def __init__(self, size: int, sources: np.ndarray, targets: np.ndarray, scores: np.ndarray):
+        """
+        Args:
+            size: Number of rows in the store
+            sources, targets, scores: Directed edges: score(source, target)
+                reached the threshold (repeated edges are kept once)
+        """
+        keys, first = np.unique(sources.astype(np.int64) * size + targets, return_index=True)
+        self._targets = (keys % size).astype(np.intp)
+        self._scores = scores[first]
+        self._offsets = np.searchsorted(keys // size, np.arange(size + 1))
+        self.size = size
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def candidates(self, row: int) -> np.ndarray:
+        """Sorted rows that `row` matches"""
+        return self._targets[self._offsets[row]:self._offsets[row + 1]]
+
+    def match(self, row: int, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Scores of some of the rows `row` matches, as (rows, scores)"""
+        start = self._offsets[row]
+        positions = start + np.searchsorted(self._targets[start:self._offsets[row + 1]], rows)
+        return rows, self._scores[positions]
+
+
+class SpilledEdges:
+    """
+    Directed matching edges spilled to temporary files by source row block.
+
+    Edges are appended as they arrive, in any order; candidates() and
+    match() load one block at a time as an EdgeIndex, so a pass reading
+    rows in order only ever holds one block's edges in memory.
+    """
+
+    def __init__(self, size: int, block_rows: int = DEFAULT_SPILL_ROWS, directory: Optional[str] = None):
+        """
+        Args:
+            size: Number of rows in the store
+            block_rows: Source rows per spill file
+            directory: Where to create the spill files (default: system temp dir)
+        """
+        self.size = size
+        self.block_rows = max(1, block_rows)
+        self._directory = tempfile.TemporaryDirectory(prefix='cad-edges-', dir=directory)
+        self._edges = 0
+        self._block = -1
+        self._index: Optional[EdgeIndex] = None
+
+    def __len__(self) -> int:
+        return self._edges
+
+    def _path(self, block: int) -> str:
+        return os.path.join(self._directory.name, f'{block}.edges')
+
+    def add(self, sources: np.ndarray, targets: np.ndarray, scores: np.ndarray):
+        """Append directed edges to the spill file of their source row's block"""
+        if not len(sources):
+            return
+        records = np.empty(len(sources), dtype=EDGE_RECORD)
+        records['source'], records['target'], records['score'] = sources, targets, scores
+        blocks = records['source'] // self.block_rows
+        records, blocks = records[np.argsort(blocks, kind='stable')], np.sort(blocks)
+        bounds = np.flatnonzero(np.diff(blocks)) + 1
+        for chunk in np.split(records, bounds):
+            with open(self._path(int(chunk['source'][0]) // self.block_rows), 'ab') as spill:
+                chunk.tofile(spill)
+        self._edges += len(records)
+
+    def _load(self, row: int) -> EdgeIndex:
+        block = row // self.block_rows
+        if block != self._block:
+            path = self._path(block)
+            records = np.fromfile(path, dtype=EDGE_RECORD) if os.path.exists(path) \
+                else np.empty(0, dtype=EDGE_RECORD)
+            self._index = EdgeIndex(self.size, records['source'], records['target'], records['score'])
+            self._block = block
+        return self._index
+
+    def candidates(self, row: int) -> np.ndarray:
+        """Sorted rows that `row` matches"""
+        return self._load(row).candidates(row)
+
+    def match(self, row: int, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Scores of some of the rows `row` matches, as (rows, scores)"""
+        return self._load(row).match(row, rows)
+
+    def close(self):
+        self._index = None
+        self._directory.cleanup()
+
+    def __enter__(self) -> 'SpilledEdges':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _tiles(store: SignatureStore, threshold: float, scorer: BatchScorer,
+           tile_size: int) -> Tuple[np.ndarray, np.ndarray, List[Tuple[int, int]]]:
+    """
+    Row order, tile start offsets and the tile pairs worth scoring.
+
+    Rows whose terms are bounded by 1.0 are sorted by log-volume, the rest
+    follow. Two tiles of sorted rows are skipped when even their closest
+    volumes are further apart than any matching pair can be.
+    """
+    regular = store.bounded() & np.isfinite(store.volume)
+    regular_rows = np.flatnonzero(regular)
+    with np.errstate(divide='ignore'):
+        log_volume = np.log(store.volume[regular_rows])
+    sorted_order = np.argsort(log_volume, kind='stable')
+    order = np.concatenate([regular_rows[sorted_order], np.flatnonzero(~regular)]).astype(np.intp)
+    sorted_log = log_volume[sorted_order]
+
+    starts = np.arange(0, len(order) + tile_size, tile_size)
+    starts[-1] = len(order)
+    weights = (scorer.volume_weight, scorer.area_weight, scorer.bbox_weight)
+    volume_ratio, _, _ = minimum_ratios(threshold, weights)
+    gap = -np.log(volume_ratio) if volume_ratio > 0 else np.inf
+
+    pairs = []
+    tiles = len(starts) - 1
+    for a in range(tiles):
+        for b in range(a, tiles):
+            # Tiles of zero-volume parts hold -inf log-volumes; their NaN gap never prunes
+            with np.errstate(invalid='ignore'):
+                distance = sorted_log[starts[b]] - sorted_log[starts[a + 1] - 1] \
+                    if starts[b + 1] <= len(regular_rows) else -np.inf
+            if distance > gap:
+                # Later tiles are further away still, but irregular tiles remain
+                for c in range(b, tiles):
+                    if starts[c + 1] > len(regular_rows):
+                        pairs.append((a, c))
+                break
+            pairs.append((a, b))
+    return order, starts, pairs
+
+
+def _init_worker(spec: SharedSpec, scorer: BatchScorer, threshold: float):
+    """Process pool initializer: attach the shared arrays for every later tile"""
+    global _worker_arrays, _worker_blocks, _worker_store, _worker_scorer, _worker_threshold
+    _worker_arrays, _worker_blocks = attach_arrays(spec)
+    _worker_store = _store_from_arrays(_worker_arrays)
+    _worker_scorer = scorer
+    _worker_threshold = threshold
+
+
+def _score_tile(a: int, b: int) -> TileEdges:
+    """Directed matching edges between two tiles (each direction, no self pairs)"""
+    return score_tile(_worker_store, _worker_scorer, _worker_threshold, _worker_arrays['order'],
+                      _worker_arrays['starts'], _worker_arrays['asymmetric'], a, b)
+
+
+def score_tile(store: SignatureStore, scorer: BatchScorer, threshold: float, order: np.ndarray,
+               starts: np.ndarray, asymmetric: np.ndarray, a: int, b: int) -> TileEdges:
+    """
+    Score every pair between tiles a and b and keep the matching ones.
+
+    Scores are symmetric except for NaN rows, so the reverse direction of
+    an off-diagonal tile is the transposed block with those rows rescored.
+    """
+    rows1 = order[starts[a]:starts[a + 1]]
+    rows2 = order[starts[b]:starts[b + 1]]
+    scores = scorer.score_block(store, rows1, rows2)
+
+    forward = scores >= threshold
+    if a == b:
+        np.fill_diagonal(forward, False)
+        pairs = len(rows1) * (len(rows1) - 1) // 2
+    else:
+        pairs = len(rows1) * len(rows2)
+    i, j = np.nonzero(forward)
+    sources, targets, values = [rows1[i]], [rows2[j]], [scores[i, j]]
+
+    if a != b:
+        backward_scores = scores.T
+        asymmetric1, asymmetric2 = asymmetric[rows1], asymmetric[rows2]
+        if asymmetric1.any() or asymmetric2.any():
+            backward_scores = backward_scores.copy()
+            backward_scores[asymmetric2, :] = scorer.score_block(store, rows2[asymmetric2], rows1)
+            backward_scores[:, asymmetric1] = scorer.score_block(store, rows2, rows1[asymmetric1])
+        i, j = np.nonzero(backward_scores >= threshold)
+        sources.append(rows2[i])
+        targets.append(rows1[j])
+        values.append(backward_scores[i, j])
+
+    return np.concatenate(sources), np.concatenate(targets), np.concatenate(values), pairs
+
+
+def _same_hash_edges(store: SignatureStore, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Every ordered pair of rows sharing a hash code, which score 1.0 however far apart they are"""
+    sources, targets = [np.empty(0, dtype=np.intp)], [np.empty(0, dtype=np.intp)]
+    if 1.0 >= threshold:
+        for rows in store.hash_buckets():
+            if len(rows) > 1:
+                sources.append(np.repeat(rows, len(rows)))
+                targets.append(np.tile(rows, len(rows)))
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+    distinct = sources != targets
+    return sources[distinct], targets[distinct]
+
+
+def stream_tile_edges(store: SignatureStore, threshold: float, scorer: BatchScorer, workers: int,
+                      tile_size: int = DEFAULT_TILE_SIZE) -> Iterator[TileEdges]:
+    """
+    Score a store's pairs tile by tile in a process pool, yielding each tile's edges.
+
+    The columns are placed in shared memory once; tasks only carry two tile
+    numbers. At most 2 * workers tiles are in flight.
+    """
+    order, starts, pairs = _tiles(store, threshold, scorer, tile_size)
+    arrays = _store_arrays(store)
+    arrays.update(order=order, starts=starts, asymmetric=asymmetric_rows(store))
+
+    with SharedArrays(arrays) as shared, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                initargs=(shared.spec, scorer, threshold)) as executor:
+        pending = deque()
+        for a, b in pairs:
+            pending.append(executor.submit(_score_tile, a, b))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def stream_matching_edges(store: SignatureStore, threshold: float, scorer: BatchScorer, workers: int,
+                          tile_size: int = DEFAULT_TILE_SIZE) -> Iterator[TileEdges]:
+    """
+    Every matching directed pair of a store, scored in worker processes and
+    yielded in batches as each tile comes back.
+
+    Pairs sharing a hash code come first with a score of 1.0; tiles leave
+    them out, so each directed pair is yielded exactly once.
+
+    Args:
+        store: Signature columns
+        threshold: Similarity threshold (0.0-1.0)
+        scorer: BatchScorer whose weights and descriptor threshold are used
+        workers: Number of worker processes
+        tile_size: Rows per tile; a task scores one pair of tiles
+
+    Yields:
+        (sources, targets, scores, pairs scored) of each batch
+    """
+    sources, targets = _same_hash_edges(store, threshold)
+    yield sources, targets, np.ones(len(sources)), 0
+
+    hash_codes = store.hash_codes
+    for tile_sources, tile_targets, tile_scores, pairs in stream_tile_edges(
+            store, threshold, scorer, workers, tile_size):
+        if 1.0 >= threshold:
+            fuzzy = hash_codes[tile_sources] != hash_codes[tile_targets]
+            tile_sources, tile_targets, tile_scores = tile_sources[fuzzy], tile_targets[fuzzy], tile_scores[fuzzy]
+        yield tile_sources, tile_targets, tile_scores, pairs
@@ -0,0 +1,221 @@
+# cadRedundancyAnalyzer/core/cache.py
+import hashlib
+import json
+import os
+import sqlite3
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterable, Optional, Tuple
+
+from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature, ShapeDescriptor
+
+# Columns holding one file's analysis, shared with the scan journal
+ANALYSIS_COLUMNS_SCHEMA = """
+    metadata TEXT NOT NULL,
+    min_x REAL, min_y REAL, min_z REAL,
+    max_x REAL, max_y REAL, max_z REAL,
+    volume REAL,
+    surface_area REAL,
+    geometric_hash TEXT NOT NULL,
+    descriptor TEXT
+"""
+ANALYSIS_COLUMNS = ("metadata, min_x, min_y, min_z, max_x, max_y, max_z, "
+                    "volume, surface_area, geometric_hash, descriptor")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS signatures (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT,{ANALYSIS_COLUMNS_SCHEMA})
+"""
+
+# Columns added after the first release, with their definitions, for upgrading old caches
+_ADDED_COLUMNS = {
+    'descriptor': 'TEXT',
+}
+
+
+def file_content_hash(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """Streaming BLAKE2b digest of a file's bytes"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _real(value: Optional[float]) -> float:
+    """SQLite stores NaN as NULL; turn it back into NaN"""
+    return float('nan') if value is None else value
+
+
+def encode_analysis(metadata: ComponentMetadata, signature: GeometricSignature) -> tuple:
+    """Values of ANALYSIS_COLUMNS for one file's analysis"""
+    descriptor = json.dumps(asdict(signature.descriptor)) if signature.descriptor is not None else None
+    return (json.dumps(asdict(metadata)), *signature.bounding_box, signature.volume, signature.surface_area,
+            signature.geometric_hash, descriptor)
+
+
+def decode_analysis(values: tuple) -> Tuple[ComponentMetadata, GeometricSignature]:
+    """The analysis stored in ANALYSIS_COLUMNS values"""
+    metadata = ComponentMetadata(**json.loads(values[0]))
+    signature = GeometricSignature(
+        bounding_box=tuple(_real(value) for value in values[1:7]),
+        volume=_real(values[7]),
+        surface_area=_real(values[8]),
+        geometric_hash=values[9],
+        descriptor=ShapeDescriptor(**{
+            name: tuple(items) for name, items in json.loads(values[10]).items()
+        }) if values[10] is not None else None
+    )
+    return metadata, signature
+
+
+class SignatureCache:
+    """
+    Persistent SQLite cache of analysis results.
+
+    Entries are keyed on (path, size, mtime_ns): a file whose size and
+    modification time are unchanged is not parsed again. With
+    verify_content=True a BLAKE2b hash of the file is stored as well and
+    decides hits instead, which also survives copies and touches that change
+    mtime without changing content (at the cost of reading each file).
+
+    Writes are committed in batches; call flush() or close() (or use the
+    cache as a context manager) to make sure they reach the disk.
+    """
+
+    def __init__(self, db_path: str, verify_content: bool = False, commit_every: int = 1000):
+        self.db_path = db_path
+        self.verify_content = verify_content
+        self.commit_every = commit_every
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+        self._connection = sqlite3.connect(db_path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(_SCHEMA)
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(signatures)")}
+        for column, definition in _ADDED_COLUMNS.items():
+            if column not in columns:
+                self._connection.execute(f"ALTER TABLE signatures ADD COLUMN {column} {definition}")
+        self._connection.commit()
+
+    def get(self, file_path: str, size: int, mtime_ns: int,
+            require_descriptor: bool = False) -> Optional[Tuple[ComponentMetadata, GeometricSignature]]:
+        """
+        Look up a file's cached analysis.
+
+        Args:
+            file_path: Full path to the CAD file
+            size: Current file size in bytes
+            mtime_ns: Current modification time in nanoseconds
+            require_descriptor: Treat entries cached without a shape descriptor as misses
+
+        Returns:
+            (ComponentMetadata, GeometricSignature), or None if the file is not
+            cached or has changed
+        """
+        row = self._connection.execute(
+            f"SELECT size, mtime_ns, content_hash, {ANALYSIS_COLUMNS} FROM signatures WHERE path = ?",
+            (file_path,)
+        ).fetchone()
+
+        if row is None or (require_descriptor and row[13] is None) or \
+                not self._is_current(file_path, size, mtime_ns, row[0], row[1], row[2]):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return decode_analysis(row[3:])
+
+    def _is_current(self, file_path: str, size: int, mtime_ns: int,
+                    cached_size: int, cached_mtime_ns: int, cached_hash: Optional[str]) -> bool:
+        """Check whether a cached entry still describes the file on disk"""
+        if not self.verify_content:
+            return size == cached_size and mtime_ns == cached_mtime_ns
+
+        if cached_hash is None or size != cached_size:
+            return False
+        if file_content_hash(file_path) != cached_hash:
+            return False
+
+        # Same content under a new mtime: refresh the key for the next lookup
+        if mtime_ns != cached_mtime_ns:
+            self._execute_write("UPDATE signatures SET mtime_ns = ? WHERE path = ?", (mtime_ns, file_path))
+        return True
+
+    def put(self, file_path: str, size: int, mtime_ns: int,
+            metadata: ComponentMetadata, signature: GeometricSignature):
+        """
+        Store a file's analysis.
+
+        Args:
+            file_path: Full path to the CAD file
+            size: File size in bytes when it was analyzed
+            mtime_ns: Modification time in nanoseconds when it was analyzed
+            metadata: Component metadata to cache
+            signature: Geometric signature to cache
+        """
+        content_hash = file_content_hash(file_path) if self.verify_content else None
+        self._execute_write(
+            f"INSERT OR REPLACE INTO signatures (path, size, mtime_ns, content_hash, {ANALYSIS_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (file_path, size, mtime_ns, content_hash, *encode_analysis(metadata, signature))
+        )
+
+    def evict_missing(self, root_path: str, seen_paths: Iterable[str]) -> int:
+        """
+        Remove entries under root_path whose files were not seen in a scan.
+
+        Args:
+            root_path: Root directory that was scanned, in any spelling the
+                crawler accepts ("lib", "./lib", "lib/")
+            seen_paths: Every file path discovered during the scan
+
+        Returns:
+            Number of evicted entries
+        """
+        # Normalized as the crawler does, so the prefix matches the paths it found
+        prefix = os.path.join(str(Path(root_path)), '')
+        cursor = self._connection.cursor()
+        cursor.execute("CREATE TEMP TABLE IF NOT EXISTS seen (path TEXT PRIMARY KEY)")
+        cursor.execute("DELETE FROM seen")
+        cursor.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((path,) for path in seen_paths))
+        # substr() rather than LIKE, so '%' and '_' in directory names are not wildcards
+        cursor.execute(
+            "DELETE FROM signatures WHERE substr(path, 1, ?) = ? AND path NOT IN (SELECT path FROM seen)",
+            (len(prefix), prefix)
+        )
+        evicted = cursor.rowcount
+        cursor.execute("DELETE FROM seen")
+        self.flush()
+        return evicted
+
+    def _execute_write(self, sql: str, parameters: tuple):
+        """Run a write statement, committing every `commit_every` writes"""
+        self._connection.execute(sql, parameters)
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.flush()
+
+    def flush(self):
+        """Commit pending writes"""
+        self._connection.commit()
+        self._pending = 0
+
+    def close(self):
+        """Commit pending writes and close the database"""
+        self.flush()
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def __enter__(self) -> 'SignatureCache':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
@@ -0,0 +1,148 @@
+# cadRedundancyAnalyzer/core/candidates.py
+from typing import Sequence, Tuple, Union
+
+import numpy as np
+
+from cadRedundancyAnalyzer.core.models import GeometricSignature
+from cadRedundancyAnalyzer.core.vectorized import SignatureStore
+
+# Safety margin on the ratio bounds, so float rounding in the scorer can never
+# push a pair over the threshold that the index already pruned
+RATIO_SLACK = 1e-9
+
+# Feature columns: volume, surface area, bbox width, depth, height
+VOLUME, AREA, DIMS = 0, 1, slice(2, 5)
+
+
+def minimum_ratios(threshold: float, weights: Tuple[float, float, float]) -> Tuple[float, float, float]:
+    """
+    Smallest volume, area and per-dimension ratios that can still reach threshold.
+
+    Every term of the weighted score is a ratio in [0, 1], so a pair can only
+    reach the threshold when each term reaches it with all other terms at 1.0.
+    The bounding box term is the mean of three dimension ratios, so a single
+    dimension has to make up the rest with the other two at 1.0.
+
+    Args:
+        threshold: Similarity threshold (0.0-1.0)
+        weights: (volume, area, bbox) weights of the similarity score
+
+    Returns:
+        (volume, area, dimension) minimum ratios; values <= 0 mean no bound
+    """
+    volume_weight, area_weight, bbox_weight = weights
+
+    volume_ratio = (threshold - area_weight - bbox_weight) / volume_weight
+    area_ratio = (threshold - volume_weight - bbox_weight) / area_weight
+    bbox_mean = (threshold - volume_weight - area_weight) / bbox_weight
+    dimension_ratio = 3 * bbox_mean - 2
+
+    return (volume_ratio - RATIO_SLACK,
+            area_ratio - RATIO_SLACK,
+            dimension_ratio - RATIO_SLACK)
+
+
+def _log_gap(ratio: float) -> float:
+    """Largest allowed |log(a) - log(b)| for a ratio bound, inf when unbounded"""
+    return -np.log(ratio) if ratio > 0 else np.inf
+
+
+class CandidateIndex:
+    """
+    Prunes the pairs SimilarityDetector has to score.
+
+    Signatures are sorted by log-volume; the candidates of a part are the
+    parts inside its log-volume window that also fall within the area and
+    bounding box dimension bands implied by the threshold. Parts with
+    identical geometric hashes are always candidates (they score 1.0), and
+    parts with negative or non-finite values - where the ratio terms are not
+    bounded by 1.0 - are compared with everything.
+    """
+
+    def __init__(self, signatures: Union[Sequence[GeometricSignature], SignatureStore], threshold: float,
+                 weights: Tuple[float, float, float] = (0.5, 0.3, 0.2), use_descriptors: bool = False):
+        """
+        Args:
+            signatures: GeometricSignature objects, or their columns as a SignatureStore
+            threshold: Similarity threshold (0.0-1.0)
+            weights: (volume, area, bbox) weights of the similarity score
+            use_descriptors: Band dimensions on principal extents, as the
+                scorer does for pairs with shape descriptors
+        """
+        if not isinstance(signatures, SignatureStore):
+            signatures = SignatureStore.from_signatures(signatures, descriptors=use_descriptors)
+        self.size = len(signatures)
+        features = signatures.features(use_descriptors)
+        volume_ratio, area_ratio, dimension_ratio = minimum_ratios(threshold, weights)
+        dimension_gap = _log_gap(dimension_ratio)
+        if use_descriptors and signatures.descriptors is not None and not signatures.descriptors.uniform():
+            # Mixed pairs fall back to bounding box dimensions, so no single
+            # dimension column bounds every pair
+            dimension_gap = np.inf
+        self._gaps = np.array([_log_gap(volume_ratio), _log_gap(area_ratio)] + [dimension_gap] * 3)
+
+        self._zero = features == 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._log = np.log(features)  # zeros become -inf
+
+        # Ratios of negative or non-finite values are not bounded by 1.0
+        irregular = ~(np.isfinite(features) & (features >= 0)).all(axis=1)
+        self._irregular = irregular
+        self._irregular_rows = np.flatnonzero(irregular)
+
+        # Regular parts sorted by log-volume (zero volumes sort first as -inf)
+        regular_rows = np.flatnonzero(~irregular)
+        order = np.argsort(self._log[regular_rows, VOLUME], kind='stable')
+        self._order = regular_rows[order]
+        self._sorted_log_volume = self._log[self._order, VOLUME]
+
+        # Identical hashes always score 1.0, whatever the other properties
+        self._same_hash = {
+            row: rows
+            for rows in signatures.hash_buckets() if len(rows) > 1
+            for row in rows.tolist()
+        }
+
+    def candidates(self, row: int) -> np.ndarray:
+        """
+        Indices of the parts that may reach the threshold with part `row`.
+
+        Returns:
+            Sorted array of row indices, excluding `row` itself
+        """
+        if self._irregular[row]:
+            rows = np.arange(self.size)
+            return rows[rows != row]
+
+        rows = self._volume_window(row)
+        for column in range(AREA, 5):
+            if np.isfinite(self._gaps[column]) and len(rows):
+                rows = rows[self._within_band(row, rows, column)]
+
+        parts = [rows, self._irregular_rows]
+        if row in self._same_hash:
+            parts.append(self._same_hash[row])
+
+        rows = np.unique(np.concatenate(parts))
+        return rows[rows != row]
+
+    def _volume_window(self, row: int) -> np.ndarray:
+        """Regular parts whose log-volume lies within the volume band of `row`"""
+        gap = self._gaps[VOLUME]
+        if not np.isfinite(gap):
+            return self._order
+
+        # A zero volume gives a window of exactly the other zero volumes
+        log_volume = self._log[row, VOLUME]
+        low = np.searchsorted(self._sorted_log_volume, log_volume - gap, side='left')
+        high = np.searchsorted(self._sorted_log_volume, log_volume + gap, side='right')
+        return self._order[low:high]
+
+    def _within_band(self, row: int, rows: np.ndarray, column: int) -> np.ndarray:
+        """Mask of `rows` whose value in `column` is within the band of `row`"""
+        # Zero against zero scores 1.0, zero against non-zero scores 0.0
+        if self._zero[row, column]:
+            return self._zero[rows, column]
+
+        difference = np.abs(self._log[rows, column] - self._log[row, column])
+        return ~self._zero[rows, column] & (difference <= self._gaps[column])
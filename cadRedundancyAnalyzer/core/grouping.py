@@ -0,0 +1,42 @@
+# cadRedundancyAnalyzer/core/grouping.py
+from dataclasses import dataclass
+from typing import List
+
+
+@dataclass
+class GroupSummary:
+    """A duplicate group with the scores of the matches that formed it"""
+    members: List[str]
+    representative: str  # the seed part, or the part with the most matches
+    min_similarity: float  # lowest / highest score among the group's matches
+    max_similarity: float
+
+
+class UnionFind:
+    """Disjoint sets over the integers 0..size-1, with path compression and union by size"""
+
+    def __init__(self, size: int):
+        self._parent = list(range(size))
+        self._size = [1] * size
+
+    def find(self, item: int) -> int:
+        """Root of the set containing item"""
+        root = item
+        while self._parent[root] != root:
+            root = self._parent[root]
+
+        # Point every item on the path straight at the root
+        while self._parent[item] != root:
+            self._parent[item], item = root, self._parent[item]
+        return root
+
+    def union(self, item1: int, item2: int) -> int:
+        """Merge the sets of two items, attaching the smaller one, and return the new root"""
+        root1, root2 = self.find(item1), self.find(item2)
+        if root1 == root2:
+            return root1
+        if self._size[root1] < self._size[root2]:
+            root1, root2 = root2, root1
+        self._parent[root2] = root1
+        self._size[root1] += self._size[root2]
+        return root1
@@ -0,0 +1,190 @@
+# cadRedundancyAnalyzer/core/incremental.py
+import math
+from typing import Dict, Hashable, List, Set
+
+from cadRedundancyAnalyzer.core.candidates import minimum_ratios
+from cadRedundancyAnalyzer.core.models import GeometricSignature
+from cadRedundancyAnalyzer.core.similarity import WEIGHTS
+
+# Bucket of parts whose ratios are unbounded (negative or non-finite values)
+_IRREGULAR = "irregular"
+_ZERO_VOLUME = "zero"
+
+
+class IncrementalDuplicateIndex:
+    """
+    Keeps duplicate groups up to date as parts are added and removed.
+
+    Parts are bucketed by log-volume with a bucket width equal to the widest
+    log-volume gap that can still reach the threshold, so a new part only
+    has to be scored against the parts in its own and the two neighbouring
+    buckets (plus hash-identical and irregular parts). Matches are kept as
+    an adjacency map and groups are its connected components: unlike the
+    greedy seed grouping of find_duplicates, they do not depend on the order
+    parts arrived in.
+    """
+
+    def __init__(self, detector, threshold: float = 0.95):
+        """
+        Args:
+            detector: SimilarityDetector whose calculate_similarity scores pairs
+            threshold: Similarity threshold (0.0-1.0)
+        """
+        self.detector = detector
+        self.threshold = threshold
+        volume_ratio, _, _ = minimum_ratios(threshold, WEIGHTS)
+        self._bucket_width = -math.log(volume_ratio) if volume_ratio > 0 else math.inf
+
+        self._signatures: Dict[str, GeometricSignature] = {}
+        self._order: Dict[str, int] = {}  # arrival sequence, for stable output
+        self._sequence = 0
+        self._bucket_of: Dict[str, Hashable] = {}
+        self._buckets: Dict[Hashable, Set[str]] = {}
+        self._by_hash: Dict[str, Set[str]] = {}
+        self._neighbours: Dict[str, Dict[str, float]] = {}
+        self._group_of: Dict[str, int] = {}
+        self._groups: Dict[int, Set[str]] = {}
+        self._next_group = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._signatures
+
+    def add(self, key: str, signature: GeometricSignature) -> List[str]:
+        """
+        Add a part and link it to the parts it matches.
+
+        Args:
+            key: Unique part identifier (file path)
+            signature: The part's geometric signature
+
+        Returns:
+            The duplicate group the part is now in (empty if it matches nothing)
+        """
+        if key in self._signatures:
+            self.remove(key)
+
+        # Earlier part first, as find_duplicates compares them (the scalar
+        # ratios are not symmetric when a value is NaN)
+        matches = {}
+        for other in self._candidates(signature):
+            similarity = self.detector.calculate_similarity(self._signatures[other], signature)
+            if similarity >= self.threshold:
+                matches[other] = similarity
+
+        self._signatures[key] = signature
+        self._order[key] = self._sequence
+        self._sequence += 1
+        bucket = self._bucket_key(signature)
+        self._bucket_of[key] = bucket
+        self._buckets.setdefault(bucket, set()).add(key)
+        self._by_hash.setdefault(signature.geometric_hash, set()).add(key)
+
+        self._neighbours[key] = matches
+        for other, similarity in matches.items():
+            self._neighbours[other][key] = similarity
+
+        # Merge every group the new part touches into the largest one
+        group = self._new_group({key})
+        for other in matches:
+            group = self._merge(group, self._group_of[other])
+
+        return self.group(key)
+
+    def remove(self, key: str):
+        """Remove a part, splitting its group if the part was holding it together"""
+        signature = self._signatures.pop(key)
+        del self._order[key]
+        bucket = self._bucket_of.pop(key)
+        self._buckets[bucket].discard(key)
+        if not self._buckets[bucket]:
+            del self._buckets[bucket]
+        self._by_hash[signature.geometric_hash].discard(key)
+        if not self._by_hash[signature.geometric_hash]:
+            del self._by_hash[signature.geometric_hash]
+
+        neighbours = self._neighbours.pop(key)
+        for other in neighbours:
+            del self._neighbours[other][key]
+
+        group_id = self._group_of.pop(key)
+        members = self._groups.pop(group_id)
+        members.discard(key)
+
+        # Re-discover the connected components among the remaining members
+        while members:
+            start = members.pop()
+            component = {start}
+            frontier = [start]
+            while frontier:
+                for other in self._neighbours[frontier.pop()]:
+                    if other not in component:
+                        component.add(other)
+                        frontier.append(other)
+            members -= component
+            self._new_group(component)
+
+    def group(self, key: str) -> List[str]:
+        """Duplicate group containing a part, in arrival order (empty if it has no match)"""
+        members = self._groups[self._group_of[key]]
+        return self._ordered(members) if len(members) > 1 else []
+
+    def groups(self) -> List[List[str]]:
+        """All duplicate groups, each in arrival order, ordered by their first member"""
+        groups = [self._ordered(members) for members in self._groups.values() if len(members) > 1]
+        return sorted(groups, key=lambda group: self._order[group[0]])
+
+    def _ordered(self, members: Set[str]) -> List[str]:
+        return sorted(members, key=self._order.__getitem__)
+
+    def _bucket_key(self, signature: GeometricSignature) -> Hashable:
+        """Log-volume bucket of a signature"""
+        bbox = signature.bounding_box
+        values = (signature.volume, signature.surface_area,
+                  bbox[3] - bbox[0], bbox[4] - bbox[1], bbox[5] - bbox[2])
+        if not all(math.isfinite(value) and value >= 0 for value in values):
+            return _IRREGULAR
+        if math.isinf(self._bucket_width):
+            return 0
+        if signature.volume == 0:
+            return _ZERO_VOLUME
+        return math.floor(math.log(signature.volume) / self._bucket_width)
+
+    def _candidates(self, signature: GeometricSignature) -> Set[str]:
+        """Parts that may reach the threshold with a signature"""
+        bucket = self._bucket_key(signature)
+        if bucket == _IRREGULAR:
+            return set(self._signatures)
+
+        if isinstance(bucket, int):
+            keys = (bucket - 1, bucket, bucket + 1)
+        else:
+            keys = (bucket,)
+
+        candidates = set(self._buckets.get(_IRREGULAR, ()))
+        for key in keys:
+            candidates |= self._buckets.get(key, set())
+        candidates |= self._by_hash.get(signature.geometric_hash, set())
+        return candidates
+
+    def _new_group(self, members: Set[str]) -> int:
+        group_id = self._next_group
+        self._next_group += 1
+        self._groups[group_id] = members
+        for member in members:
+            self._group_of[member] = group_id
+        return group_id
+
+    def _merge(self, group_a: int, group_b: int) -> int:
+        """Merge two groups, moving the smaller one, and return the surviving id"""
+        if group_a == group_b:
+            return group_a
+        if len(self._groups[group_a]) < len(self._groups[group_b]):
+            group_a, group_b = group_b, group_a
+        moved = self._groups.pop(group_b)
+        self._groups[group_a] |= moved
+        for member in moved:
+            self._group_of[member] = group_a
+        return group_a
@@ -0,0 +1,61 @@
+# cadRedundancyAnalyzer/core/ingest.py
+from typing import Dict, List, Optional, Tuple
+
+from cadRedundancyAnalyzer.core.cache import file_content_hash
+from cadRedundancyAnalyzer.discovery.filesystem import FileEntry
+
+
+class ContentIndex:
+    """
+    Finds files byte-identical to a file analyzed earlier in a scan.
+
+    Files are grouped by size first, so a file is only hashed once another
+    file of exactly its size has turned up; most files in a vault never
+    are. Contents are compared by a streaming BLAKE2b digest.
+    """
+
+    def __init__(self):
+        self._unhashed: Dict[int, List[str]] = {}  # size -> analyzed paths not hashed yet
+        self._originals: Dict[Tuple[int, str], str] = {}  # (size, digest) -> first analyzed path
+        self._copies: Dict[str, List[str]] = {}  # original path -> paths of its copies
+        self._digests: Dict[str, str] = {}  # digests of looked-up files not added yet
+        self.files_hashed = 0
+
+    def original_of(self, entry: FileEntry) -> Optional[str]:
+        """
+        Path of an analyzed file with the same bytes as entry, or None.
+
+        A file without an original should then be add()ed; a file with one
+        is recorded as its copy.
+        """
+        if entry.size not in self._unhashed:
+            return None
+
+        # Hash the analyzed files of this size once, on the first collision
+        for path in self._unhashed[entry.size]:
+            self._originals.setdefault((entry.size, self._hash(path)), path)
+        self._unhashed[entry.size] = []
+
+        digest = self._hash(entry.path)
+        original = self._originals.get((entry.size, digest))
+        if original is not None:
+            self._copies.setdefault(original, []).append(entry.path)
+        else:
+            self._digests[entry.path] = digest
+        return original
+
+    def add(self, entry: FileEntry):
+        """Record a file that is analyzed from its own bytes"""
+        digest = self._digests.pop(entry.path, None)
+        if digest is not None:
+            self._originals.setdefault((entry.size, digest), entry.path)
+        else:
+            self._unhashed.setdefault(entry.size, []).append(entry.path)
+
+    def groups(self) -> List[List[str]]:
+        """Byte-identical files found so far, each group led by the analyzed original"""
+        return [[original] + copies for original, copies in self._copies.items()]
+
+    def _hash(self, path: str) -> str:
+        self.files_hashed += 1
+        return file_content_hash(path)
@@ -0,0 +1,167 @@
+# cadRedundancyAnalyzer/core/journal.py
+import sqlite3
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from cadRedundancyAnalyzer.core.cache import (
+    ANALYSIS_COLUMNS, ANALYSIS_COLUMNS_SCHEMA, decode_analysis, encode_analysis
+)
+from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature
+from cadRedundancyAnalyzer.discovery.filesystem import FileEntry
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS scan (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+    f"""CREATE TABLE IF NOT EXISTS completed (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,{ANALYSIS_COLUMNS_SCHEMA})""",
+    """CREATE TABLE IF NOT EXISTS failed (
+        path TEXT PRIMARY KEY,
+        error TEXT NOT NULL,
+        attempts INTEGER NOT NULL
+    )""",
+)
+
+
+class ScanJournal:
+    """
+    Local SQLite journal of one scan's progress, from which an interrupted scan resumes.
+
+    Each completed file is written with its analysis, and each failed file
+    with its error (the retry list), as the scan goes. Writes are committed
+    at checkpoints - every checkpoint_every files or checkpoint_seconds
+    seconds, whichever comes first - so a crash loses at most one
+    checkpoint interval of work.
+    """
+
+    def __init__(self, db_path: str, checkpoint_every: int = 1000, checkpoint_seconds: float = 30.0):
+        self.db_path = db_path
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_seconds = checkpoint_seconds
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
+        self._restorable = False
+        self._connection = sqlite3.connect(db_path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+
+    def start(self, root_path: str, resume: bool = False):
+        """
+        Begin journaling a scan of root_path.
+
+        Args:
+            root_path: Root directory being scanned; "lib", "./lib" and "lib/"
+                are the same root, as for the crawler
+            resume: Keep the completed and failed files of an earlier scan of
+                the same root; otherwise the journal is emptied
+
+        Raises:
+            ValueError: If resuming and the journal holds no scan, or one of another root
+        """
+        root = str(Path(root_path))
+        if resume:
+            journaled_root = self._get('root_path')
+            if journaled_root is None:
+                raise ValueError(f"No scan to resume in {self.db_path}")
+            if journaled_root != root:
+                raise ValueError(f"Journal {self.db_path} is of a scan of {journaled_root}, not {root_path}")
+            self._restorable = len(self) > 0
+        else:
+            for table in ("scan", "completed", "failed"):
+                self._connection.execute(f"DELETE FROM {table}")
+            self._set('root_path', root)
+            self._restorable = False
+        self._set('status', 'running')
+        self.checkpoint()
+
+    @property
+    def root_path(self) -> Optional[str]:
+        return self._get('root_path')
+
+    @property
+    def complete(self) -> bool:
+        """Whether the journaled scan ran to the end"""
+        return self._get('status') == 'complete'
+
+    def completed(self, entry: FileEntry,
+                  require_descriptor: bool = False) -> Optional[Tuple[ComponentMetadata, GeometricSignature]]:
+        """
+        Analysis of a file an earlier run of a resumed scan completed.
+
+        Returns None unless the file was journaled with the same size and
+        mtime (and with a shape descriptor, when required).
+        """
+        if not self._restorable:
+            return None
+        row = self._connection.execute(
+            f"SELECT size, mtime_ns, {ANALYSIS_COLUMNS} FROM completed WHERE path = ?", (entry.path,)
+        ).fetchone()
+        if row is None or (row[0], row[1]) != (entry.size, entry.mtime_ns) or \
+                (require_descriptor and row[12] is None):
+            return None
+        return decode_analysis(row[2:])
+
+    def record(self, entry: FileEntry, metadata: ComponentMetadata, signature: GeometricSignature):
+        """Journal a completed file, taking it off the retry list"""
+        self._connection.execute("DELETE FROM failed WHERE path = ?", (entry.path,))
+        self._write(
+            f"INSERT OR REPLACE INTO completed (path, size, mtime_ns, {ANALYSIS_COLUMNS}) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry.path, entry.size, entry.mtime_ns, *encode_analysis(metadata, signature))
+        )
+
+    def record_failure(self, file_path: str, error: str):
+        """Put a file on the retry list with its error, counting the attempts"""
+        self._write(
+            "INSERT INTO failed (path, error, attempts) VALUES (?, ?, 1) "
+            "ON CONFLICT(path) DO UPDATE SET error = excluded.error, attempts = attempts + 1",
+            (file_path, error)
+        )
+
+    def failures(self) -> List[Tuple[str, str, int]]:
+        """The retry list: (file_path, error, attempts) of every file that failed and has not completed since"""
+        return self._connection.execute("SELECT path, error, attempts FROM failed ORDER BY path").fetchall()
+
+    def finish(self):
+        """Mark the scan as run to the end"""
+        self._set('status', 'complete')
+        self.checkpoint()
+
+    def checkpoint(self):
+        """Commit everything journaled so far"""
+        self._connection.commit()
+        self._pending = 0
+        self._last_checkpoint = time.monotonic()
+
+    def close(self):
+        """Checkpoint and close the journal"""
+        self.checkpoint()
+        self._connection.close()
+
+    def __len__(self) -> int:
+        """Number of completed files"""
+        return self._connection.execute("SELECT COUNT(*) FROM completed").fetchone()[0]
+
+    def __enter__(self) -> 'ScanJournal':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _write(self, sql: str, parameters: tuple):
+        """Run a write statement, checkpointing when one is due"""
+        self._connection.execute(sql, parameters)
+        self._pending += 1
+        if self._pending >= self.checkpoint_every or \
+                time.monotonic() - self._last_checkpoint >= self.checkpoint_seconds:
+            self.checkpoint()
+
+    def _get(self, key: str) -> Optional[str]:
+        row = self._connection.execute("SELECT value FROM scan WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def _set(self, key: str, value: str):
+        self._connection.execute("INSERT OR REPLACE INTO scan (key, value) VALUES (?, ?)", (key, value))
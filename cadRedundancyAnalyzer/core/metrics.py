@@ -0,0 +1,182 @@
+# cadRedundancyAnalyzer/core/metrics.py
+import heapq
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the duration histogram buckets; longer samples go in a last, open bucket
+HISTOGRAM_BOUNDS = (0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+
+# Receives the run report each time a run finishes
+ReportHook = Callable[[Dict[str, Any]], None]
+
+
+class StageTimer:
+    """Count, total, extremes and histogram of one stage's durations"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.buckets = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        bucket = 0
+        while bucket < len(HISTOGRAM_BOUNDS) and seconds > HISTOGRAM_BOUNDS[bucket]:
+            bucket += 1
+        self.buckets[bucket] += 1
+
+    def merge(self, other: 'StageTimer'):
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        bounds = list(HISTOGRAM_BOUNDS) + [None]
+        return {
+            'count': self.count,
+            'total_seconds': self.total,
+            'mean_seconds': self.total / self.count if self.count else 0.0,
+            'min_seconds': self.min if self.count else 0.0,
+            'max_seconds': self.max,
+            'histogram': [[bound, count] for bound, count in zip(bounds, self.buckets)],
+        }
+
+
+class RunMetrics:
+    """
+    Per-stage timers, counters and the slowest files of scan and match runs.
+
+    Hand one to ComponentAnalyzer(metrics=...) and the crawler, STL handler,
+    analyzer and similarity detector record into it. report() gives the
+    numbers as a JSON-ready dict; an on_report hook receives that dict at
+    the end of every scan_directory() and find_duplicates(), for forwarding
+    to another metrics system.
+
+    Recording is thread-safe. A pickled copy (such as the one a worker
+    process receives with the handler) starts empty; its snapshot() is
+    merged back with merge().
+    """
+
+    def __init__(self, on_report: Optional[ReportHook] = None, slowest: int = 10):
+        """
+        Args:
+            on_report: Called with report() whenever a run finishes
+            slowest: Number of slowest files to keep
+        """
+        self.on_report = on_report
+        self.slowest = slowest
+        self.stages: Dict[str, StageTimer] = {}
+        self.counters: Dict[str, int] = {}
+        self._slowest_files: List[Tuple[float, str]] = []  # min-heap of (seconds, path)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {'slowest': self.slowest}
+
+    def __setstate__(self, state):
+        self.__init__(slowest=state['slowest'])
+
+    @contextmanager
+    def time(self, stage: str):
+        """Time the body of a with block as one sample of a stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            timer = self.stages.get(stage)
+            if timer is None:
+                timer = self.stages[stage] = StageTimer()
+            timer.add(seconds)
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def file_done(self, path: str, seconds: float):
+        """Record one file's analysis time as a "file" stage sample and a slowest-file candidate"""
+        self.record('file', seconds)
+        with self._lock:
+            self._keep_slowest(seconds, path)
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        """The raw recorded state, for merge() into another RunMetrics"""
+        with self._lock:
+            state = {'stages': self.stages, 'counters': self.counters, 'slowest_files': self._slowest_files}
+            if reset:
+                self.stages, self.counters, self._slowest_files = {}, {}, []
+            else:
+                state = {'stages': {name: _copy_timer(timer) for name, timer in self.stages.items()},
+                         'counters': dict(self.counters), 'slowest_files': list(self._slowest_files)}
+        return state
+
+    def merge(self, state: Dict[str, Any]):
+        """Add the samples of another RunMetrics' snapshot()"""
+        with self._lock:
+            for name, timer in state['stages'].items():
+                self.stages.setdefault(name, StageTimer()).merge(timer)
+            for name, amount in state['counters'].items():
+                self.counters[name] = self.counters.get(name, 0) + amount
+            for seconds, path in state['slowest_files']:
+                self._keep_slowest(seconds, path)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        The run report: stages, counters, throughput and slowest files.
+
+        Throughput is measured against the total time of the "scan" stage.
+        """
+        with self._lock:
+            stages = {name: timer.to_dict() for name, timer in sorted(self.stages.items())}
+            counters = dict(sorted(self.counters.items()))
+            slowest = sorted(self._slowest_files, reverse=True)
+
+        scan_seconds = stages['scan']['total_seconds'] if 'scan' in stages else 0.0
+        rates = {}
+        if scan_seconds > 0:
+            rates['files_per_second'] = counters.get('files', 0) / scan_seconds
+            rates['bytes_per_second'] = counters.get('bytes', 0) / scan_seconds
+        return {
+            'stages': stages,
+            'counters': counters,
+            'rates': rates,
+            'slowest_files': [{'path': path, 'seconds': seconds} for seconds, path in slowest],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.report(), indent=indent)
+
+    def publish(self):
+        """Hand the current report to the on_report hook, if any"""
+        if self.on_report is not None:
+            self.on_report(self.report())
+
+    def _keep_slowest(self, seconds: float, path: str):
+        if len(self._slowest_files) < self.slowest:
+            heapq.heappush(self._slowest_files, (seconds, path))
+        elif self.slowest and seconds > self._slowest_files[0][0]:
+            heapq.heapreplace(self._slowest_files, (seconds, path))
+
+
+def _copy_timer(timer: StageTimer) -> StageTimer:
+    copy = StageTimer()
+    copy.merge(timer)
+    return copy
+
+
+def timed(metrics: Optional[RunMetrics], stage: str) -> ContextManager:
+    """metrics.time(stage), or a no-op when there are no metrics"""
+    return metrics.time(stage) if metrics is not None else nullcontext()
@@ -13,6 +13,14 @@ class ComponentMetadata:
     volume: Optional[float] = None
 
 
+@dataclass
+class ShapeDescriptor:
+    """Pose-invariant shape features (unchanged by rotating or moving the part)"""
+    principal_extents: tuple  # Extents along the principal axes, largest first
+    inertia: tuple  # Eigenvalues of the area-normalised shell inertia tensor, largest first
+    d2_histogram: tuple  # Distribution of surface point distances, normalised to sum to 1
+
+
 @dataclass
 class GeometricSignature:
     """Geometric fingerprint for similarity detection"""
@@ -20,3 +28,4 @@ class GeometricSignature:
     volume: float
     surface_area: float
     geometric_hash: str  # For quick comparison
+    descriptor: Optional[ShapeDescriptor] = None
@@ -0,0 +1,395 @@
+# cadRedundancyAnalyzer/core/parallel.py
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from cadRedundancyAnalyzer.core.metrics import RunMetrics, timed
+from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature
+from cadRedundancyAnalyzer.discovery.filesystem import FileEntry
+
+# (file_path, metadata, signature, error message)
+FileResult = Tuple[str, Optional[ComponentMetadata], Optional[GeometricSignature], Optional[str]]
+
+Analysis = Tuple[ComponentMetadata, GeometricSignature]
+
+# Resolves a file without parsing it (e.g. from a cache), or returns None. It may
+# also return a callable, called for the analysis once every earlier file's result
+# has been yielded (e.g. to copy the analysis of an earlier file still being parsed)
+Lookup = Callable[[str], Union[None, Analysis, Callable[[], Analysis]]]
+
+# Pipelined scans: reader threads, and bytes of prefetched files held at once
+DEFAULT_READERS = 4
+DEFAULT_MAX_INFLIGHT_BYTES = 256 * 1024 * 1024
+
+# End-of-discovery marker put on the queue by the background discovery thread
+_DONE = object()
+
+# Handler and crawler installed once per worker process by the pool initializer,
+# so they are pickled per worker instead of per batch
+_worker_handler = None
+_worker_crawler = None
+
+
+def analyze_cad_file(handler, crawler, file_path: str, root_path: str,
+                     data: Optional[bytes] = None) -> Tuple[ComponentMetadata, GeometricSignature]:
+    """
+    Analyze a single CAD file with the given handler.
+
+    Args:
+        handler: CADFileHandler used to parse the file
+        crawler: FileSystemCrawler used for project extraction
+        file_path: Full path to the CAD file
+        root_path: Root directory being scanned (for project extraction)
+        data: The file's bytes, if already read; parsed with handler.analyze_bytes
+
+    Returns:
+        Tuple of (ComponentMetadata, GeometricSignature)
+    """
+    if not handler.can_handle(file_path):
+        raise ValueError(f"Handler cannot process file: {file_path}")
+
+    # Extract project info from path
+    project_id = crawler.extract_project_info(Path(file_path), root_path)
+
+    if data is not None:
+        return handler.analyze_bytes(file_path, project_id, data)
+    return handler.analyze(file_path, project_id)
+
+
+def _init_worker(handler, crawler):
+    """Process pool initializer: keep the handler and crawler for later batches"""
+    global _worker_handler, _worker_crawler
+    if getattr(handler, 'metrics', None) is not None:
+        # Forked workers inherit the parent's samples (and maybe a held lock); record afresh
+        handler.metrics = RunMetrics(slowest=handler.metrics.slowest)
+    _worker_handler = handler
+    _worker_crawler = crawler
+
+
+def _analyze_batch(file_paths: List[str], root_path: str, contents: Optional[List[Optional[bytes]]] = None
+                   ) -> Tuple[List[FileResult], Optional[Dict[str, Any]]]:
+    """
+    Analyze a batch of files in a worker, capturing per-file errors.
+
+    contents optionally holds each file's prefetched bytes (None: read the
+    file). Returns the results and, when the handler records metrics, the
+    samples recorded in this worker since its last batch.
+    """
+    metrics: Optional[RunMetrics] = getattr(_worker_handler, 'metrics', None)
+    results = []
+    for index, file_path in enumerate(file_paths):
+        start = time.perf_counter()
+        data = contents[index] if contents is not None else None
+        results.append(_analyze_capturing(_worker_handler, _worker_crawler, file_path, root_path, data))
+        if metrics is not None:
+            metrics.file_done(file_path, time.perf_counter() - start)
+    return results, metrics.snapshot(reset=True) if metrics is not None else None
+
+
+def _analyze_capturing(handler, crawler, file_path: str, root_path: str, data: Optional[bytes]) -> FileResult:
+    """analyze_cad_file() with any error returned as the file's error"""
+    try:
+        metadata, signature = analyze_cad_file(handler, crawler, file_path, root_path, data)
+        return file_path, metadata, signature, None
+    except Exception as e:
+        return file_path, None, None, str(e)
+
+
+def _batches(file_paths: Iterable[str], batch_size: int) -> Iterator[List[str]]:
+    """Split an iterable of paths into lists of at most batch_size paths"""
+    iterator = iter(file_paths)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def analyze_files_parallel(handler, crawler, file_paths: Iterable[str], root_path: str,
+                           workers: int, batch_size: int = 64,
+                           lookup: Optional[Lookup] = None,
+                           metrics: Optional[RunMetrics] = None) -> Iterator[FileResult]:
+    """
+    Analyze files in a process pool, yielding results in input order.
+
+    Paths are consumed lazily and sent to the pool in batches. At most
+    2 * workers batches are in flight, so memory stays bounded no matter
+    how many files the iterable produces.
+
+    Args:
+        handler: CADFileHandler used to parse the files (pickled once per worker)
+        crawler: FileSystemCrawler used for project extraction
+        file_paths: Iterable of file paths, e.g. from FileSystemCrawler.discover_files
+        root_path: Root directory being scanned (for project extraction)
+        workers: Number of worker processes
+        batch_size: Number of files sent to a worker per task
+        lookup: Optional callable run in this process before a file is sent to
+            the pool; files it resolves are not parsed (see Lookup). Errors
+            it raises become the file's error
+        metrics: RunMetrics that receives the samples the handler and the
+            per-file timer record in the workers (the handler's own
+            metrics, if any, are copied to the workers empty)
+
+    Yields:
+        (file_path, metadata, signature, error) tuples; on failure metadata and
+        signature are None and error holds the message
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(handler, crawler)) as executor:
+        pending = deque()
+        for batch in _batches(file_paths, batch_size):
+            resolved = {}
+            if lookup is not None:
+                for file_path in batch:
+                    found = _lookup_capturing(lookup, file_path)
+                    if found is not None:
+                        resolved[file_path] = found
+
+            to_parse = [file_path for file_path in batch if file_path not in resolved]
+            future = executor.submit(_analyze_batch, to_parse, root_path) if to_parse else None
+            pending.append((batch, resolved, future))
+
+            if len(pending) >= max_pending:
+                yield from _merge_batch(*pending.popleft(), metrics)
+
+        while pending:
+            yield from _merge_batch(*pending.popleft(), metrics)
+
+
+def _merge_batch(batch: List[str], resolved: dict, future, metrics: Optional[RunMetrics]) -> Iterator[FileResult]:
+    """Yield a batch's results in input order, mixing resolved and parsed files"""
+    parsed = {}
+    if future is not None:
+        results, samples = future.result()
+        parsed = {result[0]: result for result in results}
+        if metrics is not None and samples is not None:
+            metrics.merge(samples)
+    for file_path in batch:
+        if file_path in resolved:
+            yield _resolved_result(file_path, resolved[file_path])
+        else:
+            yield parsed[file_path]
+
+
+def _lookup_capturing(lookup: Lookup, file_path: str):
+    """lookup(file_path), or the message of the error it raised"""
+    try:
+        return lookup(file_path)
+    except Exception as e:
+        return str(e)
+
+
+def _resolved_result(file_path: str, found) -> FileResult:
+    """Result of a file resolved by a lookup: an analysis, a deferred one, or an error message"""
+    if isinstance(found, str):
+        return file_path, None, None, found
+    if callable(found):
+        try:
+            found = found()
+        except Exception as e:
+            return file_path, None, None, str(e)
+    metadata, signature = found
+    return file_path, metadata, signature, None
+
+
+def analyze_files_pipelined(handler, crawler, entries: Iterable[FileEntry], root_path: str,
+                            workers: int = 1, readers: int = DEFAULT_READERS,
+                            max_inflight_bytes: int = DEFAULT_MAX_INFLIGHT_BYTES,
+                            max_inflight_files: Optional[int] = None, batch_size: int = 64,
+                            lookup: Optional[Lookup] = None,
+                            metrics: Optional[RunMetrics] = None) -> Iterator[FileResult]:
+    """
+    Analyze files in a staged pipeline, yielding results in input order.
+
+    Discovery runs in a background thread; reader threads read each file's
+    bytes into memory ahead of parsing; files are parsed in this thread
+    (workers=1) or in batches in a process pool, and results are merged
+    back in input order. File I/O (slow on network shares) so overlaps
+    with parsing.
+
+    Every stage is bounded: at most max_inflight_files files are between
+    discovery and the caller, and the prefetched bytes they hold stay within
+    max_inflight_bytes - when either limit is reached, no further file is
+    read until the oldest results have been yielded. Files larger than
+    max_inflight_bytes are not prefetched; the handler reads them itself,
+    as it does files whose read failed.
+
+    Args:
+        handler: CADFileHandler used to parse the files (pickled once per
+            worker); prefetched files are parsed with its analyze_bytes()
+        crawler: FileSystemCrawler used for project extraction
+        entries: Iterable of FileEntry, e.g. from FileSystemCrawler.iter_entries;
+            iterated in a background thread
+        root_path: Root directory being scanned (for project extraction)
+        workers: Number of worker processes; 1 parses in this thread
+        readers: Number of reader threads
+        max_inflight_bytes: Most bytes of prefetched files held at once
+        max_inflight_files: Most files between discovery and the caller
+            (default: 16 per reader thread, and at least two batches per worker)
+        batch_size: Number of files read and sent to a worker per task when
+            workers > 1
+        lookup: Optional callable run in this thread before a file is read;
+            files it resolves are not read or parsed (see Lookup). Errors it
+            raises become the file's error
+        metrics: RunMetrics that receives "read" times, the "result_wait"
+            time spent waiting for the oldest file's read (and parse, with
+            workers) and, with workers, the samples recorded in the workers
+
+    Yields:
+        (file_path, metadata, signature, error) tuples; on failure metadata and
+        signature are None and error holds the message
+    """
+    if readers < 1:
+        raise ValueError("readers must be at least 1")
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    if workers <= 1:
+        batch_size = 1
+    max_files = max_inflight_files or max(16 * readers, 2 * workers * batch_size)
+
+    parse_pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(handler, crawler)) if workers > 1 else None
+
+    def read(batch: List[Tuple[FileEntry, Any, bool]]):
+        """Reader thread: a batch's unresolved files and bytes, or with a pool, the future of their parse"""
+        file_paths, contents = [], []
+        for entry, found, prefetch in batch:
+            if found is not None:
+                continue
+            data = None
+            if prefetch:
+                try:
+                    with timed(metrics, 'read'):
+                        with open(entry.path, 'rb') as f:
+                            data = f.read()
+                except OSError:
+                    pass  # Left to the handler, which reports the error
+            file_paths.append(entry.path)
+            contents.append(data)
+        if parse_pool is not None:
+            return parse_pool.submit(_analyze_batch, file_paths, root_path, contents)
+        return file_paths, contents
+
+    def merge(batch: List[Tuple[FileEntry, Any, bool]], future) -> Iterator[FileResult]:
+        """Yield the oldest batch's results, waiting for its reads and parse"""
+        parsed = {}
+        if future is not None:
+            try:
+                with timed(metrics, 'result_wait'):
+                    loaded = future.result()
+                    if parse_pool is not None:
+                        results, samples = loaded.result()
+            except Exception as e:
+                loaded = None
+                results, samples = [(entry.path, None, None, str(e)) for entry, found, _ in batch
+                                    if found is None], None
+            if parse_pool is None and loaded is not None:
+                results = []
+                for file_path, data in zip(*loaded):
+                    start = time.perf_counter()
+                    results.append(_analyze_capturing(handler, crawler, file_path, root_path, data))
+                    if metrics is not None:
+                        metrics.file_done(file_path, time.perf_counter() - start)
+            elif metrics is not None and samples is not None:
+                metrics.merge(samples)
+            parsed = {result[0]: result for result in results}
+        for entry, found, _ in batch:
+            yield parsed[entry.path] if found is None else _resolved_result(entry.path, found)
+
+    # Readers submit to the parse pool, so they are shut down first
+    with parse_pool or nullcontext(), ThreadPoolExecutor(max_workers=readers,
+                                                         thread_name_prefix="cad-reader") as reading:
+        window = deque()  # (batch, read future, files, prefetched bytes) in input order
+        held_files = held_bytes = 0
+        batch, batch_bytes = [], 0
+
+        def submit():
+            nonlocal batch, batch_bytes, held_files, held_bytes
+            to_read = any(found is None for _, found, _ in batch)
+            window.append((batch, reading.submit(read, batch) if to_read else None, len(batch), batch_bytes))
+            held_files += len(batch)
+            held_bytes += batch_bytes
+            batch, batch_bytes = [], 0
+
+        for entry in _discover_ahead(entries, max_files):
+            found = _lookup_capturing(lookup, entry.path) if lookup is not None else None
+            prefetch = found is None and entry.size <= max_inflight_bytes
+            size = entry.size if prefetch else 0
+            if batch and batch_bytes + size > max_inflight_bytes:
+                submit()
+
+            # Backpressure: merge the oldest batches until this file fits
+            while window and (held_files + len(batch) + 1 > max_files or
+                              held_bytes + batch_bytes + size > max_inflight_bytes):
+                oldest, future, files, size_held = window.popleft()
+                held_files -= files
+                held_bytes -= size_held
+                yield from merge(oldest, future)
+
+            batch.append((entry, found, prefetch))
+            batch_bytes += size
+            if len(batch) >= batch_size:
+                submit()
+
+        if batch:
+            submit()
+        while window:
+            oldest, future, _, _ = window.popleft()
+            yield from merge(oldest, future)
+
+
+def _discover_ahead(entries: Iterable[FileEntry], lookahead: int) -> Iterator[FileEntry]:
+    """
+    Iterate entries in a background thread, at most lookahead entries ahead.
+
+    Closing the generator early stops the iteration.
+    """
+    iterator = iter(entries)
+    found = queue.Queue(maxsize=lookahead)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                found.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def discover():
+        try:
+            for entry in iterator:
+                if not put(entry):
+                    return
+        except BaseException as e:
+            put(e)
+        finally:
+            put(_DONE)
+
+    discovery_thread = threading.Thread(target=discover, name="cad-discovery", daemon=True)
+    discovery_thread.start()
+    try:
+        while True:
+            item = found.get()
+            if item is _DONE:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        discovery_thread.join()
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            close()
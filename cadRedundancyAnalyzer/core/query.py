@@ -0,0 +1,146 @@
+# cadRedundancyAnalyzer/core/query.py
+from typing import List, Tuple
+
+import numpy as np
+
+from cadRedundancyAnalyzer.core.candidates import RATIO_SLACK
+from cadRedundancyAnalyzer.core.vectorized import BatchScorer, SignatureStore
+
+# Rows scored per side in the first step of a query; each further step doubles it
+FIRST_BATCH = 64
+MAX_BATCH = 4096
+
+
+class SimilarityIndex:
+    """
+    Answers "which stored parts are most similar to this one" without scoring them all.
+
+    Rows are sorted by log-volume once. A query starts at its own volume and
+    walks outwards on both sides in growing batches; the volume ratio falls
+    with every step, and with it the best score any further row could reach
+    (its other terms at 1.0). The walk stops once that bound drops below the
+    threshold or below the k-th best score found. Rows sharing the query's
+    hash always score 1.0 and are looked up directly; rows whose terms are
+    not bounded by 1.0 (negative or non-finite values) are always scored.
+    """
+
+    def __init__(self, store: SignatureStore, scorer: BatchScorer):
+        """
+        Args:
+            store: Signature columns of the indexed parts
+            scorer: BatchScorer whose weights and descriptor threshold are used
+        """
+        self.store = store
+        self.scorer = scorer
+
+        regular = store.bounded() & np.isfinite(store.volume)
+        regular_rows = np.flatnonzero(regular)
+        with np.errstate(divide='ignore'):
+            log_volume = np.log(store.volume[regular_rows])
+        order = np.argsort(log_volume, kind='stable')
+        self._sorted_rows = regular_rows[order]
+        self._sorted_log = log_volume[order]
+        self._irregular_rows = np.flatnonzero(~regular)
+
+        self._hash_order = np.argsort(store.hash_codes, kind='stable')
+        self._sorted_hashes = store.hash_codes[self._hash_order]
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def query(self, query: SignatureStore, k: int = 10, threshold: float = 0.0) -> List[Tuple[int, float]]:
+        """
+        The k rows scoring highest against a query signature.
+
+        Args:
+            query: One-row store of the query, hash encoded like the indexed store
+            k: Number of rows to return at most
+            threshold: Minimum similarity score (0.0-1.0)
+
+        Returns:
+            (row, score) pairs, best first; equal scores in row order. Scores
+            are calculate_similarity(query, row).
+        """
+        if k <= 0 or not len(self.store):
+            return []
+
+        found = _TopK(k, threshold)
+        found.add(*self._score(query, self._same_hash(query)))
+        found.add(*self._score(query, self._irregular_rows))
+
+        volume = query.volume[0]
+        if not (query.bounded()[0] and np.isfinite(volume)):
+            # Unbounded query terms: no volume gap rules any row out
+            found.add(*self._score(query, self._sorted_rows))
+            return found.results()
+
+        with np.errstate(divide='ignore'):
+            log_volume = np.log(volume)
+        low = high = int(np.searchsorted(self._sorted_log, log_volume))
+        batch = FIRST_BATCH
+        while True:
+            gaps = []
+            if low > 0:
+                gaps.append(self._gap(log_volume, low - 1))
+            if high < len(self._sorted_rows):
+                gaps.append(self._gap(log_volume, high))
+            if not gaps or self._bound(min(gaps)) < found.cutoff():
+                return found.results()
+
+            start, end = max(0, low - batch), min(len(self._sorted_rows), high + batch)
+            rows = np.concatenate([self._sorted_rows[start:low], self._sorted_rows[high:end]])
+            found.add(*self._score(query, rows))
+            low, high = start, end
+            batch = min(2 * batch, MAX_BATCH)
+
+    def _same_hash(self, query: SignatureStore) -> np.ndarray:
+        """Rows whose hash code equals the query's"""
+        first = np.searchsorted(self._sorted_hashes, query.hash_codes[0], side='left')
+        last = np.searchsorted(self._sorted_hashes, query.hash_codes[0], side='right')
+        return self._hash_order[first:last]
+
+    def _gap(self, log_volume: float, position: int) -> float:
+        """|log-volume difference| to a sorted row; two zero volumes are no gap"""
+        other = self._sorted_log[position]
+        return 0.0 if other == log_volume else abs(log_volume - other)
+
+    def _bound(self, gap: float) -> float:
+        """Best score a row this far from the query in log-volume can reach"""
+        volume_ratio = min(1.0, np.exp(-gap) + RATIO_SLACK)
+        return self.scorer.volume_weight * volume_ratio + self.scorer.area_weight + self.scorer.bbox_weight
+
+    def _score(self, query: SignatureStore, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows, scores) of the query against some rows, the query on the left"""
+        if not len(rows):
+            return rows, np.empty(0)
+        pairs = SignatureStore.concatenate([query, self.store.take(rows)])
+        return rows, self.scorer.score_one_vs_many(pairs, 0, np.arange(1, len(rows) + 1))
+
+
+class _TopK:
+    """The best (row, score) pairs seen so far, rows counted once"""
+
+    def __init__(self, k: int, threshold: float):
+        self.k = k
+        self.threshold = threshold
+        self._rows = np.empty(0, dtype=np.intp)
+        self._scores = np.empty(0)
+
+    def add(self, rows: np.ndarray, scores: np.ndarray):
+        kept = scores >= self.threshold
+        rows = np.concatenate([self._rows, rows[kept]])
+        scores = np.concatenate([self._scores, scores[kept]])
+        rows, first = np.unique(rows, return_index=True)
+        scores = scores[first]
+        # Best first, then by row; keep only the top k
+        order = np.lexsort((rows, -scores))[:self.k]
+        self._rows, self._scores = rows[order], scores[order]
+
+    def cutoff(self) -> float:
+        """Score a further row has to reach to make the results"""
+        if len(self._scores) < self.k:
+            return self.threshold
+        return max(self.threshold, self._scores[-1])
+
+    def results(self) -> List[Tuple[int, float]]:
+        return [(int(row), float(score)) for row, score in zip(self._rows, self._scores)]
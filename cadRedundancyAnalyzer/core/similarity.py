@@ -1,11 +1,105 @@
 # cadRedundancyAnalyzer/core/similarity.py
-from typing import List, Tuple
-from cadRedundancyAnalyzer.core.models import GeometricSignature
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from cadRedundancyAnalyzer.core.blocked import DEFAULT_TILE_SIZE, SpilledEdges, asymmetric_rows, \
+    stream_matching_edges
+from cadRedundancyAnalyzer.core.candidates import CandidateIndex
+from cadRedundancyAnalyzer.core.grouping import GroupSummary, UnionFind
+from cadRedundancyAnalyzer.core.metrics import RunMetrics, timed
+from cadRedundancyAnalyzer.core.models import GeometricSignature, ShapeDescriptor
+from cadRedundancyAnalyzer.core.vectorized import CASCADE_STAGES, WEIGHTED_STAGES, BatchScorer, SignatureStore
+
+# Weights of the similarity score (volume is most important for duplicate detection)
+VOLUME_WEIGHT = 0.5
+AREA_WEIGHT = 0.3
+BBOX_WEIGHT = 0.2
+WEIGHTS = (VOLUME_WEIGHT, AREA_WEIGHT, BBOX_WEIGHT)
+
+ENGINES = ("vectorized", "scalar")
+GROUPINGS = ("seed", "components")
+
+# Cheapest terms first; the descriptor comparison is the heaviest stage
+DEFAULT_CASCADE = ("volume", "area", "bbox", "descriptor")
+
+
+@dataclass
+class MatchStats:
+    """Work counters of the last find_duplicates run"""
+    parts: int = 0
+    exact_groups: int = 0  # geometric_hash buckets with more than one part
+    exact_copies: int = 0  # parts folded into their bucket's representative
+    pairs_skipped: int = 0  # pairs never considered thanks to the exact-duplicate pre-pass
+    pairs_scored: int = 0
+    # Candidate pairs dropped per cascade stage, and under "score" by the full score
+    stage_rejections: Dict[str, int] = field(default_factory=dict)
 
 
 class SimilarityDetector:
     """Detects similar and duplicate components based on geometric signatures"""
 
+    def __init__(self, engine: str = "vectorized", exact_prepass: bool = True,
+                 use_descriptors: bool = False, descriptor_threshold: float = 0.8,
+                 cascade: Sequence[str] = DEFAULT_CASCADE, grouping: str = "seed",
+                 canonical_order: bool = False, workers: int = 1, tile_size: int = DEFAULT_TILE_SIZE,
+                 metrics: Optional[RunMetrics] = None):
+        """
+        Args:
+            engine: How find_duplicates scores candidate pairs. "vectorized"
+                (default) scores each part against its candidates in one NumPy
+                batch; "scalar" calls calculate_similarity per pair. Both give
+                identical scores.
+            exact_prepass: Bucket parts by geometric_hash before fuzzy matching
+                and match only one representative per bucket
+            use_descriptors: Score pairs that both carry a ShapeDescriptor
+                pose-invariantly: principal extents replace the axis-aligned
+                bounding box dimensions, and pairs whose descriptor similarity
+                is below descriptor_threshold score 0.0
+            descriptor_threshold: Minimum descriptor similarity (0.0-1.0) for
+                a pair to be scored at all when use_descriptors is on
+            cascade: Stages find_duplicates runs on each candidate pair before
+                its full score, in order: "volume", "area" and "bbox" compute
+                one term and drop the pair if it cannot reach the threshold
+                with its remaining terms at 1.0, "descriptor" drops pairs
+                rejected by their shape descriptors. Groups are the same for
+                any order; an empty cascade scores every candidate in full.
+            grouping: "seed" (default) groups each ungrouped part with the
+                ungrouped parts it matches, in turn; "components" groups parts
+                connected by any chain of matches, whatever order they come in
+            canonical_order: Process and list parts in name order instead of
+                input order, so the groups of either grouping are the same
+                for any input order
+            workers: Number of worker processes scoring pairs. 1 (default)
+                scores in this process; more splits the pairs into tiles of
+                tile_size x tile_size, scored in a process pool that reads the
+                signature columns from shared memory. Groups are the same.
+            tile_size: Rows per tile when workers > 1
+            metrics: Optional RunMetrics that receives "exact_prepass" and
+                "match" stage times and the pair counters of every run
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown similarity engine: {engine}")
+        if grouping not in GROUPINGS:
+            raise ValueError(f"Unknown grouping: {grouping}")
+        for stage in cascade:
+            if stage not in CASCADE_STAGES:
+                raise ValueError(f"Unknown cascade stage: {stage}")
+        self.engine = engine
+        self.exact_prepass = exact_prepass
+        self.use_descriptors = use_descriptors
+        self.descriptor_threshold = descriptor_threshold
+        self.cascade = tuple(cascade)
+        self.grouping = grouping
+        self.canonical_order = canonical_order
+        self.workers = workers
+        self.tile_size = tile_size
+        self.metrics = metrics
+        self.stats = MatchStats()
+        self.summaries: List[GroupSummary] = []
+
     def calculate_similarity(self, sig1: GeometricSignature, sig2: GeometricSignature) -> float:
         """
         Calculate similarity score between two geometric signatures.
@@ -16,19 +110,119 @@ class SimilarityDetector:
             return 1.0
 
         # Calculate similarity based on volume, surface area, and bounding box
-        volume_similarity = self._calculate_property_similarity(sig1.volume, sig2.volume)
-        area_similarity = self._calculate_property_similarity(sig1.surface_area, sig2.surface_area)
-        bbox_similarity = self._calculate_bounding_box_similarity(sig1.bounding_box, sig2.bounding_box)
-
-        # Weighted average (volume is most important for duplicate detection)
-        similarity = (
-                0.5 * volume_similarity +
-                0.3 * area_similarity +
-                0.2 * bbox_similarity
+        descriptors = self._comparable_descriptors(sig1, sig2)
+        similarity = self._weighted_similarity(
+            *(self._calculate_term(stage, sig1, sig2, descriptors) for stage in WEIGHTED_STAGES)
         )
 
+        # Parts whose shapes clearly differ are rejected whatever their sizes
+        if self._shape_rejected(descriptors):
+            return 0.0
+
         return similarity
 
+    def _cascade_match(self, sig1: GeometricSignature, sig2: GeometricSignature,
+                       threshold: float) -> Optional[float]:
+        """
+        calculate_similarity(sig1, sig2) if it reaches the threshold, else None,
+        running the cascade stages before the full score and counting their rejections.
+        """
+        if sig1.geometric_hash == sig2.geometric_hash:
+            return 1.0 if 1.0 >= threshold else None
+
+        descriptors = self._comparable_descriptors(sig1, sig2)
+        # A term can only exceed 1.0 for negative values, which void the bounds
+        gated = self._bounded(sig1) and self._bounded(sig2)
+        rejections = self.stats.stage_rejections
+        terms = {}
+
+        for stage in self.cascade:
+            if stage == "descriptor":
+                # A rejected pair scores 0.0, which only fails a positive threshold
+                rejected = threshold > 0 and self._shape_rejected(descriptors)
+            else:
+                terms[stage] = self._calculate_term(stage, sig1, sig2, descriptors)
+                rejected = gated and self._weighted_similarity(
+                    *(terms.get(name, 1.0) for name in WEIGHTED_STAGES)
+                ) < threshold
+            if rejected:
+                rejections[stage] = rejections.get(stage, 0) + 1
+                return None
+
+        similarity = self._weighted_similarity(*(
+            terms[stage] if stage in terms else self._calculate_term(stage, sig1, sig2, descriptors)
+            for stage in WEIGHTED_STAGES
+        ))
+        if "descriptor" not in self.cascade and self._shape_rejected(descriptors):
+            similarity = 0.0
+
+        if similarity >= threshold:
+            return similarity
+        rejections["score"] = rejections.get("score", 0) + 1
+        return None
+
+    @staticmethod
+    def _weighted_similarity(volume_similarity: float, area_similarity: float, bbox_similarity: float) -> float:
+        """Weighted average of the three terms (volume is most important for duplicate detection)"""
+        return (
+                VOLUME_WEIGHT * volume_similarity +
+                AREA_WEIGHT * area_similarity +
+                BBOX_WEIGHT * bbox_similarity
+        )
+
+    def _calculate_term(self, stage: str, sig1: GeometricSignature, sig2: GeometricSignature,
+                        descriptors: Optional[Tuple[ShapeDescriptor, ShapeDescriptor]]) -> float:
+        """One weighted term of the score ("volume", "area" or "bbox")"""
+        if stage == "volume":
+            return self._calculate_property_similarity(sig1.volume, sig2.volume)
+        if stage == "area":
+            return self._calculate_property_similarity(sig1.surface_area, sig2.surface_area)
+        if descriptors:
+            # Principal extents do not change when the part is rotated
+            return self._calculate_dimension_similarity(
+                descriptors[0].principal_extents, descriptors[1].principal_extents
+            )
+        return self._calculate_bounding_box_similarity(sig1.bounding_box, sig2.bounding_box)
+
+    def _shape_rejected(self, descriptors: Optional[Tuple[ShapeDescriptor, ShapeDescriptor]]) -> bool:
+        """Whether comparable descriptors are too dissimilar for the pair to score"""
+        return bool(descriptors) and self.calculate_descriptor_similarity(*descriptors) < self.descriptor_threshold
+
+    @staticmethod
+    def _bounded(sig: GeometricSignature) -> bool:
+        """Whether no ratio term of the signature can exceed 1.0 (see SignatureStore.bounded)"""
+        bbox = sig.bounding_box
+        values = [sig.volume, sig.surface_area, bbox[3] - bbox[0], bbox[4] - bbox[1], bbox[5] - bbox[2]]
+        if sig.descriptor is not None:
+            values.extend(sig.descriptor.principal_extents)
+        return not any(value < 0 for value in values)
+
+    def calculate_descriptor_similarity(self, descriptor1: ShapeDescriptor, descriptor2: ShapeDescriptor) -> float:
+        """
+        Similarity of two shape descriptors (0.0-1.0): the mean of the D2
+        histogram intersection and the mean inertia eigenvalue ratio.
+        """
+        intersection = 0.0
+        for value1, value2 in zip(descriptor1.d2_histogram, descriptor2.d2_histogram):
+            intersection += min(value1, value2)
+
+        inertia_similarity = (
+            self._calculate_property_similarity(descriptor1.inertia[0], descriptor2.inertia[0]) +
+            self._calculate_property_similarity(descriptor1.inertia[1], descriptor2.inertia[1]) +
+            self._calculate_property_similarity(descriptor1.inertia[2], descriptor2.inertia[2])
+        ) / 3
+
+        return (intersection + inertia_similarity) / 2
+
+    def _comparable_descriptors(self, sig1: GeometricSignature,
+                                sig2: GeometricSignature) -> Optional[Tuple[ShapeDescriptor, ShapeDescriptor]]:
+        """Both descriptors, if descriptors are used and the pair has comparable ones"""
+        if not self.use_descriptors or sig1.descriptor is None or sig2.descriptor is None:
+            return None
+        if len(sig1.descriptor.d2_histogram) != len(sig2.descriptor.d2_histogram):
+            return None
+        return sig1.descriptor, sig2.descriptor
+
     def _calculate_property_similarity(self, val1: float, val2: float) -> float:
         """Calculate similarity between two numeric properties"""
         if val1 == 0 and val2 == 0:
@@ -57,7 +251,10 @@ class SimilarityDetector:
             bbox2[4] - bbox2[1],
             bbox2[5] - bbox2[2]
         )
+        return self._calculate_dimension_similarity(dims1, dims2)
 
+    def _calculate_dimension_similarity(self, dims1: tuple, dims2: tuple) -> float:
+        """Calculate similarity between two sets of three dimensions"""
         # Compare each dimension
         similarities = []
         for d1, d2 in zip(dims1, dims2):
@@ -77,6 +274,19 @@ class SimilarityDetector:
         """
         Find groups of duplicate/similar components.
 
+        Each ungrouped part in turn seeds a group of the ungrouped parts similar
+        to it. Only the candidates returned by a CandidateIndex are scored; the
+        index never drops a pair that could reach the threshold, so the groups
+        are the same as comparing every pair.
+
+        With exact_prepass, parts sharing a geometric_hash (and, when scoring
+        on descriptors, a descriptor) always end up in the same group (they
+        score 1.0 against each other), so each such bucket is matched through
+        its first part only and expanded afterwards.
+        Candidate pairs go through the `cascade` stages before being scored
+        in full. Counters of the run are kept in `stats`, and a GroupSummary
+        of each returned group, in the same order, in `summaries`.
+
         Args:
             signatures: List of (filename, GeometricSignature) tuples
             threshold: Similarity threshold (0.0-1.0). Default 0.95 means 95% similar
@@ -84,32 +294,274 @@ class SimilarityDetector:
         Returns:
             List of groups, where each group is a list of filenames that are similar
         """
-        if not signatures:
-            return []
+        names = [name for name, _ in signatures]
+        store = SignatureStore.from_signatures([sig for _, sig in signatures], descriptors=self.use_descriptors)
+        return self.find_duplicates_in_store(names, store, threshold)
 
-        # Track which parts have been grouped
-        grouped = set()
-        duplicate_groups = []
+    def find_duplicates_in_store(self, names: Sequence[str], store: SignatureStore,
+                                 threshold: float = 0.95) -> List[List[str]]:
+        """
+        Find groups of duplicate/similar components from signature columns.
+
+        Same grouping as find_duplicates, for callers that already hold their
+        signatures as columns (such as a ComponentTable), so no per-part
+        signature objects are built.
 
-        # Compare each part with every other part
-        for i, (file1, sig1) in enumerate(signatures):
-            if file1 in grouped:
+        Args:
+            names: Name of each row of the store
+            store: Signature columns
+            threshold: Similarity threshold (0.0-1.0)
+
+        Returns:
+            List of groups, where each group is a list of names that are similar
+        """
+        self.summaries = list(self.iter_duplicates_in_store(names, store, threshold))
+        return [summary.members for summary in self.summaries]
+
+    def iter_duplicates_in_store(self, names: Sequence[str], store: SignatureStore,
+                                 threshold: float = 0.95) -> Iterator[GroupSummary]:
+        """
+        Yield the GroupSummary of each group of find_duplicates_in_store as
+        soon as the group is complete, in the same order.
+
+        With seed grouping a group is complete once its seed has been
+        matched, so groups stream out while matching goes on and none are
+        kept here; component grouping yields only after every pair has been
+        scored. `stats` are complete, and the metrics recorded, once the
+        generator is exhausted. The "match" stage time excludes the time
+        spent by the consumer between groups.
+        """
+        self.stats = MatchStats(parts=len(store))
+        self.summaries = []
+        if not len(store):
+            return
+
+        if self.canonical_order:
+            order = np.array(sorted(range(len(names)), key=names.__getitem__), dtype=np.intp)
+            names = [names[row] for row in order]
+            store = store.take(order)
+
+        # Membership is tracked per name, so repeated names cannot be folded
+        if self.exact_prepass and len(set(names)) == len(names):
+            with timed(self.metrics, 'exact_prepass'):
+                buckets = [rows.tolist() for rows in store.hash_buckets(self.use_descriptors)]
+        else:
+            buckets = [[row] for row in range(len(store))]
+
+        representatives = [rows[0] for rows in buckets]
+        copies = len(store) - len(representatives)
+        self.stats.exact_groups = sum(1 for rows in buckets if len(rows) > 1)
+        self.stats.exact_copies = copies
+        self.stats.pairs_skipped = len(store) * (len(store) - 1) // 2 - \
+            len(representatives) * (len(representatives) - 1) // 2
+
+        start = time.perf_counter()
+        groups = iter(self._match_groups(
+            [names[row] for row in representatives],
+            store.take(np.array(representatives, dtype=np.intp)) if copies else store,
+            [len(rows) for rows in buckets],
+            threshold
+        ))
+        matching = time.perf_counter() - start
+
+        while True:
+            start = time.perf_counter()
+            found = next(groups, None)
+            matching += time.perf_counter() - start
+            if found is None:
+                break
+
+            # Expand representatives back into their buckets, keeping input order
+            group, representative, scores = found
+            seed, others = group[0], group[1:]
+            rows = buckets[seed][1:] + [row for other in others for row in buckets[other]]
+            members = [names[buckets[seed][0]]] + [names[row] for row in sorted(rows)]
+
+            # Exact copies score 1.0 against each other
+            if any(len(buckets[row]) > 1 for row in group):
+                scores.append(1.0)
+            yield GroupSummary(members, names[buckets[representative][0]], min(scores), max(scores))
+
+        if self.metrics is not None:
+            self.metrics.record('match', matching)
+            self._record_stats(len(representatives))
+
+    def _record_stats(self, representatives: int):
+        """Add the run's counters to the metrics; pruned pairs are representative pairs never scored"""
+        metrics = self.metrics
+        metrics.count('parts', self.stats.parts)
+        metrics.count('exact_copies', self.stats.exact_copies)
+        metrics.count('pairs_skipped', self.stats.pairs_skipped)
+        metrics.count('pairs_scored', self.stats.pairs_scored)
+        metrics.count('pairs_pruned', max(0, representatives * (representatives - 1) // 2 - self.stats.pairs_scored))
+        for stage, rejected in self.stats.stage_rejections.items():
+            metrics.count(f'rejected_{stage}', rejected)
+
+    def _match_groups(self, names: List[str], store: SignatureStore, multiplicity: List[int],
+                      threshold: float) -> Iterable[Tuple[List[int], int, List[float]]]:
+        """
+        Fuzzy-match parts into groups of (row indices, representative row,
+        scores of the matches that formed the group)
+        """
+        scorer = BatchScorer(WEIGHTS, self.descriptor_threshold if self.use_descriptors else None)
+        if self.workers > 1:
+            # Every matching pair is scored up front, tile by tile
+            if self.grouping == "components":
+                return self._component_groups(names, multiplicity, self._tile_edges(store, threshold, scorer))
+            return self._spilled_seed_groups(names, multiplicity, store, threshold, scorer)
+
+        # Only pairs inside the ratio bands of the threshold can match
+        index = CandidateIndex(store, threshold, WEIGHTS, use_descriptors=self.use_descriptors)
+        match = self._candidate_matcher(store, threshold, scorer)
+        if self.grouping == "components":
+            return self._component_groups(names, multiplicity, self._candidate_edges(len(names), index, match))
+        return self._seed_groups(names, multiplicity, index, match)
+
+    def _tile_edges(self, store: SignatureStore, threshold: float,
+                    scorer: BatchScorer) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Matching pairs scored in worker processes, earlier row first, as each tile comes back"""
+        for sources, targets, scores, pairs in stream_matching_edges(
+                store, threshold, scorer, self.workers, self.tile_size):
+            self.stats.pairs_scored += pairs
+            forward = sources < targets
+            yield sources[forward], targets[forward], scores[forward]
+
+    def _spilled_seed_groups(self, names: Sequence[str], multiplicity: Sequence[int], store: SignatureStore,
+                             threshold: float, scorer: BatchScorer) -> Iterator[Tuple[List[int], int, List[float]]]:
+        """
+        Seed grouping over edges scored in worker processes.
+
+        A seed only ever adds later rows: an earlier ungrouped row has
+        already failed to match it, and scores only differ by direction for
+        rows with NaN values. So only those edges are kept, spilled to disk
+        by source row until the seed pass reads them back in row order.
+        """
+        asymmetric = asymmetric_rows(store)
+        with SpilledEdges(len(store)) as edges:
+            for sources, targets, scores, pairs in stream_matching_edges(
+                    store, threshold, scorer, self.workers, self.tile_size):
+                self.stats.pairs_scored += pairs
+                needed = (sources < targets) | asymmetric[sources] | asymmetric[targets]
+                edges.add(sources[needed], targets[needed], scores[needed])
+            yield from self._seed_groups(names, multiplicity, edges, edges.match)
+
+    @staticmethod
+    def _candidate_edges(size: int, index: CandidateIndex,
+                         match: Callable[[int, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+                         ) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Matching candidate pairs, each scored once with the earlier row first"""
+        for i in range(size):
+            rows = index.candidates(i)
+            matched, scores = match(i, rows[rows > i])
+            if len(matched):
+                yield np.full(len(matched), i, dtype=np.intp), matched, scores
+
+    def _candidate_matcher(self, store: SignatureStore, threshold: float,
+                           scorer: BatchScorer) -> Callable[[int, np.ndarray], Tuple[np.ndarray, np.ndarray]]:
+        """Function scoring a part against candidate rows with the configured engine"""
+        if self.engine == "vectorized":
+            bounded = store.bounded()
+
+            def match(row: int, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+                self.stats.pairs_scored += len(rows)
+                return scorer.match_one_vs_many(store, row, rows, threshold, self.cascade,
+                                                self.stats.stage_rejections, bounded, with_scores=True)
+        else:
+            sigs = [store.signature(row) for row in range(len(store))]
+
+            def match(row: int, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+                self.stats.pairs_scored += len(rows)
+                scored = [(j, self._cascade_match(sigs[row], sigs[j], threshold)) for j in rows]
+                matched = [(j, score) for j, score in scored if score is not None]
+                return (np.array([j for j, _ in matched], dtype=np.intp),
+                        np.array([score for _, score in matched], dtype=np.float64))
+
+        return match
+
+    def _seed_groups(self, names: Sequence[str], multiplicity: Sequence[int],
+                     index: Union[CandidateIndex, SpilledEdges],
+                     match: Callable[[int, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+                     ) -> Iterator[Tuple[List[int], int, List[float]]]:
+        """
+        Greedy grouping: each ungrouped part seeds a group of the ungrouped
+        candidates it matches. Membership is tracked per name, as a part
+        name can only ever join one group. A seed standing for several exact
+        copies forms a group even without fuzzy matches. Later seeds can
+        never join a finished group, so each is yielded as soon as it forms.
+        """
+        row_names = self._name_ids(names)
+        grouped = np.zeros(row_names.max() + 1, dtype=bool)
+
+        for i in range(len(names)):
+            if grouped[row_names[i]]:
                 continue
 
-            # Start a new group with this part
-            current_group = [file1]
+            # Score the seed against its ungrouped candidates
+            rows = index.candidates(i)
+            rows = rows[~grouped[row_names[rows]]]
+            matched, scores = match(i, rows)
 
-            # Find all similar parts
-            for j, (file2, sig2) in enumerate(signatures):
-                if i != j and file2 not in grouped:
-                    similarity = self.calculate_similarity(sig1, sig2)
-                    if similarity >= threshold:
-                        current_group.append(file2)
-                        grouped.add(file2)
+            # A repeated name only joins once, at its first match
+            _, first = np.unique(row_names[matched], return_index=True)
+            first = np.sort(first)
+            matched, scores = matched[first], scores[first]
 
             # Only add groups with duplicates (size > 1)
-            if len(current_group) > 1:
-                duplicate_groups.append(current_group)
-                grouped.add(file1)
+            if len(matched) or multiplicity[i] > 1:
+                grouped[row_names[matched]] = True
+                grouped[row_names[i]] = True
+                yield [i] + matched.tolist(), i, scores.tolist()
+
+    def _component_groups(self, names: Sequence[str], multiplicity: Sequence[int],
+                          edges: Iterable[Tuple[np.ndarray, np.ndarray, np.ndarray]]
+                          ) -> List[Tuple[List[int], int, List[float]]]:
+        """
+        Transitive grouping: every matching pair is an edge, and groups are
+        the connected components, built with union-find over part names.
+        Edges are merged batch by batch as they arrive and not kept; each
+        pair must come once, scored earlier part first. A group lists the
+        first row of each name in row order, its lowest and highest match
+        score, and as representative the member with the most matches (the
+        earliest on ties).
+        """
+        row_names = self._name_ids(names)
+        components = UnionFind(row_names.max() + 1)
+        matches = np.zeros(len(names), dtype=np.int64)
+        lowest = np.full(len(names), np.inf)
+        highest = np.full(len(names), -np.inf)
+
+        for sources, targets, scores in edges:
+            for i, j in zip(row_names[sources].tolist(), row_names[targets].tolist()):
+                components.union(i, j)
+            np.add.at(matches, sources, 1)
+            np.add.at(matches, targets, 1)
+            np.minimum.at(lowest, sources, scores)
+            np.maximum.at(highest, sources, scores)
+
+        # Members of each component, in order of their first row
+        members = {}
+        seen = np.zeros(len(row_names), dtype=bool)
+        for row in range(len(names)):
+            if not seen[row_names[row]]:
+                seen[row_names[row]] = True
+                members.setdefault(components.find(row_names[row]), []).append(row)
+
+        score_range = {}
+        for row in np.flatnonzero(np.isfinite(lowest)).tolist():
+            root = components.find(row_names[row])
+            low, high = score_range.get(root, (np.inf, -np.inf))
+            score_range[root] = (min(low, lowest[row]), max(high, highest[row]))
+
+        duplicate_groups = []
+        for root, rows in members.items():
+            if len(rows) > 1 or multiplicity[rows[0]] > 1:
+                representative = max(rows, key=lambda row: (matches[row], -row))
+                scores = [float(score) for score in score_range[root]] if root in score_range else []
+                duplicate_groups.append((rows, representative, scores))
+        return duplicate_groups
 
-        return duplicate_groups
\ No newline at end of file
+    @staticmethod
+    def _name_ids(names: Sequence[str]) -> np.ndarray:
+        """An integer id per row, shared by the rows of one name"""
+        name_ids = {}
+        return np.array([name_ids.setdefault(name, len(name_ids)) for name in names], dtype=np.intp)
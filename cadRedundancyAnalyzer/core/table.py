@@ -0,0 +1,975 @@
+# cadRedundancyAnalyzer/core/table.py
+import hashlib
+import json
+import math
+import os
+from collections.abc import MutableMapping, Sequence
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature, ShapeDescriptor
+from cadRedundancyAnalyzer.core.vectorized import DescriptorColumns, SignatureStore
+
+# Binary width of a geometric hash (an MD5 hex digest)
+HASH_BYTES = 16
+HASH_DTYPE = np.dtype(f'V{HASH_BYTES}')
+
+# Bounds, volume and surface area are stored in single precision
+GEOMETRY_DTYPE = np.float32
+
+# Optional ComponentMetadata fields, only stored for the rows that set them
+_OPTIONAL_FIELDS = ('part_number', 'description', 'material', 'weight')
+
+_INITIAL_CAPACITY = 1024
+_GROWTH = 1.5
+
+# The table is compacted once more than this fraction of its rows are removed
+_DEAD_FRACTION = 0.25
+# Directories remembered for interning; paths of one directory tend to arrive together
+_DIRECTORY_CACHE = 256
+
+# Project of a component whose signature was set without metadata, as for files directly under the root
+_UNKNOWN_PROJECT = "Unknown"
+
+# Saved index: a directory with one .npy file per column and a JSON header,
+# written last, that lists the columns and holds the interned projects
+INDEX_FORMAT = 'cad-redundancy-index'
+INDEX_VERSION = 3
+_HEADER = 'header.json'
+
+
+def _encode(text: str) -> bytes:
+    return text.encode('utf-8', 'surrogatepass')
+
+
+def _decode(data: bytes) -> str:
+    return data.decode('utf-8', 'surrogatepass')
+
+
+def _split_path(path: str) -> int:
+    """Index where the file name starts (after the last '/' or '\\')"""
+    return max(path.rfind('/'), path.rfind('\\')) + 1
+
+
+def _path_hash(path: str) -> int:
+    # 32 bits are enough to narrow a lookup down; paths are compared to confirm it
+    return int.from_bytes(hashlib.blake2b(_encode(path), digest_size=4).digest(), 'little')
+
+
+def _reserve(array: np.ndarray, size: int) -> np.ndarray:
+    """The array, or a grown copy of it, with room for at least size rows"""
+    if len(array) >= size:
+        return array
+    grown = np.empty((max(size, _INITIAL_CAPACITY, int(len(array) * _GROWTH)),) + array.shape[1:],
+                     dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def encode_geometric_hash(geometric_hash: str) -> bytes:
+    """
+    Binary form of a geometric hash: the bytes of an MD5 hex digest, or a
+    digest of any other string (which then has to be kept separately).
+    """
+    try:
+        binary = bytes.fromhex(geometric_hash)
+    except (TypeError, ValueError):
+        binary = None
+    if binary is None or len(binary) != HASH_BYTES or binary.hex() != geometric_hash:
+        binary = hashlib.blake2b(str(geometric_hash).encode('utf-8', 'surrogatepass'),
+                                 digest_size=HASH_BYTES).digest()
+    return binary
+
+
+def _same_volume(value, volume: float) -> bool:
+    """Whether a metadata volume is the signature volume, and so can be read back from its column"""
+    if value is None or isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    return value == volume or (math.isnan(value) and math.isnan(volume))
+
+
+def _geometry(values) -> np.ndarray:
+    """Signature values as the table stores them, widened back to float64 for scoring"""
+    return np.asarray(values, dtype=GEOMETRY_DTYPE).astype(np.float64)
+
+
+class _Strings:
+    """
+    Strings stored back to back in one UTF-8 byte array, found through an offsets array.
+
+    Offsets are 32-bit until the bytes outgrow them, then 64-bit.
+    """
+
+    def __init__(self, data: Optional[np.ndarray] = None, offsets: Optional[np.ndarray] = None):
+        self._data = data if data is not None else np.empty(0, dtype=np.uint8)
+        self._offsets = offsets if offsets is not None else np.zeros(1, dtype=np.uint32)
+        self._count = len(self._offsets) - 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> str:
+        return _decode(self._data[self._offsets[index]:self._offsets[index + 1]].tobytes())
+
+    @property
+    def nbytes(self) -> int:
+        return self._data.nbytes + self._offsets.nbytes
+
+    def append(self, text: str) -> int:
+        """Add a string and return its index"""
+        encoded = np.frombuffer(_encode(text), dtype=np.uint8)
+        start = int(self._offsets[self._count])
+        end = start + len(encoded)
+        self._data = _reserve(self._data, end)
+        self._data[start:end] = encoded
+        if end > np.iinfo(self._offsets.dtype).max:
+            self._offsets = self._offsets.astype(np.int64)
+        self._offsets = _reserve(self._offsets, self._count + 2)
+        self._offsets[self._count + 1] = start + len(encoded)
+        self._count += 1
+        return self._count - 1
+
+    def take(self, indices: np.ndarray) -> '_Strings':
+        """The strings at some indices, in that order, copied into new arrays"""
+        starts = self._offsets[indices].astype(np.int64)
+        lengths = self._offsets[indices + 1] - starts
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        # Position of every kept byte in the old array
+        positions = np.arange(offsets[-1]) + np.repeat(starts - offsets[:-1], lengths)
+        if offsets[-1] <= np.iinfo(np.uint32).max:
+            offsets = offsets.astype(np.uint32)
+        return _Strings(self._data[positions], offsets)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(bytes, offsets) in use, for saving"""
+        return self._data[:self._offsets[self._count]], self._offsets[:self._count + 1]
+
+    def trim(self):
+        """Drop the room reserved for more strings"""
+        data, offsets = self.arrays()
+        if len(data) < len(self._data) or len(offsets) < len(self._offsets):
+            self._data, self._offsets = data.copy(), offsets.copy()
+
+
+class ComponentTable:
+    """
+    Columnar storage of analyzed components, keyed by file path.
+
+    Signatures live in NumPy columns (bounds, volume and surface area in
+    single precision, so they read back rounded to float32, and the
+    geometric hash as 16 binary bytes), and paths are kept as a directory
+    code plus a file name, with directories and file names each in one
+    UTF-8 byte array - no Python object is kept per component. Project IDs
+    are interned and held per directory entry, as the files of a directory
+    share their project. Values a column cannot hold (optional metadata, a file name
+    that differs from the path, a hash that is not an MD5 hex digest) are
+    kept per row in a side dictionary. Shape descriptor columns are only
+    allocated once a signature carries one.
+
+    Rows are numbered in insertion order; adding an existing path replaces
+    its row. Removing a component only marks its row as removed, so other
+    row numbers stay valid; once a quarter of the rows are removed (or on
+    save()) the table is compacted and the rows renumbered. rows() lists the
+    rows in use, and components(), signatures() and paths() give list- and
+    dict-like views of them. Columns grow with room to spare; trim() hands
+    the spare room back once a scan is done.
+    """
+
+    def __init__(self):
+        self.version = 0  # bumped on every change, so derived indexes can tell they are stale
+        self.generation = 0  # bumped when rows are replaced, removed or renumbered, not on appends
+        self._size = 0  # rows numbered so far, removed ones included
+        self._capacity = 0
+        self._dead = 0
+        self._alive: Optional[np.ndarray] = None  # allocated on the first removal
+        self._live_rows: Optional[Tuple[int, np.ndarray]] = None  # (version, rows()) when rows are removed
+        self._bounds = np.empty((0, 6), dtype=GEOMETRY_DTYPE)
+        self._volume = np.empty(0, dtype=GEOMETRY_DTYPE)
+        self._surface_area = np.empty(0, dtype=GEOMETRY_DTYPE)
+        self._hashes = np.empty(0, dtype=HASH_DTYPE)
+        self._directory_codes = np.empty(0, dtype=np.int32)
+        self._names = _Strings()  # file name of every row
+        # Directory entries: a directory and the project of the files under it
+        self._directories = _Strings()
+        self._directory_projects = np.empty(0, dtype=np.int32)
+        self._directory_cache: Dict[Tuple[str, int], int] = {}
+
+        self._projects: List[Optional[str]] = []
+        self._project_ids: Dict[Optional[str], int] = {}
+        self._extras: Dict[int, Dict[str, Any]] = {}
+        self._descriptors: Optional[DescriptorColumns] = None
+        # Metadata appended through components() whose signature has not been set yet
+        self._pending: Dict[str, ComponentMetadata] = {}
+
+        # Path lookup: (path hash, row) pairs sorted by hash, plus the rows added since
+        self._sorted_hashes = np.empty(0, dtype=np.uint32)
+        self._sorted_rows = np.empty(0, dtype=np.int32)
+        self._recent: Dict[int, int] = {}  # path hash -> row
+
+    def __len__(self) -> int:
+        return self._size - self._dead
+
+    def __contains__(self, path: str) -> bool:
+        return self.row_of(path) is not None
+
+    @property
+    def end(self) -> int:
+        """One past the highest row number; rows below it may be removed"""
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated by the columns, the string arrays and the path index"""
+        arrays = (self._bounds, self._volume, self._surface_area, self._hashes, self._directory_codes,
+                  self._directory_projects, self._sorted_hashes, self._sorted_rows)
+        if self._alive is not None:
+            arrays += (self._alive,)
+        if self._descriptors is not None:
+            descriptors = self._descriptors
+            arrays += (descriptors.extents, descriptors.inertia, descriptors.histograms, descriptors.bins)
+        return sum(array.nbytes for array in arrays) + self._names.nbytes + self._directories.nbytes
+
+    # Columns (views of all numbered rows, removed ones included, no copies)
+
+    @property
+    def bounds(self) -> np.ndarray:
+        return self._bounds[:self._size]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._volume[:self._size]
+
+    @property
+    def surface_area(self) -> np.ndarray:
+        return self._surface_area[:self._size]
+
+    @property
+    def hashes(self) -> np.ndarray:
+        return self._hashes[:self._size]
+
+    def rows(self) -> np.ndarray:
+        """Numbers of the rows in use, ascending"""
+        if not self._dead:
+            return np.arange(self._size)
+        if self._live_rows is None or self._live_rows[0] != self.version:
+            self._live_rows = (self.version, np.flatnonzero(self._alive[:self._size]))
+        return self._live_rows[1]
+
+    def is_removed(self, row: int) -> bool:
+        return self._alive is not None and not self._alive[row]
+
+    def signature_store(self, rows: Optional[np.ndarray] = None) -> SignatureStore:
+        """
+        Signature columns for the similarity engine, of rows() or the given rows.
+
+        Volume, surface area and bounding box dimensions are widened to
+        float64 for scoring; with no row removed, hashes and descriptors of
+        all rows are views of the table.
+        """
+        size = self._size
+        descriptors = None
+        if self._descriptors is not None:
+            descriptors = DescriptorColumns(self._descriptors.extents[:size], self._descriptors.inertia[:size],
+                                            self._descriptors.histograms[:size], self._descriptors.bins[:size])
+        if rows is None and self._dead:
+            rows = self.rows()
+        if rows is not None:
+            if descriptors is not None:
+                descriptors = descriptors.take(rows)
+            bounds, volume, surface_area, hashes = \
+                self._bounds[rows], self._volume[rows], self._surface_area[rows], self._hashes[rows]
+        else:
+            bounds, volume, surface_area, hashes = self.bounds, self.volume, self.surface_area, self.hashes
+        bounds = bounds.astype(np.float64)
+        return SignatureStore(volume.astype(np.float64), surface_area.astype(np.float64),
+                              bounds[:, 3:] - bounds[:, :3], hashes, descriptors)
+
+    def query_store(self, signature: GeometricSignature) -> SignatureStore:
+        """One-row store of a signature, with its values and hash encoded like the table's rows"""
+        bbox = _geometry(signature.bounding_box)
+        descriptors = None
+        if self._descriptors is not None or signature.descriptor is not None:
+            descriptors = DescriptorColumns.from_descriptors([signature.descriptor])
+        return SignatureStore(
+            _geometry([signature.volume]),
+            _geometry([signature.surface_area]),
+            (bbox[3:] - bbox[:3])[None, :],
+            np.array([encode_geometric_hash(signature.geometric_hash)], dtype=HASH_DTYPE),
+            descriptors
+        )
+
+    # Saved index
+
+    def save(self, directory: str):
+        """
+        Write the table to a directory as a saved index.
+
+        Removed rows are compacted away first (see compact()). Every column
+        goes to its own .npy file, so load() can memory-map them, the file
+        name and directory strings included. The header is written last, so
+        an interrupted save leaves no index behind. Files are portable
+        between machines (.npy records byte order).
+        """
+        self.compact()
+        self._reindex()
+        os.makedirs(directory, exist_ok=True)
+        header_path = os.path.join(directory, _HEADER)
+        if os.path.exists(header_path):
+            os.remove(header_path)
+
+        size = self._size
+        names, name_offsets = self._names.arrays()
+        directories, directory_offsets = self._directories.arrays()
+        columns = {
+            'bounds': self.bounds, 'volume': self.volume, 'surface_area': self.surface_area,
+            'hashes': self.hashes, 'directory_codes': self._directory_codes[:size],
+            'directory_projects': self._directory_projects[:len(self._directories)],
+            'names': names, 'name_offsets': name_offsets,
+            'directories': directories, 'directory_offsets': directory_offsets,
+            'path_hashes': self._sorted_hashes, 'path_rows': self._sorted_rows,
+        }
+        if self._descriptors is not None:
+            descriptors = self._descriptors
+            columns.update(descriptor_extents=descriptors.extents[:size], descriptor_inertia=descriptors.inertia[:size],
+                           descriptor_histograms=descriptors.histograms[:size], descriptor_bins=descriptors.bins[:size])
+        for name, column in columns.items():
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(column), allow_pickle=False)
+
+        header = {
+            'format': INDEX_FORMAT,
+            'version': INDEX_VERSION,
+            'size': size,
+            'columns': sorted(columns),
+            'projects': self._projects,
+            'extras': {str(row): extras for row, extras in self._extras.items()},
+        }
+        temporary = header_path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(header, f)
+        os.replace(temporary, header_path)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'ComponentTable':
+        """
+        Open a saved index.
+
+        Args:
+            directory: Directory written by save()
+            mmap: Memory-map the columns copy-on-write instead of reading them;
+                pages are read on first use and changes never reach the files
+
+        Raises:
+            ValueError: If the directory holds no index or one of another version
+        """
+        header_path = os.path.join(directory, _HEADER)
+        if not os.path.exists(header_path):
+            raise ValueError(f"No saved index in {directory}")
+        with open(header_path, encoding='utf-8') as f:
+            header = json.load(f)
+        if header.get('format') != INDEX_FORMAT:
+            raise ValueError(f"Not a saved component index: {directory}")
+        if header.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version {header.get('version')} in {directory}")
+
+        def column(name: str) -> np.ndarray:
+            path = os.path.join(directory, f'{name}.npy')
+            # Empty files cannot be mapped
+            return np.load(path, mmap_mode='c' if mmap and os.path.getsize(path) > 128 else None,
+                           allow_pickle=False)
+
+        table = cls()
+        table._size = table._capacity = header['size']
+        table._bounds = column('bounds')
+        table._volume = column('volume')
+        table._surface_area = column('surface_area')
+        table._hashes = column('hashes')
+        table._directory_codes = column('directory_codes')
+        table._directory_projects = column('directory_projects')
+        table._names = _Strings(column('names'), column('name_offsets'))
+        table._directories = _Strings(column('directories'), column('directory_offsets'))
+        if 'descriptor_bins' in header['columns']:
+            table._descriptors = DescriptorColumns(column('descriptor_extents'), column('descriptor_inertia'),
+                                                   column('descriptor_histograms'), column('descriptor_bins'))
+
+        table._projects = header['projects']
+        table._project_ids = {project: code for code, project in enumerate(table._projects)}
+        table._extras = {int(row): extras for row, extras in header['extras'].items()}
+
+        table._sorted_hashes = column('path_hashes')
+        table._sorted_rows = column('path_rows')
+        return table
+
+    # Rows
+
+    def add(self, path: str, metadata: ComponentMetadata, signature: GeometricSignature) -> int:
+        """
+        Add a component, replacing the row of an existing path.
+
+        Returns:
+            The component's row
+        """
+        path_hash = _path_hash(path)
+        row = self._find(path, path_hash)
+        if row is None:
+            row = self._append_path(path, path_hash)
+        else:
+            self.generation += 1
+        self._write(row, path, metadata, signature)
+        self.version += 1
+        return row
+
+    def remove(self, path: str) -> Optional[np.ndarray]:
+        """
+        Remove a component.
+
+        Its row is only marked as removed, so the other rows keep their
+        numbers, until more than a quarter of the rows are removed and the
+        table compacts itself.
+
+        Returns:
+            The row renumbering of compact() if the removal compacted the table, else None
+        """
+        path_hash = _path_hash(path)
+        row = self._find(path, path_hash)
+        if row is None:
+            raise KeyError(path)
+
+        if self._alive is None:
+            self._alive = np.ones(self._capacity, dtype=bool)
+        self._alive[row] = False
+        self._dead += 1
+        if self._recent.get(path_hash) == row:
+            del self._recent[path_hash]
+        self._extras.pop(row, None)
+        self._pending.pop(path, None)
+        self.version += 1
+        self.generation += 1
+
+        if self._dead > self._size * _DEAD_FRACTION:
+            return self.compact()
+        return None
+
+    def compact(self) -> Optional[np.ndarray]:
+        """
+        Drop removed rows, moving the rows after them up.
+
+        Returns:
+            Array giving each old row's new number (-1 for removed rows), or
+            None if no row was removed
+        """
+        if not self._dead:
+            return None
+        kept = np.flatnonzero(self._alive[:self._size])
+        renumbered = np.full(self._size, -1, dtype=np.intp)
+        renumbered[kept] = np.arange(len(kept))
+
+        for column in self._row_columns():
+            column[:len(kept)] = column[kept]
+        self._names = self._names.take(kept)
+
+        # Keep only the directories still referred to
+        codes = self._directory_codes[:len(kept)]
+        used, codes[:] = np.unique(codes, return_inverse=True)
+        self._directories = self._directories.take(used)
+        self._directory_projects = self._directory_projects[used]
+        self._directory_cache = {}
+
+        self._extras = {int(renumbered[row]): extras for row, extras in self._extras.items()}
+        in_use = self._alive[self._sorted_rows]
+        self._sorted_hashes = self._sorted_hashes[in_use]
+        self._sorted_rows = renumbered[self._sorted_rows[in_use]].astype(np.int32)
+        self._recent = {path_hash: int(renumbered[row]) for path_hash, row in self._recent.items()}
+
+        self._size = len(kept)
+        self._dead = 0
+        self._alive = None
+        self._live_rows = None
+        self.version += 1
+        self.generation += 1
+        return renumbered
+
+    def trim(self):
+        """
+        Hand back the room the columns and strings reserved for more rows.
+
+        Adding rows afterwards grows them again; meant for the end of a scan.
+        """
+        self._reindex()
+        self._directory_cache = {}
+        if self._capacity > self._size:
+            self._resize(self._size)
+        self._names.trim()
+        self._directories.trim()
+        self._directory_projects = self._directory_projects[:len(self._directories)].copy()
+
+    def row_of(self, path: str) -> Optional[int]:
+        """Row of a path, or None if the table does not hold it"""
+        return self._find(path, _path_hash(path))
+
+    def path(self, row: int) -> str:
+        return self._directories[self._directory_codes[row]] + self._names[row]
+
+    def paths(self) -> 'PathList':
+        """List-like view of the paths of rows(), decoded on access"""
+        return PathList(self)
+
+    def metadata(self, row: int) -> ComponentMetadata:
+        """The row's metadata as a ComponentMetadata"""
+        view = ComponentRow(self, row)
+        return ComponentMetadata(**{name: getattr(view, name) for name in ComponentRow.FIELDS})
+
+    def signature(self, row: int) -> GeometricSignature:
+        """The row's signature as a GeometricSignature"""
+        view = SignatureRow(self, row)
+        return GeometricSignature(**{name: getattr(view, name) for name in SignatureRow.FIELDS})
+
+    def components(self) -> 'ComponentList':
+        """List-like view of rows() as ComponentRow objects"""
+        return ComponentList(self)
+
+    def signatures(self) -> 'SignatureMapping':
+        """Dict-like view from path to SignatureRow"""
+        return SignatureMapping(self)
+
+    def set_metadata(self, metadata: ComponentMetadata,
+                     store: Optional[Callable[[str, ComponentMetadata, GeometricSignature], Any]] = None):
+        """
+        Replace the metadata of the component at metadata.file_path.
+
+        A path the table does not hold yet is kept aside until set_signature()
+        gives its signature, as a row needs both.
+        """
+        if isinstance(metadata, ComponentRow):
+            metadata = metadata.to_metadata()
+        path = metadata.file_path
+        row = self.row_of(path)
+        if row is None:
+            self._pending[path] = metadata
+        else:
+            (store or self.add)(path, metadata, self.signature(row))
+
+    def set_signature(self, path: str, signature: GeometricSignature,
+                      store: Optional[Callable[[str, ComponentMetadata, GeometricSignature], Any]] = None):
+        """
+        Replace the signature of the component at path, or add the component.
+
+        A new component takes the metadata set_metadata() kept aside for its
+        path, or else metadata of its file name alone.
+        """
+        if isinstance(signature, SignatureRow):
+            signature = signature.to_signature()
+        row = self.row_of(path)
+        if row is not None:
+            metadata = self.metadata(row)
+        else:
+            metadata = self._pending.pop(path, None) or \
+                ComponentMetadata(file_path=path, file_name=path[_split_path(path):], project_id=_UNKNOWN_PROJECT)
+        (store or self.add)(path, metadata, signature)
+
+    # Internals
+
+    def _row_at(self, index: int) -> int:
+        """Row number of the index-th row in use"""
+        return index if not self._dead else int(self.rows()[index])
+
+    def _find(self, path: str, path_hash: int) -> Optional[int]:
+        """Look a path up among the recent rows, then among the indexed rows with its hash"""
+        row = self._recent.get(path_hash)
+        if row is not None and self.path(row) == path:
+            return row
+
+        key = np.uint32(path_hash)
+        low = self._sorted_hashes.searchsorted(key, side='left')
+        high = self._sorted_hashes.searchsorted(key, side='right')
+        for row in self._sorted_rows[low:high].tolist():
+            if not self.is_removed(row) and self.path(row) == path:
+                return row
+        return None
+
+    def _extra(self, row: int, name: str, default=None):
+        extras = self._extras.get(row)
+        return default if extras is None else extras.get(name, default)
+
+    def _append_path(self, path: str, path_hash: int) -> int:
+        """Add a row for a new path and return it"""
+        if self._size == self._capacity:
+            self._grow()
+        row = self._size
+        self._size += 1
+        if self._alive is not None:
+            self._alive[row] = True
+
+        self._names.append(path[_split_path(path):])
+
+        # A hash clash with another recent path moves that one into the sorted index
+        if path_hash in self._recent or len(self._recent) >= max(_INITIAL_CAPACITY, self._size // 64):
+            self._reindex()
+        self._recent[path_hash] = row
+        return row
+
+    def _write(self, row: int, path: str, metadata: ComponentMetadata, signature: GeometricSignature):
+        """Store a component's values in an existing row"""
+        self._bounds[row] = signature.bounding_box
+        self._volume[row] = signature.volume
+        self._surface_area[row] = signature.surface_area
+
+        project = self._project_ids.get(metadata.project_id)
+        if project is None:
+            project = self._project_ids[metadata.project_id] = len(self._projects)
+            self._projects.append(metadata.project_id)
+        self._directory_codes[row] = self._directory_code(path[:_split_path(path)], project)
+
+        extras = {}
+        geometric_hash = signature.geometric_hash
+        binary = encode_geometric_hash(geometric_hash)
+        if binary.hex() != geometric_hash:
+            # Keep the original string; its digest stands in for equality tests
+            extras['geometric_hash'] = geometric_hash
+        self._hashes[row] = binary
+
+        if metadata.file_path != path:
+            extras['file_path'] = metadata.file_path
+        if metadata.file_name != path[_split_path(path):]:
+            extras['file_name'] = metadata.file_name
+        if not _same_volume(metadata.volume, signature.volume):
+            extras['volume'] = metadata.volume
+        for name in _OPTIONAL_FIELDS:
+            value = getattr(metadata, name)
+            if value is not None:
+                extras[name] = value
+
+        if extras:
+            self._extras[row] = extras
+        else:
+            self._extras.pop(row, None)
+
+        self._write_descriptor(row, signature.descriptor)
+
+    def _directory_code(self, directory: str, project: int) -> int:
+        """Entry of a directory with a project, added unless recently seen"""
+        key = (directory, project)
+        code = self._directory_cache.get(key)
+        if code is None:
+            if len(self._directory_cache) >= _DIRECTORY_CACHE:
+                self._directory_cache = {}
+            code = self._directory_cache[key] = self._directories.append(directory)
+            self._directory_projects = _reserve(self._directory_projects, code + 1)
+            self._directory_projects[code] = project
+        return code
+
+    def _write_descriptor(self, row: int, descriptor: Optional[ShapeDescriptor]):
+        """Store a row's shape descriptor, allocating the descriptor columns on first use"""
+        if descriptor is None:
+            if self._descriptors is not None:
+                self._descriptors.bins[row] = 0
+            return
+
+        width = len(descriptor.d2_histogram)
+        columns = self._descriptors
+        if columns is None:
+            columns = self._descriptors = DescriptorColumns(
+                np.full((self._capacity, 3), np.nan), np.full((self._capacity, 3), np.nan),
+                np.zeros((self._capacity, width)), np.zeros(self._capacity, dtype=np.int64)
+            )
+        elif width > columns.histograms.shape[1]:
+            histograms = np.zeros((self._capacity, width))
+            histograms[:, :columns.histograms.shape[1]] = columns.histograms
+            columns.histograms = histograms
+
+        columns.extents[row] = descriptor.principal_extents
+        columns.inertia[row] = descriptor.inertia
+        columns.histograms[row] = 0.0
+        columns.histograms[row, :width] = descriptor.d2_histogram
+        columns.bins[row] = width
+
+    def _row_columns(self) -> List[np.ndarray]:
+        """Every per-row array, for moving rows"""
+        columns = [self._bounds, self._volume, self._surface_area, self._hashes, self._directory_codes]
+        if self._descriptors is not None:
+            descriptors = self._descriptors
+            columns += [descriptors.extents, descriptors.inertia, descriptors.histograms, descriptors.bins]
+        return columns
+
+    def _grow(self):
+        """Enlarge every column's capacity"""
+        self._resize(max(_INITIAL_CAPACITY, int(self._capacity * _GROWTH)))
+
+    def _resize(self, capacity: int):
+        """Move every column into arrays of `capacity` rows (at least the rows numbered)"""
+        def resized(column: np.ndarray) -> np.ndarray:
+            new = np.empty((capacity,) + column.shape[1:], dtype=column.dtype)
+            new[:self._size] = column[:self._size]
+            return new
+
+        self._bounds = resized(self._bounds)
+        self._volume = resized(self._volume)
+        self._surface_area = resized(self._surface_area)
+        self._hashes = resized(self._hashes)
+        self._directory_codes = resized(self._directory_codes)
+        if self._descriptors is not None:
+            descriptors = self._descriptors
+            self._descriptors = DescriptorColumns(resized(descriptors.extents), resized(descriptors.inertia),
+                                                  resized(descriptors.histograms), resized(descriptors.bins))
+        if self._alive is not None:
+            self._alive = resized(self._alive)
+        self._capacity = capacity
+
+    def _reindex(self):
+        """Merge the recent rows into the sorted path-hash index (linear, no re-sort)"""
+        if not self._recent:
+            return
+        hashes = np.fromiter(self._recent.keys(), dtype=np.uint32, count=len(self._recent))
+        rows = np.fromiter(self._recent.values(), dtype=np.int32, count=len(self._recent))
+        order = np.argsort(hashes, kind='stable')
+        hashes, rows = hashes[order], rows[order]
+        positions = self._sorted_hashes.searchsorted(hashes, side='right')
+        self._sorted_hashes = np.insert(self._sorted_hashes, positions, hashes)
+        self._sorted_rows = np.insert(self._sorted_rows, positions, rows)
+        self._recent = {}
+
+
+class ComponentRow:
+    """
+    Read-only view of one component's metadata, with the attributes of ComponentMetadata.
+
+    A view refers to a row number, so it is only valid until the table is
+    compacted; use to_metadata() for a standalone copy.
+    """
+    __slots__ = ('_table', '_row')
+
+    FIELDS = ('file_path', 'file_name', 'project_id', 'part_number', 'description',
+              'material', 'weight', 'volume')
+
+    def __init__(self, table: ComponentTable, row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def file_path(self) -> str:
+        path = self._table._extra(self._row, 'file_path')
+        return path if path is not None else self._table.path(self._row)
+
+    @property
+    def file_name(self) -> str:
+        name = self._table._extra(self._row, 'file_name')
+        return name if name is not None else self._table._names[self._row]
+
+    @property
+    def project_id(self) -> str:
+        table = self._table
+        return table._projects[table._directory_projects[table._directory_codes[self._row]]]
+
+    @property
+    def part_number(self) -> Optional[str]:
+        return self._table._extra(self._row, 'part_number')
+
+    @property
+    def description(self) -> Optional[str]:
+        return self._table._extra(self._row, 'description')
+
+    @property
+    def material(self) -> Optional[str]:
+        return self._table._extra(self._row, 'material')
+
+    @property
+    def weight(self) -> Optional[float]:
+        return self._table._extra(self._row, 'weight')
+
+    @property
+    def volume(self) -> Optional[float]:
+        extras = self._table._extras.get(self._row)
+        if extras is not None and 'volume' in extras:
+            return extras['volume']
+        return float(self._table._volume[self._row])
+
+    def to_metadata(self) -> ComponentMetadata:
+        return self._table.metadata(self._row)
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ComponentRow, ComponentMetadata)):
+            return self._values() == tuple(getattr(other, name) for name in self.FIELDS)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.to_metadata()).replace('ComponentMetadata', 'ComponentRow', 1)
+
+
+class SignatureRow:
+    """
+    Read-only view of one component's signature, with the attributes of GeometricSignature.
+
+    Valid until the table is compacted; use to_signature() for a standalone copy.
+    """
+    __slots__ = ('_table', '_row')
+
+    FIELDS = ('bounding_box', 'volume', 'surface_area', 'geometric_hash', 'descriptor')
+
+    def __init__(self, table: ComponentTable, row: int):
+        self._table = table
+        self._row = row
+
+    @property
+    def bounding_box(self) -> tuple:
+        return tuple(self._table._bounds[self._row].tolist())
+
+    @property
+    def volume(self) -> float:
+        return float(self._table._volume[self._row])
+
+    @property
+    def surface_area(self) -> float:
+        return float(self._table._surface_area[self._row])
+
+    @property
+    def geometric_hash(self) -> str:
+        geometric_hash = self._table._extra(self._row, 'geometric_hash')
+        return geometric_hash if geometric_hash is not None else self._table._hashes[self._row].tobytes().hex()
+
+    @property
+    def descriptor(self) -> Optional[ShapeDescriptor]:
+        descriptors = self._table._descriptors
+        return descriptors.descriptor(self._row) if descriptors is not None else None
+
+    def to_signature(self) -> GeometricSignature:
+        return self._table.signature(self._row)
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (SignatureRow, GeometricSignature)):
+            return self._values() == tuple(getattr(other, name) for name in self.FIELDS)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.to_signature()).replace('GeometricSignature', 'SignatureRow', 1)
+
+
+class ComponentList(Sequence):
+    """
+    List-like view of a ComponentTable's rows in use.
+
+    append() and extend() take ComponentMetadata like a list did; see
+    ComponentTable.set_metadata(). Components are stored through `store`
+    (default: the table's add()).
+    """
+
+    def __init__(self, table: ComponentTable,
+                 store: Optional[Callable[[str, ComponentMetadata, GeometricSignature], Any]] = None):
+        self._table = table
+        self._store = store
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [ComponentRow(self._table, self._table._row_at(i)) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("component index out of range")
+        return ComponentRow(self._table, self._table._row_at(index))
+
+    def __iter__(self) -> Iterator[ComponentRow]:
+        for row in self._table.rows().tolist():
+            yield ComponentRow(self._table, row)
+
+    def append(self, metadata: ComponentMetadata):
+        self._table.set_metadata(metadata, self._store)
+
+    def extend(self, metadata: Iterable[ComponentMetadata]):
+        for item in list(metadata):
+            self.append(item)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ComponentList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ComponentList({list(self)!r})"
+
+
+class PathList(Sequence):
+    """List-like view of the paths of a ComponentTable's rows in use, in row order"""
+
+    def __init__(self, table: ComponentTable):
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._table.path(self._table._row_at(i)) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("path index out of range")
+        return self._table.path(self._table._row_at(index))
+
+    def __iter__(self) -> Iterator[str]:
+        for row in self._table.rows().tolist():
+            yield self._table.path(row)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (PathList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PathList({list(self)!r})"
+
+
+class SignatureMapping(MutableMapping):
+    """
+    Dict-like view from path to SignatureRow over a ComponentTable.
+
+    Assigning a signature adds or updates a component (see
+    ComponentTable.set_signature()) through `store`, and deleting a path
+    removes it through `remove` (defaults: the table's add() and remove()).
+    """
+
+    def __init__(self, table: ComponentTable,
+                 store: Optional[Callable[[str, ComponentMetadata, GeometricSignature], Any]] = None,
+                 remove: Optional[Callable[[str], Any]] = None):
+        self._table = table
+        self._store = store
+        self._remove = remove or table.remove
+
+    def __getitem__(self, path: str) -> SignatureRow:
+        row = self._table.row_of(path)
+        if row is None:
+            raise KeyError(path)
+        return SignatureRow(self._table, row)
+
+    def __setitem__(self, path: str, signature: GeometricSignature):
+        self._table.set_signature(path, signature, self._store)
+
+    def __delitem__(self, path: str):
+        if path not in self:
+            raise KeyError(path)
+        self._remove(path)
+
+    def __contains__(self, path) -> bool:
+        return isinstance(path, str) and path in self._table
+
+    def __iter__(self) -> Iterator[str]:
+        for row in self._table.rows().tolist():
+            yield self._table.path(row)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __repr__(self) -> str:
+        return f"SignatureMapping({dict(self)!r})"
@@ -0,0 +1,412 @@
+# cadRedundancyAnalyzer/core/vectorized.py
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cadRedundancyAnalyzer.core.models import GeometricSignature, ShapeDescriptor
+
+# Stages of a matching cascade: one per weighted term of the score, and the
+# descriptor rejection (see BatchScorer.match_one_vs_many)
+WEIGHTED_STAGES = ("volume", "area", "bbox")
+CASCADE_STAGES = WEIGHTED_STAGES + ("descriptor",)
+
+
+class DescriptorColumns:
+    """
+    Shape descriptor columns of a SignatureStore.
+
+    Holds N x 3 principal extents and inertia eigenvalues and an N x B D2
+    histogram matrix (zero-padded to the widest histogram), plus each row's
+    histogram length; rows without a descriptor have length 0.
+    """
+
+    def __init__(self, extents: np.ndarray, inertia: np.ndarray, histograms: np.ndarray, bins: np.ndarray):
+        self.extents = extents
+        self.inertia = inertia
+        self.histograms = histograms
+        self.bins = bins
+
+    @classmethod
+    def from_descriptors(cls, descriptors: Sequence[Optional[ShapeDescriptor]]) -> 'DescriptorColumns':
+        count = len(descriptors)
+        width = max((len(d.d2_histogram) for d in descriptors if d is not None), default=0)
+        extents = np.full((count, 3), np.nan)
+        inertia = np.full((count, 3), np.nan)
+        histograms = np.zeros((count, width))
+        bins = np.zeros(count, dtype=np.int64)
+
+        for row, descriptor in enumerate(descriptors):
+            if descriptor is None:
+                continue
+            extents[row] = descriptor.principal_extents
+            inertia[row] = descriptor.inertia
+            histograms[row, :len(descriptor.d2_histogram)] = descriptor.d2_histogram
+            bins[row] = len(descriptor.d2_histogram)
+
+        return cls(extents, inertia, histograms, bins)
+
+    @classmethod
+    def concatenate(cls, columns: Sequence['DescriptorColumns']) -> 'DescriptorColumns':
+        """Rows of several column sets, histograms zero-padded to the widest"""
+        width = max(column.histograms.shape[1] for column in columns)
+        histograms = [np.pad(column.histograms, ((0, 0), (0, width - column.histograms.shape[1])))
+                      for column in columns]
+        return cls(np.concatenate([column.extents for column in columns]),
+                   np.concatenate([column.inertia for column in columns]),
+                   np.concatenate(histograms),
+                   np.concatenate([column.bins for column in columns]))
+
+    def take(self, rows: np.ndarray) -> 'DescriptorColumns':
+        return DescriptorColumns(self.extents[rows], self.inertia[rows], self.histograms[rows], self.bins[rows])
+
+    def descriptor(self, row: int) -> Optional[ShapeDescriptor]:
+        bins = int(self.bins[row])
+        if not bins:
+            return None
+        return ShapeDescriptor(
+            principal_extents=tuple(self.extents[row].tolist()),
+            inertia=tuple(self.inertia[row].tolist()),
+            d2_histogram=tuple(self.histograms[row, :bins].tolist())
+        )
+
+    def uniform(self) -> bool:
+        """Whether all rows compare the same way: all with one histogram length, or none with a descriptor"""
+        return len(self.bins) == 0 or bool((self.bins == self.bins[0]).all())
+
+
+class SignatureStore:
+    """
+    Columnar storage of geometric signatures for batched scoring.
+
+    Holds N x 1 volume, N x 1 surface area and N x 3 bounding box dimension
+    columns as float64 arrays, plus a code per geometric hash (an integer,
+    or the 16-byte binary hash of a ComponentTable) so hash equality can be
+    tested without touching Python strings. Shape descriptors, when kept,
+    are in an optional DescriptorColumns.
+    """
+
+    def __init__(self, volume: np.ndarray, surface_area: np.ndarray, dims: np.ndarray,
+                 hash_codes: np.ndarray, descriptors: Optional[DescriptorColumns] = None):
+        self.volume = volume
+        self.surface_area = surface_area
+        self.dims = dims
+        self.hash_codes = hash_codes
+        self.descriptors = descriptors
+
+    @classmethod
+    def from_signatures(cls, signatures: Sequence[GeometricSignature],
+                        descriptors: bool = False) -> 'SignatureStore':
+        """Build a store from a sequence of GeometricSignature objects, optionally with their descriptors"""
+        count = len(signatures)
+        volume = np.empty(count, dtype=np.float64)
+        surface_area = np.empty(count, dtype=np.float64)
+        dims = np.empty((count, 3), dtype=np.float64)
+        hash_codes = np.empty(count, dtype=np.int64)
+        codes: Dict[str, int] = {}
+
+        for row, sig in enumerate(signatures):
+            bbox = sig.bounding_box
+            volume[row] = sig.volume
+            surface_area[row] = sig.surface_area
+            dims[row] = (bbox[3] - bbox[0], bbox[4] - bbox[1], bbox[5] - bbox[2])
+            hash_codes[row] = codes.setdefault(sig.geometric_hash, len(codes))
+
+        columns = DescriptorColumns.from_descriptors([sig.descriptor for sig in signatures]) if descriptors else None
+        return cls(volume, surface_area, dims, hash_codes, columns)
+
+    def __len__(self) -> int:
+        return len(self.volume)
+
+    @classmethod
+    def concatenate(cls, stores: Sequence['SignatureStore']) -> 'SignatureStore':
+        """Rows of several stores in one (their hash codes must be encoded alike)"""
+        descriptors = None
+        if any(store.descriptors is not None for store in stores):
+            descriptors = DescriptorColumns.concatenate([
+                store.descriptors if store.descriptors is not None else
+                DescriptorColumns.from_descriptors([None] * len(store))
+                for store in stores
+            ])
+        return cls(np.concatenate([store.volume for store in stores]),
+                   np.concatenate([store.surface_area for store in stores]),
+                   np.concatenate([store.dims for store in stores]),
+                   np.concatenate([store.hash_codes for store in stores]),
+                   descriptors)
+
+    def take(self, rows: np.ndarray) -> 'SignatureStore':
+        """Store of a subset of the rows, in the given order"""
+        descriptors = self.descriptors.take(rows) if self.descriptors is not None else None
+        return SignatureStore(self.volume[rows], self.surface_area[rows], self.dims[rows], self.hash_codes[rows],
+                              descriptors)
+
+    def features(self, use_descriptors: bool = False) -> np.ndarray:
+        """
+        N x 5 float64 array of (volume, area, width, depth, height).
+
+        With use_descriptors, rows with a descriptor give their principal
+        extents instead of their bounding box dimensions.
+        """
+        dims = self.dims
+        if use_descriptors and self.descriptors is not None:
+            dims = np.where((self.descriptors.bins > 0)[:, None], self.descriptors.extents, dims)
+        return np.column_stack([self.volume, self.surface_area, dims])
+
+    def hash_buckets(self, use_descriptors: bool = False) -> List[np.ndarray]:
+        """
+        Row indices grouped by hash code, in order of first appearance, ascending within a group.
+
+        With use_descriptors, rows only share a group when their descriptors
+        are identical too, so every row of a group scores alike.
+        """
+        if not len(self):
+            return []
+        keys = self.hash_codes
+        if use_descriptors and self.descriptors is not None:
+            descriptors = self.descriptors
+            parts = [keys, descriptors.extents, descriptors.inertia, descriptors.histograms, descriptors.bins]
+            row_bytes = np.hstack([np.ascontiguousarray(part).view(np.uint8).reshape(len(self), -1)
+                                   for part in parts])
+            keys = np.ascontiguousarray(row_bytes).view(np.dtype((np.void, row_bytes.shape[1]))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        rows = np.argsort(inverse, kind='stable')
+        buckets = np.split(rows, np.cumsum(np.bincount(inverse))[:-1])
+        return [buckets[bucket] for bucket in np.argsort(first, kind='stable')]
+
+    def bounded(self) -> np.ndarray:
+        """
+        Rows whose ratio terms are at most 1.0 against any other bounded row.
+
+        A ratio can only exceed 1.0 when both values are negative, so rows
+        with a negative volume, area, dimension or principal extent are out.
+        """
+        negative = (self.volume < 0) | (self.surface_area < 0) | (self.dims < 0).any(axis=1)
+        if self.descriptors is not None:
+            negative |= (self.descriptors.extents < 0).any(axis=1)
+        return ~negative
+
+    def signature(self, row: int) -> GeometricSignature:
+        """
+        A GeometricSignature that scores exactly like the row.
+
+        The bounding box is rebuilt at the origin from the dimensions and
+        the hash from the hash code, so only the scored properties survive.
+        """
+        width, depth, height = self.dims[row].tolist()
+        return GeometricSignature(
+            bounding_box=(0.0, 0.0, 0.0, width, depth, height),
+            volume=float(self.volume[row]),
+            surface_area=float(self.surface_area[row]),
+            geometric_hash=self.hash_codes[row].tobytes().hex(),
+            descriptor=self.descriptors.descriptor(row) if self.descriptors is not None else None
+        )
+
+
+def ratio_similarity(values1: np.ndarray, values2: np.ndarray) -> np.ndarray:
+    """
+    Elementwise (broadcasting) version of SimilarityDetector._calculate_property_similarity.
+
+    Mirrors the scalar rules exactly: both zero scores 1.0, one zero scores
+    0.0, otherwise min / max with Python's min/max argument order, so NaN
+    and negative values give the same results as the scalar path.
+    """
+    zero1 = values1 == 0
+    zero2 = values2 == 0
+
+    # max(a, b) keeps a unless b > a; min(a, b) keeps a unless b < a
+    larger = np.where(values2 > values1, values2, values1)
+    smaller = np.where(values2 < values1, values2, values1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = smaller / larger
+
+    return np.where(zero1 & zero2, 1.0, np.where(zero1 | zero2, 0.0, ratio))
+
+
+def descriptor_similarity(descriptors: DescriptorColumns, rows1, rows2) -> np.ndarray:
+    """
+    Elementwise version of SimilarityDetector.calculate_descriptor_similarity.
+
+    Mean of the D2 histogram intersection and the mean inertia eigenvalue
+    ratio, summed in the same order as the scalar path.
+    """
+    histograms1 = descriptors.histograms[rows1]
+    histograms2 = descriptors.histograms[rows2]
+    intersection = np.zeros(np.broadcast_shapes(histograms1.shape, histograms2.shape)[:-1])
+    for column in range(descriptors.histograms.shape[1]):
+        intersection = intersection + np.minimum(histograms1[..., column], histograms2[..., column])
+
+    ratios = ratio_similarity(descriptors.inertia[rows1], descriptors.inertia[rows2])
+    inertia_similarity = (ratios[..., 0] + ratios[..., 1] + ratios[..., 2]) / 3
+
+    return (intersection + inertia_similarity) / 2
+
+
+class BatchScorer:
+    """Computes the weighted similarity score for many pairs at once in NumPy"""
+
+    def __init__(self, weights: Tuple[float, float, float] = (0.5, 0.3, 0.2),
+                 descriptor_threshold: Optional[float] = None):
+        """
+        Args:
+            weights: (volume, area, bbox) weights of the similarity score
+            descriptor_threshold: Score pairs that both have shape descriptors
+                on their principal extents, and score 0.0 when their descriptor
+                similarity is below this (None: ignore descriptors)
+        """
+        self.volume_weight, self.area_weight, self.bbox_weight = weights
+        self.descriptor_threshold = descriptor_threshold
+
+    def score_one_vs_many(self, store: SignatureStore, row: int,
+                          rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Score one signature against many.
+
+        Args:
+            store: Signature columns
+            row: Index of the signature compared against the others
+            rows: Indices to compare against (default: every signature)
+
+        Returns:
+            1-D array of similarity scores, same as calculate_similarity(store[row], store[j])
+        """
+        if rows is None:
+            rows = np.arange(len(store))
+        return self._score(store, np.intp(row), rows)
+
+    def score_block(self, store: SignatureStore, rows1: np.ndarray, rows2: np.ndarray) -> np.ndarray:
+        """
+        Score a block of signature pairs.
+
+        Args:
+            store: Signature columns
+            rows1: Indices of the left-hand signatures (block rows)
+            rows2: Indices of the right-hand signatures (block columns)
+
+        Returns:
+            len(rows1) x len(rows2) array of similarity scores
+        """
+        return self._score(store, np.asarray(rows1)[:, None], np.asarray(rows2)[None, :])
+
+    def match_one_vs_many(self, store: SignatureStore, row: int, rows: np.ndarray, threshold: float,
+                          cascade: Sequence[str] = CASCADE_STAGES, rejections: Optional[Dict[str, int]] = None,
+                          bounded: Optional[np.ndarray] = None, with_scores: bool = False):
+        """
+        Rows scoring at least threshold against one signature, through a cascade of stages.
+
+        Each weighted stage computes one term of the score for the pairs
+        still in play and drops those that cannot reach the threshold even
+        with their unknown terms at 1.0; the "descriptor" stage drops pairs
+        whose shape descriptors force a 0.0 score. The pairs left are scored
+        in full from the terms already computed, so the result is exactly
+        rows[score_one_vs_many(store, row, rows) >= threshold].
+
+        Args:
+            store: Signature columns
+            row: Index of the signature compared against the others
+            rows: Indices to compare against
+            threshold: Similarity threshold (0.0-1.0)
+            cascade: Stage names from CASCADE_STAGES, in the order they run
+            rejections: Optional counters of the pairs each stage drops, plus
+                "score" for the pairs failing the full score
+            bounded: store.bounded(), if already computed; pairs with a row
+                outside it skip the weighted stages
+            with_scores: Also return the scores of the matching rows
+
+        Returns:
+            The matching rows, in input order, or (rows, scores) with_scores
+        """
+        row = np.intp(row)
+        if bounded is None:
+            bounded = store.bounded()
+        if rejections is None:
+            rejections = {}
+
+        # Quick check: identical hashes mean identical parts
+        exact = store.hash_codes[rows] == store.hash_codes[row]
+        matched = exact & (1.0 >= threshold)
+        scores = np.ones(len(rows))
+        pending = np.flatnonzero(~exact)
+        gated = bounded[rows[pending]] & bounded[row]
+        descriptors = self._descriptors(store)
+        terms = {}
+
+        for stage in cascade:
+            others = rows[pending]
+            if stage == "descriptor":
+                # A rejected pair scores 0.0, which only fails a positive threshold
+                if descriptors is None or not threshold > 0:
+                    continue
+                dropped = self._shape_rejected(descriptors, row, others)
+            else:
+                terms[stage] = self._term(stage, store, row, others)
+                bound = self._weighted(*(terms.get(name, 1.0) for name in WEIGHTED_STAGES))
+                dropped = gated & (bound < threshold)
+
+            rejections[stage] = rejections.get(stage, 0) + int(dropped.sum())
+            kept = ~dropped
+            pending, gated = pending[kept], gated[kept]
+            terms = {name: values[kept] for name, values in terms.items()}
+
+        others = rows[pending]
+        similarity = self._weighted(*(terms[name] if name in terms else self._term(name, store, row, others)
+                                      for name in WEIGHTED_STAGES))
+        if descriptors is not None and "descriptor" not in cascade:
+            similarity = np.where(self._shape_rejected(descriptors, row, others), 0.0, similarity)
+
+        passed = similarity >= threshold
+        rejections["score"] = rejections.get("score", 0) + int(len(passed) - passed.sum())
+        matched[pending[passed]] = True
+        scores[pending] = similarity
+        if with_scores:
+            return rows[matched], scores[matched]
+        return rows[matched]
+
+    def _score(self, store: SignatureStore, rows1, rows2) -> np.ndarray:
+        """Weighted score between broadcastable index arrays of the store"""
+        similarity = self._weighted(*(self._term(name, store, rows1, rows2) for name in WEIGHTED_STAGES))
+        descriptors = self._descriptors(store)
+        if descriptors is not None:
+            similarity = np.where(self._shape_rejected(descriptors, rows1, rows2), 0.0, similarity)
+
+        # Quick check: identical hashes mean identical parts
+        return np.where(store.hash_codes[rows1] == store.hash_codes[rows2], 1.0, similarity)
+
+    def _weighted(self, volume_similarity, area_similarity, bbox_similarity):
+        """Weighted average of the three terms (volume is most important for duplicate detection)"""
+        return (
+                self.volume_weight * volume_similarity +
+                self.area_weight * area_similarity +
+                self.bbox_weight * bbox_similarity
+        )
+
+    def _term(self, stage: str, store: SignatureStore, rows1, rows2) -> np.ndarray:
+        """One weighted term of the score ("volume", "area" or "bbox")"""
+        if stage == "volume":
+            return ratio_similarity(store.volume[rows1], store.volume[rows2])
+        if stage == "area":
+            return ratio_similarity(store.surface_area[rows1], store.surface_area[rows2])
+
+        dims1 = store.dims[rows1]
+        dims2 = store.dims[rows2]
+        descriptors = self._descriptors(store)
+        if descriptors is not None:
+            # Pose-invariant extents for pairs whose descriptors are comparable
+            comparable = self._comparable(descriptors, rows1, rows2)
+            dims1 = np.where(comparable[..., None], descriptors.extents[rows1], dims1)
+            dims2 = np.where(comparable[..., None], descriptors.extents[rows2], dims2)
+        dimension_similarity = ratio_similarity(dims1, dims2)
+        return (dimension_similarity[..., 0] + dimension_similarity[..., 1] + dimension_similarity[..., 2]) / 3
+
+    def _descriptors(self, store: SignatureStore) -> Optional[DescriptorColumns]:
+        """The store's descriptor columns, if this scorer uses them"""
+        return store.descriptors if self.descriptor_threshold is not None else None
+
+    @staticmethod
+    def _comparable(descriptors: DescriptorColumns, rows1, rows2) -> np.ndarray:
+        """Pairs that both have descriptors with histograms of one length"""
+        bins1 = descriptors.bins[rows1]
+        return (bins1 > 0) & (bins1 == descriptors.bins[rows2])
+
+    def _shape_rejected(self, descriptors: DescriptorColumns, rows1, rows2) -> np.ndarray:
+        """Comparable pairs whose descriptor similarity is below the descriptor threshold"""
+        return self._comparable(descriptors, rows1, rows2) & \
+            (descriptor_similarity(descriptors, rows1, rows2) < self.descriptor_threshold)
@@ -1,26 +1,237 @@
+import fnmatch
+import os
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Generator, List
+from typing import Generator, List, NamedTuple, Optional, Tuple
+
+from cadRedundancyAnalyzer.core.metrics import RunMetrics
+from cadRedundancyAnalyzer.handlers.registry import HandlerRegistry
+
+# Version control metadata directories, never worth descending into
+VCS_DIRECTORIES = frozenset({'.git', '.hg', '.svn', '.bzr', 'CVS', '_darcs'})
+
+
+class FileEntry(NamedTuple):
+    """A discovered CAD file with the stat data later stages need"""
+    path: str
+    size: int
+    mtime_ns: int
+
+
+# (directory, path relative to the root with a trailing '/', depth)
+_Directory = Tuple[str, str, int]
+
+# End-of-crawl marker put on the queue by the background crawl thread
+_DONE = object()
 
 
 class FileSystemCrawler:
     """Discovers CAD files in directory structures"""
 
-    def __init__(self, supported_extensions: List[str] = None):
-        """Initialize crawler with supported file extensions"""
-        # Default to STL extensions if none provided
-        self.supported_extensions = supported_extensions or ['.stl']
+    def __init__(self, supported_extensions: List[str] = None, exclude: List[str] = None,
+                 max_depth: Optional[int] = None, skip_hidden: bool = False, skip_vcs: bool = True,
+                 listing_threads: int = 1, queue_size: int = 10000, metrics: Optional[RunMetrics] = None):
+        """
+        Initialize crawler with supported file extensions
+
+        Args:
+            supported_extensions: File extensions to discover (default: the
+                extensions of the built-in and installed handlers, see
+                HandlerRegistry)
+            exclude: Glob patterns of files and directories to skip, matched
+                against the entry name and its '/'-separated path relative
+                to the root (e.g. 'archive', '*/old/*', '*_backup.stl')
+            max_depth: Deepest directory level to descend to; 0 only lists the
+                root itself (default: unlimited)
+            skip_hidden: Skip files and directories whose name starts with '.'
+            skip_vcs: Skip version control directories (.git, .svn, ...)
+            listing_threads: Directory listings in flight at once. Above 1 the
+                tree is crawled by a thread pool in the background, which hides
+                per-listing latency on SMB/NFS mounts; files are still streamed
+                in the serial depth-first order
+            queue_size: Discovered files buffered ahead of the consumer when
+                crawling in the background
+            metrics: Optional RunMetrics that receives "list_directory" stage
+                times and "directories_listed" / "files_discovered" counters
+        """
+        # Default to every extension a handler is registered for
+        self.supported_extensions = supported_extensions or HandlerRegistry().extensions()
+        self.exclude = exclude or []
+        self.max_depth = max_depth
+        self.skip_hidden = skip_hidden
+        self.skip_vcs = skip_vcs
+        self.listing_threads = listing_threads
+        self.queue_size = queue_size
+        self.metrics = metrics
+
+        self._extensions = frozenset(extension.lower() for extension in self.supported_extensions)
+        self._exclude_pattern = (
+            re.compile('|'.join(fnmatch.translate(pattern) for pattern in self.exclude))
+            if self.exclude else None
+        )
 
     def discover_files(self, root_path: str) -> Generator[Path, None, None]:
         """Recursively find all CAD files under root_path"""
-        root = Path(root_path)
+        for entry in self.iter_entries(root_path):
+            yield Path(entry.path)
+
+    def iter_entries(self, root_path: str) -> Generator[FileEntry, None, None]:
+        """
+        Recursively find all CAD files under root_path with their size and mtime.
+
+        Walks the tree with os.scandir, reusing each DirEntry's cached type
+        information and checking the extension before any Path or stat call
+        is made, so non-CAD files cost one string comparison. Directories
+        that cannot be listed are skipped.
+        """
+        root = (str(Path(root_path)), '', 0)
+        if self.listing_threads > 1:
+            yield from self._iter_entries_concurrent(root)
+            return
+
+        stack = [root]
+        while stack:
+            files, subdirectories = self._list_directory(*stack.pop())
+            yield from files
+            # Depth-first, visiting subdirectories in listing order
+            stack.extend(reversed(subdirectories))
+
+    def _iter_entries_concurrent(self, root: _Directory) -> Generator[FileEntry, None, None]:
+        """
+        Crawl with a thread pool in a background thread, streaming files through a queue.
+
+        The next directories in depth-first order are listed ahead of their
+        turn, at most listing_threads at a time, and each listing is released
+        when its turn comes, so files stream in the same order as a serial
+        crawl. Listings done ahead are buffered, 2 * listing_threads at most;
+        the bounded queue applies backpressure when the consumer falls
+        behind. Closing the generator early stops the crawl.
+        """
+        found = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        lookahead = 2 * self.listing_threads
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    found.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def crawl():
+            try:
+                with ThreadPoolExecutor(max_workers=self.listing_threads) as pool:
+                    stack = [root]
+                    listings = {}  # directory -> listing started ahead of its turn
+                    while stack and not stop.is_set():
+                        for directory in reversed(stack[-lookahead:]):
+                            if len(listings) >= lookahead:
+                                break
+                            if directory not in listings:
+                                listings[directory] = pool.submit(self._list_directory, *directory)
+
+                        directory = stack.pop()
+                        listing = listings.pop(directory, None) or pool.submit(self._list_directory, *directory)
+                        files, subdirectories = listing.result()
+                        for entry in files:
+                            if not put(entry):
+                                return
+                        # Depth-first, visiting subdirectories in listing order
+                        stack.extend(reversed(subdirectories))
+            except BaseException as e:
+                put(e)
+            finally:
+                put(_DONE)
+
+        crawler_thread = threading.Thread(target=crawl, name="cad-crawler", daemon=True)
+        crawler_thread.start()
+        try:
+            while True:
+                item = found.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            crawler_thread.join()
+
+    def _list_directory(self, directory: str, relative_dir: str,
+                        depth: int) -> Tuple[List[FileEntry], List[_Directory]]:
+        """List one directory: its CAD files and the subdirectories to descend into"""
+        if self.metrics is None:
+            return self._scan_directory(directory, relative_dir, depth)
+
+        start = time.perf_counter()
+        files, subdirectories = self._scan_directory(directory, relative_dir, depth)
+        self.metrics.record('list_directory', time.perf_counter() - start)
+        self.metrics.count('directories_listed')
+        self.metrics.count('files_discovered', len(files))
+        return files, subdirectories
+
+    def _scan_directory(self, directory: str, relative_dir: str,
+                        depth: int) -> Tuple[List[FileEntry], List[_Directory]]:
+        files = []
+        subdirectories = []
+        try:
+            iterator = os.scandir(directory)
+        except OSError:
+            return files, subdirectories
+
+        with iterator:
+            for entry in iterator:
+                name = entry.name
+                relative = relative_dir + name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+
+                if is_dir:
+                    if self._descend(name, relative, depth):
+                        subdirectories.append((entry.path, relative + '/', depth + 1))
+                    continue
+
+                if os.path.splitext(name)[1].lower() not in self._extensions:
+                    continue
+                if self._skipped(name, relative):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append(FileEntry(entry.path, stat.st_size, stat.st_mtime_ns))
+
+        return files, subdirectories
+
+    def _descend(self, name: str, relative: str, depth: int) -> bool:
+        """Check whether the crawler should walk into a directory"""
+        if self.max_depth is not None and depth >= self.max_depth:
+            return False
+        if self.skip_vcs and name in VCS_DIRECTORIES:
+            return False
+        return not self._skipped(name, relative)
+
+    def _skipped(self, name: str, relative: str) -> bool:
+        """Check the hidden and exclude rules for a file or directory"""
+        if self.skip_hidden and name.startswith('.'):
+            return True
+        if self._exclude_pattern is not None:
+            return bool(self._exclude_pattern.match(name) or self._exclude_pattern.match(relative))
+        return False
 
-        # Recursively walk through all files
-        for file_path in root.rglob('*'):
-            if file_path.is_file() and self._is_cad_file(file_path):
-                yield file_path
     def _is_cad_file(self, file_path: Path) -> bool:
         """Check if file extension indicates CAD file"""
-        return file_path.suffix.lower() in self.supported_extensions
+        return file_path.suffix.lower() in self._extensions
 
     def extract_project_info(self, file_path: Path, root_path: str) -> str:
         """Try to infer project from directory structure"""
@@ -33,6 +244,3 @@ class FileSystemCrawler:
             return parts[0] if len(parts) > 1 else "Unknown"
         except (ValueError, IndexError):
             return "Unknown"
-
-
-
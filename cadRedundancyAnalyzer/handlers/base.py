@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Tuple
 from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature
 
 
@@ -17,6 +18,40 @@ class CADFileHandler(ABC):
         pass
 
     @abstractmethod
-    def get_metadata(self, file_path: str) -> ComponentMetadata:
+    def get_metadata(self, file_path: str, project_id: str) -> ComponentMetadata:
         """Extract metadata from the CAD file"""
-        pass
\ No newline at end of file
+        pass
+
+    def analyze(self, file_path: str, project_id: str) -> Tuple[ComponentMetadata, GeometricSignature]:
+        """
+        Extract metadata and geometric signature in one call.
+
+        Handlers that can share a single parse between both results should
+        override this; the default simply calls the two extractors.
+
+        Args:
+            file_path: Full path to the CAD file
+            project_id: Project the file belongs to
+
+        Returns:
+            Tuple of (ComponentMetadata, GeometricSignature)
+        """
+        return self.get_metadata(file_path, project_id), self.extract_geometry(file_path)
+
+    def analyze_bytes(self, file_path: str, project_id: str,
+                      data: bytes) -> Tuple[ComponentMetadata, GeometricSignature]:
+        """
+        Like analyze(), for a file whose contents have already been read.
+
+        Handlers that can parse from memory should override this; the default
+        reads the file again, which the earlier read has left in the OS cache.
+
+        Args:
+            file_path: Full path to the CAD file
+            project_id: Project the file belongs to
+            data: The file's bytes
+
+        Returns:
+            Tuple of (ComponentMetadata, GeometricSignature)
+        """
+        return self.analyze(file_path, project_id)
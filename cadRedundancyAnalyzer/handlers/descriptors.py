@@ -0,0 +1,124 @@
+# cadRedundancyAnalyzer/handlers/descriptors.py
+from typing import Optional
+
+import numpy as np
+
+from cadRedundancyAnalyzer.core.models import ShapeDescriptor
+from cadRedundancyAnalyzer.handlers.stl_reader import TriangleSource
+
+DEFAULT_BINS = 32
+DEFAULT_SAMPLES = 512
+
+# Low-discrepancy step for the second barycentric coordinate of the samples
+_GOLDEN = (np.sqrt(5.0) - 1) / 2
+
+
+def _areas(triangles: np.ndarray) -> np.ndarray:
+    crosses = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    return np.sqrt((crosses ** 2).sum(axis=1)) / 2.0
+
+
+def shape_descriptor(source: TriangleSource, bins: int = DEFAULT_BINS,
+                     samples: int = DEFAULT_SAMPLES) -> Optional[ShapeDescriptor]:
+    """
+    Compute pose-invariant features of a triangle mesh in two passes over its chunks.
+
+    The first pass accumulates the area-weighted first and second moments
+    of the surface, whose covariance gives the principal axes and the shell
+    inertia eigenvalues. The second pass projects the vertices onto the
+    principal axes for the extents, and picks `samples` surface points by
+    stratified area sampling for the D2 histogram of pairwise distances
+    (scaled by the principal box diagonal). Sampling is deterministic, so a
+    file always gets the same descriptor.
+
+    Args:
+        source: Factory of float64 (n, 3, 3) triangle chunks
+        bins: Number of D2 histogram bins
+        samples: Number of surface points whose pairwise distances are binned
+
+    Returns:
+        ShapeDescriptor, or None for meshes without surface area or with
+        non-finite values
+    """
+    reference = None
+    total_area = 0.0
+    first_moment = np.zeros(3)
+    second_moment = np.zeros((3, 3))
+
+    for triangles in source():
+        if not len(triangles):
+            continue
+        if reference is None:
+            reference = triangles[0, 0].copy()
+        # Moments about a point on the mesh, to keep far-off parts accurate
+        local = triangles - reference
+        areas = _areas(local)
+        corner_sums = local.sum(axis=1)
+
+        total_area += areas.sum()
+        first_moment += (areas[:, None] * corner_sums).sum(axis=0) / 3
+        second_moment += (np.einsum('n,nvi,nvj->ij', areas, local, local) +
+                          np.einsum('n,ni,nj->ij', areas, corner_sums, corner_sums)) / 12
+
+    if reference is None or not total_area > 0 or not np.isfinite(total_area):
+        return None
+
+    centroid = first_moment / total_area
+    covariance = second_moment / total_area - np.outer(centroid, centroid)
+    if not np.isfinite(covariance).all():
+        return None
+    variances, axes = np.linalg.eigh(covariance)
+
+    # Shell inertia per unit area: trace(C) * I - C shares C's eigenvectors
+    inertia = np.sort(variances.sum() - variances)[::-1]
+
+    # Stratified positions along the cumulative surface area
+    positions = (np.arange(samples) + 0.5) * (total_area / samples)
+    second = (np.arange(samples) * _GOLDEN) % 1.0
+    points = np.empty((samples, 3))
+
+    low = np.full(3, np.inf)
+    high = np.full(3, -np.inf)
+    offset = 0.0
+    for triangles in source():
+        if not len(triangles):
+            continue
+        local = triangles - reference
+        projected = (local.reshape(-1, 3) - centroid) @ axes
+        low = np.minimum(low, projected.min(axis=0))
+        high = np.maximum(high, projected.max(axis=0))
+
+        areas = _areas(local)
+        cumulative = offset + np.cumsum(areas)
+        chosen = np.flatnonzero((positions >= offset) & (positions < cumulative[-1]))
+        if len(chosen):
+            rows = np.minimum(np.searchsorted(cumulative, positions[chosen], side='right'), len(areas) - 1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                first = (positions[chosen] - (cumulative[rows] - areas[rows])) / areas[rows]
+            root = np.sqrt(np.clip(np.nan_to_num(first), 0.0, 1.0))[:, None]
+            r2 = second[chosen][:, None]
+            corners = local[rows]
+            points[chosen] = ((1 - root) * corners[:, 0] + root * (1 - r2) * corners[:, 1] +
+                              root * r2 * corners[:, 2])
+        offset = cumulative[-1]
+
+    # Positions past the last cumulative sum (rounding) take the last point
+    missing = positions >= offset
+    if missing.any():
+        points[missing] = points[~missing][-1] if (~missing).any() else local[-1, 0]
+
+    extents = np.sort(high - low)[::-1]
+    diagonal = np.sqrt((extents ** 2).sum())
+    if not diagonal > 0 or not np.isfinite(diagonal):
+        return None
+
+    squared = (points ** 2).sum(axis=1)
+    distances = np.sqrt(np.maximum(squared[:, None] + squared[None, :] - 2 * points @ points.T, 0.0))
+    pairs = distances[np.triu_indices(samples, k=1)] / diagonal
+    counts, _ = np.histogram(np.minimum(pairs, 1.0), bins=bins, range=(0.0, 1.0))
+
+    return ShapeDescriptor(
+        principal_extents=tuple(extents.tolist()),
+        inertia=tuple(inertia.tolist()),
+        d2_histogram=tuple((counts / len(pairs)).tolist())
+    )
@@ -0,0 +1,183 @@
+# cadRedundancyAnalyzer/handlers/registry.py
+import importlib
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cadRedundancyAnalyzer.handlers.base import CADFileHandler
+
+# Entry-point group through which installed packages add format handlers. Each
+# entry point is named after the extension it handles ('.step' or 'step') and
+# points at a handler class or factory, e.g. 'my_package.step_handler:StepHandler'
+ENTRY_POINT_GROUP = 'cad_redundancy_analyzer.handlers'
+
+# Handlers shipped with the package, as 'module:attribute' targets so their
+# modules (and trimesh behind them) are imported only when first needed
+BUILTIN_HANDLERS = {
+    '.stl': 'cadRedundancyAnalyzer.handlers.stl_handler:STLFileHandler',
+}
+
+# Creates a handler from keyword options (see RegistryHandler)
+HandlerFactory = Callable[..., CADFileHandler]
+
+
+def _extension(name: str) -> str:
+    """Lower-case extension with its leading dot"""
+    name = name.lower()
+    return name if name.startswith('.') else '.' + name
+
+
+@lru_cache(maxsize=None)
+def _installed_entry_points(group: str) -> Tuple[Any, ...]:
+    """Entry points of a group across installed distributions, scanned once per process"""
+    return tuple(metadata.entry_points(group=group))
+
+
+class HandlerRegistry:
+    """
+    Format handlers by file extension, imported on first use.
+
+    A handler is registered as a 'module:attribute' string, an entry point
+    or an already imported class or factory. Strings and entry points are
+    only imported by load() - when the first file of their type is handled
+    - so a process that never meets a format never pays for its imports.
+    """
+
+    def __init__(self, entry_points: bool = True):
+        """
+        Args:
+            entry_points: Also register the handlers installed packages
+                declare in the ENTRY_POINT_GROUP entry-point group; they
+                take precedence over the built-in handlers
+        """
+        self._targets: Dict[str, Any] = {}  # extension -> import string, entry point or factory
+        self._loaded: Dict[str, HandlerFactory] = {}
+        for extension, target in BUILTIN_HANDLERS.items():
+            self.register(extension, target)
+        if entry_points:
+            for entry_point in _installed_entry_points(ENTRY_POINT_GROUP):
+                self.register(entry_point.name, entry_point)
+
+    def __getstate__(self):
+        # Worker processes import handlers on their own first use
+        return {'_targets': self._targets, '_loaded': {}}
+
+    def register(self, extension: str, target):
+        """
+        Handle files of an extension with a handler class or factory.
+
+        Args:
+            extension: File extension, with or without the leading dot
+            target: 'module:attribute' import string, importlib.metadata
+                entry point, or a handler class or factory
+        """
+        extension = _extension(extension)
+        self._targets[extension] = target
+        self._loaded.pop(extension, None)
+
+    def extensions(self) -> List[str]:
+        """Registered extensions, e.g. for FileSystemCrawler(supported_extensions=...)"""
+        return sorted(self._targets)
+
+    def supports(self, file_path: str) -> bool:
+        return Path(file_path).suffix.lower() in self._targets
+
+    def load(self, extension: str) -> HandlerFactory:
+        """
+        Handler class or factory of an extension, importing it on first use.
+
+        Raises:
+            ValueError: If no handler is registered for the extension
+        """
+        extension = _extension(extension)
+        factory = self._loaded.get(extension)
+        if factory is not None:
+            return factory
+
+        target = self._targets.get(extension)
+        if target is None:
+            raise ValueError(f"No handler registered for {extension} files")
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(':')
+            factory = importlib.import_module(module_name)
+            for name in attribute.split('.'):
+                factory = getattr(factory, name)
+        elif isinstance(target, metadata.EntryPoint):
+            factory = target.load()
+        else:
+            factory = target
+        self._loaded[extension] = factory
+        return factory
+
+    def is_loaded(self, extension: str) -> bool:
+        """Whether the handler of an extension has been imported"""
+        return _extension(extension) in self._loaded
+
+
+class RegistryHandler(CADFileHandler):
+    """
+    Handler that passes every file to the registered handler of its extension.
+
+    Each format's handler is created the first time a file of that type is
+    handled, by calling its class or factory with this handler's keyword
+    options (ComponentAnalyzer passes `descriptors` and `metrics`). Pickled
+    copies, such as the ones worker processes receive, carry the registry
+    but no created handlers.
+    """
+
+    def __init__(self, registry: Optional[HandlerRegistry] = None, **options):
+        """
+        Args:
+            registry: Handlers to dispatch to (default: a HandlerRegistry
+                with the built-in and installed handlers)
+            **options: Keyword arguments every handler is created with
+        """
+        self.registry = registry if registry is not None else HandlerRegistry()
+        self.options = options
+        self._handlers: Dict[str, CADFileHandler] = {}
+
+    def __getstate__(self):
+        return {'registry': self.registry, 'options': self.options, '_handlers': {}}
+
+    @property
+    def descriptors(self) -> bool:
+        return self.options.get('descriptors', False)
+
+    @property
+    def metrics(self):
+        return self.options.get('metrics')
+
+    @metrics.setter
+    def metrics(self, metrics):
+        # Handlers created from here on record into the new metrics
+        self.options = dict(self.options, metrics=metrics)
+        self._handlers = {}
+
+    def handler_for(self, file_path: str) -> CADFileHandler:
+        """
+        The handler of a file's extension, created on first use.
+
+        Raises:
+            ValueError: If no handler is registered for the extension
+        """
+        extension = Path(file_path).suffix.lower()
+        handler = self._handlers.get(extension)
+        if handler is None:
+            handler = self._handlers[extension] = self.registry.load(extension)(**self.options)
+        return handler
+
+    def can_handle(self, file_path: str) -> bool:
+        return self.registry.supports(file_path) and self.handler_for(file_path).can_handle(file_path)
+
+    def extract_geometry(self, file_path: str):
+        return self.handler_for(file_path).extract_geometry(file_path)
+
+    def get_metadata(self, file_path: str, project_id: str):
+        return self.handler_for(file_path).get_metadata(file_path, project_id)
+
+    def analyze(self, file_path: str, project_id: str):
+        return self.handler_for(file_path).analyze(file_path, project_id)
+
+    def analyze_bytes(self, file_path: str, project_id: str, data: bytes):
+        return self.handler_for(file_path).analyze_bytes(file_path, project_id, data)
@@ -1,55 +1,166 @@
+import io
+import os
 from pathlib import Path
-import trimesh
-from cadRedundancyAnalyzer.handlers.base import CADFileHandler
-from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature
-class STLFileHandler(CADFileHandler):
-    def can_handle(self, file_path: str) -> bool:
-        return Path(file_path).suffix.lower() == '.stl'
-
-    def extract_geometry(self, file_path: str) -> GeometricSignature:
-        from pathlib import Path
-import trimesh
+from typing import Optional, Tuple
 import hashlib
 from cadRedundancyAnalyzer.handlers.base import CADFileHandler
+from cadRedundancyAnalyzer.handlers.descriptors import shape_descriptor
+from cadRedundancyAnalyzer.handlers.stl_reader import (
+    DEFAULT_MEMORY_LIMIT, MeshProperties, TriangleSource, accumulate, buffer_triangle_source, triangle_source
+)
+from cadRedundancyAnalyzer.core.metrics import RunMetrics, timed
 from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature
 
 
+# Files at least this large are streamed rather than loaded
+DEFAULT_STREAMING_THRESHOLD = 512 * 1024 * 1024
+
+
 class STLFileHandler(CADFileHandler):
+    def __init__(self, fast_binary: bool = True,
+                 streaming_threshold: Optional[int] = DEFAULT_STREAMING_THRESHOLD,
+                 memory_limit: int = DEFAULT_MEMORY_LIMIT, descriptors: bool = False,
+                 metrics: Optional[RunMetrics] = None):
+        """
+        Args:
+            fast_binary: Read binary STL files with the memory-mapped reader
+                instead of building a trimesh.Trimesh. ASCII and malformed
+                files below the streaming threshold go through trimesh.
+            streaming_threshold: File size in bytes from which binary and ASCII
+                files are read in chunks with running totals, never holding
+                the whole mesh in memory (None: never stream)
+            memory_limit: Working memory ceiling in bytes for chunked reading,
+                which sets how many triangles are processed at a time
+            descriptors: Also compute a pose-invariant ShapeDescriptor for each
+                signature (a second pass over the triangles of the same load)
+            metrics: Optional RunMetrics that receives "load", "properties",
+                "hash" and "descriptor" stage times
+        """
+        self.fast_binary = fast_binary
+        self.streaming_threshold = streaming_threshold
+        self.memory_limit = memory_limit
+        self.descriptors = descriptors
+        self.metrics = metrics
+
     def can_handle(self, file_path: str) -> bool:
         return Path(file_path).suffix.lower() == '.stl'
 
-    def get_metadata(self, file_path: str, project_id: str) -> ComponentMetadata:
-        """Extract metadata from STL file"""
-        path = Path(file_path)
+    def analyze(self, file_path: str, project_id: str) -> Tuple[ComponentMetadata, GeometricSignature]:
+        """Load the STL file once and extract both metadata and geometry"""
+        signature = self._read_signature(file_path)
+        metadata = self._build_metadata(file_path, project_id, signature.volume)
 
-        # Load the mesh to get volume
-        mesh = trimesh.load_mesh(str(file_path))
+        return metadata, signature
 
-        # Create metadata with basic file info and calculated volume
-        metadata = ComponentMetadata(
-            file_path=str(file_path),
-            file_name=path.name,
-            project_id=project_id,
-            volume=float(mesh.volume) if mesh.volume else 0.0
-        )
+    def analyze_bytes(self, file_path: str, project_id: str,
+                      data: bytes) -> Tuple[ComponentMetadata, GeometricSignature]:
+        """Parse STL file contents already read into memory, giving the same results as analyze()"""
+        signature = self._read_signature(file_path, data)
+        metadata = self._build_metadata(file_path, project_id, signature.volume)
 
-        return metadata
+        return metadata, signature
 
     def extract_geometry(self, file_path: str) -> GeometricSignature:
         """Extract geometric properties from STL file"""
-        # Load the mesh
-        mesh = trimesh.load_mesh(str(file_path))
-
-        # Calculate bounding box (min_x, min_y, min_z, max_x, max_y, max_z)
-        bounds = mesh.bounds  # Returns [[min_x, min_y, min_z], [max_x, max_y, max_z]]
-        bounding_box = (
-            float(bounds[0][0]), float(bounds[0][1]), float(bounds[0][2]),
-            float(bounds[1][0]), float(bounds[1][1]), float(bounds[1][2])
-        )
+        return self._read_signature(file_path)
+
+    def get_metadata(self, file_path: str, project_id: str) -> ComponentMetadata:
+        """Extract metadata from STL file"""
+        fast = self._fast_read(str(file_path))
+        if fast is not None:
+            volume = fast[0].volume if fast[0].volume else 0.0
+        else:
+            # Load the mesh to get volume
+            volume = self._mesh_volume(self._load_mesh(file_path))
+
+        return self._build_metadata(file_path, project_id, volume)
+
+    def _read_signature(self, file_path: str, data: Optional[bytes] = None) -> GeometricSignature:
+        """Signature of a file (or of its contents, when given), with a shape descriptor when enabled"""
+        properties, source = self._read_properties(file_path, data)
+        with timed(self.metrics, 'hash'):
+            signature = self._signature_from_properties(properties)
+        if self.descriptors:
+            with timed(self.metrics, 'descriptor'):
+                signature.descriptor = shape_descriptor(source)
+        return signature
+
+    def _read_properties(self, file_path: str,
+                         data: Optional[bytes] = None) -> Tuple[MeshProperties, TriangleSource]:
+        """Volume, area and bounds, from a chunked reader or a trimesh load, with the triangles read"""
+        # The chunked readers compute the properties while reading, within "load"
+        with timed(self.metrics, 'load'):
+            fast = self._fast_read(str(file_path), data)
+            # Otherwise load the mesh
+            mesh = self._load_mesh(file_path, data) if fast is None else None
+        if fast is not None:
+            return fast
+
+        with timed(self.metrics, 'properties'):
+            # Calculate bounding box (min_x, min_y, min_z, max_x, max_y, max_z)
+            bounds = mesh.bounds  # Returns [[min_x, min_y, min_z], [max_x, max_y, max_z]]
+            bounding_box = (
+                float(bounds[0][0]), float(bounds[0][1]), float(bounds[0][2]),
+                float(bounds[1][0]), float(bounds[1][1]), float(bounds[1][2])
+            )
+
+            properties = MeshProperties(
+                volume=self._mesh_volume(mesh),
+                surface_area=float(mesh.area) if mesh.area else 0.0,
+                bounds=bounding_box,
+                triangle_count=len(mesh.faces)
+            )
+        return properties, lambda: iter([mesh.triangles])
+
+    def _load_mesh(self, file_path: str, data: Optional[bytes] = None):
+        """Load a file (or its contents, when given) as a trimesh.Trimesh"""
+        # Imported on first use: binary files on the fast path never need trimesh
+        import trimesh
+
+        if data is not None:
+            return trimesh.load_mesh(io.BytesIO(data), file_type='stl')
+        return trimesh.load_mesh(str(file_path))
+
+    def _fast_read(self, file_path: str,
+                   data: Optional[bytes] = None) -> Optional[Tuple[MeshProperties, TriangleSource]]:
+        """
+        Properties and triangles read without trimesh, or None if the file needs a trimesh load.
+
+        With data, binary files are read from those bytes; files above the
+        streaming threshold are still streamed from disk.
+
+        Raises:
+            ValueError: If a file above the streaming threshold is not valid STL
+        """
+        size = len(data) if data is not None else os.path.getsize(file_path)
+        streaming = self.streaming_threshold is not None and size >= self.streaming_threshold
+        if not (streaming or self.fast_binary):
+            return None
+
+        if data is not None and not streaming:
+            source = buffer_triangle_source(data, self.memory_limit)
+        else:
+            source = triangle_source(file_path, self.memory_limit, streaming)
+        properties = None
+        if source is not None:
+            try:
+                properties = accumulate(source())
+            except ValueError:
+                pass
+
+        if properties is None:
+            if streaming:
+                raise ValueError(f"Cannot stream {file_path}: not a valid binary or ASCII STL file")
+            return None
+        return properties, source
+
+    def _signature_from_properties(self, properties: MeshProperties) -> GeometricSignature:
+        """Build the geometric signature of a mesh from its properties"""
+        bounding_box = properties.bounds
 
         # Calculate volume and surface area
-        volume = float(mesh.volume) if mesh.volume else 0.0
-        surface_area = float(mesh.area) if mesh.area else 0.0
+        volume = properties.volume if properties.volume else 0.0
+        surface_area = properties.surface_area if properties.surface_area else 0.0
 
         # Generate geometric hash based on key properties
         # This creates a fingerprint for similarity comparison
@@ -63,18 +174,15 @@ class STLFileHandler(CADFileHandler):
             geometric_hash=geometric_hash
         )
 
-    def get_metadata(self, file_path: str, project_id: str) -> ComponentMetadata:
-        path = Path(file_path)
+    def _mesh_volume(self, mesh) -> float:
+        """Volume of a loaded mesh, 0.0 when trimesh cannot compute one"""
+        return float(mesh.volume) if mesh.volume else 0.0
 
-        # Load the mesh to get volume
-        mesh = trimesh.load_mesh(str(file_path))
-
-        # Create metadata with basic file info and calculated volume
-        metadata = ComponentMetadata(
+    def _build_metadata(self, file_path: str, project_id: str, volume: float) -> ComponentMetadata:
+        """Create metadata with basic file info and calculated volume"""
+        return ComponentMetadata(
             file_path=str(file_path),
-            file_name=path.name,
+            file_name=Path(file_path).name,
             project_id=project_id,
-            volume=float(mesh.volume) if mesh.volume else 0.0
+            volume=volume
         )
-
-        return metadata
@@ -0,0 +1,336 @@
+# cadRedundancyAnalyzer/handlers/stl_reader.py
+import mmap
+import os
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Binary STL layout: 80-byte header, uint32 triangle count, then 50-byte records
+HEADER_SIZE = 84
+TRIANGLE_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attribute', '<u2'),
+])
+
+# Triangles converted to float64 at a time (about 72 MB of scratch space)
+DEFAULT_CHUNK_TRIANGLES = 1 << 20
+
+# Estimated peak working memory per triangle of a chunk, used to size chunks
+# under a memory limit: the raw record, its float64 copy and the temporaries
+# of PropertyAccumulator.add for binary files; the line objects, joined text
+# and split tokens on top of that for ASCII files
+BINARY_BYTES_PER_TRIANGLE = 256
+ASCII_BYTES_PER_TRIANGLE = 1024
+
+DEFAULT_MEMORY_LIMIT = 256 * 1024 * 1024
+
+
+class MeshProperties(NamedTuple):
+    """Properties of a triangle mesh needed for a GeometricSignature"""
+    volume: float
+    surface_area: float
+    bounds: Tuple[float, float, float, float, float, float]  # (min_x, min_y, min_z, max_x, max_y, max_z)
+    triangle_count: int
+
+
+class PropertyAccumulator:
+    """
+    Running totals of signed volume, surface area and bounds over triangle chunks.
+
+    Uses the same float64 formulas as trimesh (divergence-theorem volume and
+    half cross-product norms for area), so results agree with the trimesh
+    path to rounding.
+    """
+
+    def __init__(self):
+        self.volume_sum = 0.0
+        self.area_sum = 0.0
+        self.minimum = np.full(3, np.inf)
+        self.maximum = np.full(3, -np.inf)
+        self.triangle_count = 0
+
+    def add(self, vertices: np.ndarray):
+        """Add an (n, 3, 3) array of triangle vertices (any float dtype)"""
+        if len(vertices) == 0:
+            return
+        triangles = np.asarray(vertices, dtype=np.float64)
+
+        edges = np.diff(triangles, axis=1)
+        crosses = np.cross(edges[:, 0], edges[:, 1])
+        f1 = triangles[:, 0, 0] + triangles[:, 1, 0] + triangles[:, 2, 0]
+
+        self.volume_sum += (crosses[:, 0] * f1).sum()
+        self.area_sum += (np.sqrt((crosses ** 2).sum(axis=1)) / 2.0).sum()
+        self.minimum = np.minimum(self.minimum, triangles.min(axis=(0, 1)))
+        self.maximum = np.maximum(self.maximum, triangles.max(axis=(0, 1)))
+        self.triangle_count += len(triangles)
+
+    def result(self) -> Optional[MeshProperties]:
+        """Final properties, or None if there were no triangles or any value is not finite"""
+        if self.triangle_count == 0:
+            return None
+
+        volume = self.volume_sum / 6
+        bounds = tuple(float(value) for value in np.concatenate([self.minimum, self.maximum]))
+        if not (np.isfinite(volume) and np.isfinite(self.area_sum) and np.isfinite(bounds).all()):
+            return None
+
+        return MeshProperties(float(volume), float(self.area_sum), bounds, self.triangle_count)
+
+
+def binary_triangle_count(file_path: str) -> Optional[int]:
+    """
+    Triangle count of a binary STL file, or None if the file is not binary STL.
+
+    A file is binary when its size is exactly the header plus 50 bytes per
+    triangle in the header's count; ASCII files (and binary files that
+    start with 'solid', which some exporters write) are told apart this way.
+    """
+    size = os.path.getsize(file_path)
+    if size < HEADER_SIZE:
+        return None
+
+    with open(file_path, 'rb') as f:
+        f.seek(80)
+        return _binary_count(size, f.read(4))
+
+
+def buffer_triangle_count(data: bytes) -> Optional[int]:
+    """Triangle count of binary STL file contents held in memory, or None if they are not binary STL"""
+    if len(data) < HEADER_SIZE:
+        return None
+    return _binary_count(len(data), data[80:HEADER_SIZE])
+
+
+def _binary_count(size: int, count_bytes: bytes) -> Optional[int]:
+    """The header's triangle count, if it accounts for exactly `size` bytes"""
+    count = int(np.frombuffer(count_bytes, dtype='<u4')[0])
+    if size != HEADER_SIZE + count * TRIANGLE_DTYPE.itemsize:
+        return None
+    return count
+
+
+# Factory of float64 (n, 3, 3) triangle chunks; each call starts a new pass over the file
+TriangleSource = Callable[[], Iterator[np.ndarray]]
+
+
+def accumulate(chunks: Iterable[np.ndarray]) -> Optional[MeshProperties]:
+    """Mesh properties of a sequence of triangle chunks (see PropertyAccumulator.result)"""
+    accumulator = PropertyAccumulator()
+    for vertices in chunks:
+        accumulator.add(vertices)
+    return accumulator.result()
+
+
+def chunk_triangles_for(memory_limit: int, bytes_per_triangle: int = BINARY_BYTES_PER_TRIANGLE) -> int:
+    """Largest chunk of triangles whose working memory stays under memory_limit bytes"""
+    return max(1, memory_limit // bytes_per_triangle)
+
+
+def mapped_chunks(file_path: str, count: int,
+                  chunk_triangles: int = DEFAULT_CHUNK_TRIANGLES) -> Iterator[np.ndarray]:
+    """
+    Triangle chunks of a memory-mapped binary STL file.
+
+    The records are mapped as a NumPy structured array; only the chunk
+    being yielded is converted to float64.
+    """
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        records = np.frombuffer(mapped, dtype=TRIANGLE_DTYPE, count=count, offset=HEADER_SIZE)
+        try:
+            for start in range(0, count, chunk_triangles):
+                # Strided float32 view of the chunk, converted to a float64 copy
+                yield records['vertices'][start:start + chunk_triangles].astype(np.float64)
+        finally:
+            # Views must be gone before the mapping can be closed
+            del records
+
+
+def buffer_chunks(data: bytes, count: int,
+                  chunk_triangles: int = DEFAULT_CHUNK_TRIANGLES) -> Iterator[np.ndarray]:
+    """Triangle chunks of binary STL file contents already read into memory"""
+    records = np.frombuffer(data, dtype=TRIANGLE_DTYPE, count=count, offset=HEADER_SIZE)
+    for start in range(0, count, chunk_triangles):
+        yield records['vertices'][start:start + chunk_triangles].astype(np.float64)
+
+
+def streamed_chunks(file_path: str, count: int,
+                    chunk_triangles: int = DEFAULT_CHUNK_TRIANGLES) -> Iterator[np.ndarray]:
+    """
+    Triangle chunks of a binary STL file read into one reused buffer.
+
+    Unlike mapped_chunks the file is never mapped, so resident memory stays
+    at one chunk however large the file is.
+
+    Raises:
+        ValueError: If the file ends before `count` triangles
+    """
+    record_size = TRIANGLE_DTYPE.itemsize
+    buffer = np.empty(min(count, chunk_triangles) * record_size, dtype=np.uint8)
+    with open(file_path, 'rb', buffering=0) as f:
+        f.seek(HEADER_SIZE)
+        remaining = count
+        while remaining:
+            triangles = min(remaining, chunk_triangles)
+            size = triangles * record_size
+            if not _read_exactly(f, memoryview(buffer)[:size]):
+                raise ValueError(f"Truncated binary STL file: {file_path}")
+            yield buffer[:size].view(TRIANGLE_DTYPE)['vertices'].astype(np.float64)
+            remaining -= triangles
+
+
+def ascii_chunks(file_path: str, chunk_triangles: int = DEFAULT_CHUNK_TRIANGLES) -> Iterator[np.ndarray]:
+    """
+    Triangle chunks of an ASCII STL file.
+
+    Only 'vertex' lines are kept; every chunk_triangles triangles they are
+    parsed into a float64 array.
+
+    Raises:
+        ValueError: If the file is not a valid ASCII STL
+    """
+    coordinates = []
+    with open(file_path, 'rb') as f:
+        if not f.read(5).lower() == b'solid':
+            raise ValueError(f"Not an ASCII STL file: {file_path}")
+        for line in f:
+            line = line.strip()
+            if line[:6].lower() == b'vertex':
+                coordinates.append(line[6:])
+                if len(coordinates) == 3 * chunk_triangles:
+                    yield _parse_ascii_chunk(coordinates)
+                    coordinates = []
+
+    if len(coordinates) % 3:
+        raise ValueError(f"Incomplete triangle in ASCII STL file: {file_path}")
+    if coordinates:
+        yield _parse_ascii_chunk(coordinates)
+
+
+def triangle_source(file_path: str, memory_limit: int = DEFAULT_MEMORY_LIMIT,
+                    streaming: bool = False) -> Optional[TriangleSource]:
+    """
+    Chunked triangle reader for an STL file, or None if it should be loaded by trimesh.
+
+    Args:
+        file_path: Path to the STL file
+        memory_limit: Working memory ceiling in bytes, which sets the chunk size
+        streaming: Read through one reused buffer instead of memory-mapping,
+            and parse ASCII files in chunks instead of leaving them to trimesh
+    """
+    count = binary_triangle_count(file_path)
+    if count is not None and (count or streaming):
+        chunks = streamed_chunks if streaming else mapped_chunks
+        chunk_triangles = chunk_triangles_for(memory_limit)
+        return lambda: chunks(file_path, count, chunk_triangles)
+    if count is None and streaming:
+        chunk_triangles = chunk_triangles_for(memory_limit, ASCII_BYTES_PER_TRIANGLE)
+        return lambda: ascii_chunks(file_path, chunk_triangles)
+    return None
+
+
+def buffer_triangle_source(data: bytes, memory_limit: int = DEFAULT_MEMORY_LIMIT) -> Optional[TriangleSource]:
+    """
+    Chunked triangle reader over binary STL file contents held in memory,
+    or None if they are not binary STL (or have no triangles) and should be
+    loaded by trimesh.
+    """
+    count = buffer_triangle_count(data)
+    if not count:
+        return None
+    chunk_triangles = chunk_triangles_for(memory_limit)
+    return lambda: buffer_chunks(data, count, chunk_triangles)
+
+
+def read_binary_stl(file_path: str,
+                    chunk_triangles: int = DEFAULT_CHUNK_TRIANGLES) -> Optional[MeshProperties]:
+    """
+    Compute mesh properties straight from a memory-mapped binary STL file.
+
+    The triangle records are mapped as a NumPy structured array and reduced
+    chunk by chunk, so no Trimesh object (vertex merging, adjacency caches,
+    validation) is ever built.
+
+    Args:
+        file_path: Path to the STL file
+        chunk_triangles: Triangles converted to float64 at a time
+
+    Returns:
+        MeshProperties, or None when the file is ASCII, malformed or empty,
+        or has non-finite coordinates - callers should fall back to trimesh
+    """
+    count = binary_triangle_count(file_path)
+    if not count:
+        return None
+    return accumulate(mapped_chunks(file_path, count, chunk_triangles))
+
+
+def stream_binary_stl(file_path: str,
+                      chunk_triangles: int = DEFAULT_CHUNK_TRIANGLES) -> Optional[MeshProperties]:
+    """
+    Compute mesh properties of a binary STL file read in fixed-size chunks.
+
+    Returns:
+        MeshProperties, or None when the file is not a valid binary STL
+    """
+    count = binary_triangle_count(file_path)
+    if not count:
+        return None
+    try:
+        return accumulate(streamed_chunks(file_path, count, chunk_triangles))
+    except ValueError:
+        return None
+
+
+def stream_ascii_stl(file_path: str,
+                     chunk_triangles: int = DEFAULT_CHUNK_TRIANGLES) -> Optional[MeshProperties]:
+    """
+    Compute mesh properties of an ASCII STL file parsed in fixed-size chunks.
+
+    Returns:
+        MeshProperties, or None when the file is not a valid ASCII STL
+    """
+    try:
+        return accumulate(ascii_chunks(file_path, chunk_triangles))
+    except ValueError:
+        return None
+
+
+def stream_stl(file_path: str, memory_limit: int = DEFAULT_MEMORY_LIMIT) -> Optional[MeshProperties]:
+    """
+    Compute mesh properties of a binary or ASCII STL file in bounded memory.
+
+    Args:
+        file_path: Path to the STL file
+        memory_limit: Working memory ceiling in bytes, which sets the chunk size
+
+    Returns:
+        MeshProperties, or None when the file is neither valid binary nor ASCII STL
+    """
+    try:
+        return accumulate(triangle_source(file_path, memory_limit, streaming=True)())
+    except ValueError:
+        return None
+
+
+def _read_exactly(f, view: memoryview) -> bool:
+    """Fill a buffer from a raw file, False if the file ends first"""
+    filled = 0
+    while filled < len(view):
+        read = f.readinto(view[filled:])
+        if not read:
+            return False
+        filled += read
+    return True
+
+
+def _parse_ascii_chunk(coordinates: List[bytes]) -> np.ndarray:
+    """Parse a chunk of vertex line coordinates into an (n, 3, 3) array"""
+    try:
+        values = np.array(b' '.join(coordinates).split(), dtype=np.float64)
+    except ValueError:
+        raise ValueError("Malformed vertex line in ASCII STL file")
+    if len(values) != 3 * len(coordinates):
+        raise ValueError("Malformed vertex line in ASCII STL file")
+    return values.reshape(-1, 3, 3)
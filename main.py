@@ -0,0 +1,7 @@
+# main.py
+import sys
+
+from cadRedundancyAnalyzer.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+# tests/helpers.py
+"""Shared fixtures-as-functions for the similarity tests"""
+import random
+
+from dataclasses import replace
+
+from cadRedundancyAnalyzer.core.models import GeometricSignature, ShapeDescriptor
+from cadRedundancyAnalyzer.core.similarity import SimilarityDetector
+
+
+def reference_find_duplicates(signatures, threshold, detector=None):
+    """The original all-pairs greedy grouping, used as ground truth"""
+    detector = detector or SimilarityDetector()
+    grouped = set()
+    duplicate_groups = []
+
+    for i, (file1, sig1) in enumerate(signatures):
+        if file1 in grouped:
+            continue
+        current_group = [file1]
+        for j, (file2, sig2) in enumerate(signatures):
+            if i != j and file2 not in grouped:
+                if detector.calculate_similarity(sig1, sig2) >= threshold:
+                    current_group.append(file2)
+                    grouped.add(file2)
+        if len(current_group) > 1:
+            duplicate_groups.append(current_group)
+            grouped.add(file1)
+
+    return duplicate_groups
+
+
+def random_signatures(count, seed=0):
+    """
+    Random (filename, signature) pairs in near-duplicate clusters.
+
+    Includes flat parts (zero height), zero volumes, negative volumes, NaN
+    values and exact copies (same signature and hash) so the edge cases of
+    the ratio terms and the exact-duplicate pre-pass are hit.
+    """
+    rng = random.Random(seed)
+    signatures = []
+    bases = [(rng.uniform(1, 50), rng.uniform(1, 50), rng.uniform(1, 50)) for _ in range(max(1, count // 8))]
+
+    for i in range(count):
+        if signatures and rng.random() < 0.2:
+            _, copied = rng.choice(signatures)
+            signatures.append((f"part{i}.stl", copied))
+            continue
+
+        width, depth, height = rng.choice(bases)
+        scale = rng.choice([1.0, 1.0, rng.uniform(0.9, 1.1), rng.uniform(0.5, 2.0)])
+        width, depth, height = width * scale, depth * rng.uniform(0.97, 1.03) * scale, height * scale
+
+        kind = rng.random()
+        if kind < 0.1:
+            height = 0.0  # flat sheet part
+            volume = 0.0
+        elif kind < 0.13:
+            volume = -width * depth * height  # inverted normals
+        elif kind < 0.15:
+            volume = float('nan')
+        else:
+            volume = width * depth * height * rng.uniform(0.98, 1.0)
+        area = 2 * (width * depth + depth * height + width * height)
+
+        signatures.append((f"part{i}.stl", GeometricSignature(
+            bounding_box=(0.0, 0.0, 0.0, width, depth, height),
+            volume=volume,
+            surface_area=area,
+            geometric_hash=f"hash{i}"
+        )))
+
+    return signatures
+
+
+def with_random_descriptors(signatures, seed=0):
+    """
+    Copies of (filename, signature) pairs with random shape descriptors.
+
+    Descriptors follow the bounding box dimensions in a shuffled (rotated)
+    order, with histograms of one of a few shapes. Some parts get none and
+    some get a histogram of a different length, so mixed pairs are hit.
+    """
+    rng = random.Random(seed)
+    shapes = [[rng.random() for _ in range(8)] for _ in range(3)]
+    described = []
+    for name, sig in signatures:
+        kind = rng.random()
+        if kind < 0.1:
+            described.append((name, sig))
+            continue
+
+        bbox = sig.bounding_box
+        extents = sorted((bbox[3] - bbox[0], bbox[4] - bbox[1], bbox[5] - bbox[2]), reverse=True)
+        shape = [value * rng.uniform(0.9, 1.1) for value in rng.choice(shapes)]
+        if kind < 0.15:
+            shape = shape[:4]
+        total = sum(shape)
+        descriptor = ShapeDescriptor(
+            principal_extents=tuple(extents),
+            inertia=tuple(value * value * rng.uniform(0.95, 1.05) for value in extents),
+            d2_histogram=tuple(value / total for value in shape)
+        )
+        described.append((name, replace(sig, descriptor=descriptor)))
+    return described
+
+
+def reference_components(signatures, threshold):
+    """Connected components of the all-pairs match graph, as sets of names"""
+    detector = SimilarityDetector()
+    parent = list(range(len(signatures)))
+
+    def find(row):
+        while parent[row] != row:
+            row = parent[row]
+        return row
+
+    for i, (_, sig1) in enumerate(signatures):
+        for j in range(i + 1, len(signatures)):
+            if detector.calculate_similarity(sig1, signatures[j][1]) >= threshold:
+                parent[find(j)] = find(i)
+
+    components = {}
+    for row, (name, _) in enumerate(signatures):
+        components.setdefault(find(row), set()).add(name)
+    return {frozenset(members) for members in components.values() if len(members) > 1}
@@ -11,7 +11,69 @@ from stl import mesh
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from cadRedundancyAnalyzer.core.analyzer import ComponentAnalyzer
+from cadRedundancyAnalyzer.core.cache import SignatureCache
+from cadRedundancyAnalyzer.core.journal import ScanJournal
+from cadRedundancyAnalyzer.core.metrics import RunMetrics
 from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature
+from cadRedundancyAnalyzer.discovery.filesystem import FileSystemCrawler
+from cadRedundancyAnalyzer.handlers.stl_handler import STLFileHandler
+
+
+class FailingSTLHandler(STLFileHandler):
+    """STL handler that fails on files with 'corrupt' in their name"""
+
+    def analyze(self, file_path, project_id):
+        if "corrupt" in file_path:
+            raise RuntimeError("corrupt mesh")
+        return super().analyze(file_path, project_id)
+
+
+class ExplodingSTLHandler(STLFileHandler):
+    """STL handler that fails if asked to parse anything"""
+
+    def analyze(self, file_path, project_id):
+        raise AssertionError(f"unexpected parse of {file_path}")
+
+
+class LoggingSTLHandler(STLFileHandler):
+    """STL handler that appends every path it parses to a log file, also from worker processes"""
+
+    def __init__(self, log_path):
+        super().__init__()
+        self.log_path = log_path
+
+    def analyze(self, file_path, project_id):
+        with open(self.log_path, 'a') as f:
+            f.write(file_path + "\n")
+        return super().analyze(file_path, project_id)
+
+
+class BytesRefusingSTLHandler(STLFileHandler):
+    """STL handler that fails if handed a file's contents instead of its path"""
+
+    def analyze_bytes(self, file_path, project_id, data):
+        raise AssertionError(f"unexpected prefetch of {file_path}")
+
+
+class CrashingSTLHandler(STLFileHandler):
+    """STL handler that interrupts the whole scan at a file with 'crash' in its name"""
+
+    def analyze(self, file_path, project_id):
+        if "crash" in Path(file_path).name:
+            raise KeyboardInterrupt
+        return super().analyze(file_path, project_id)
+
+
+def write_triangle_stl(stl_path, scale=1.0):
+    """Write a single-triangle STL file"""
+    vertices = np.array([[0, 0, 0], [scale, 0, 0], [0, scale, 0]])
+    faces = np.array([[0, 1, 2]])
+
+    triangle = mesh.Mesh(np.zeros(faces.shape[0], dtype=mesh.Mesh.dtype))
+    for i, face in enumerate(faces):
+        for j in range(3):
+            triangle.vectors[i][j] = vertices[face[j]]
+    triangle.save(str(stl_path))
 
 
 class TestComponentAnalyzer:
@@ -132,4 +194,409 @@ class TestComponentAnalyzer:
             loose_duplicates = analyzer.find_duplicates(threshold=0.90)
 
             # Loose threshold should find same or more duplicates
-            assert len(loose_duplicates) >= len(strict_duplicates)
\ No newline at end of file
+            assert len(loose_duplicates) >= len(strict_duplicates)
+
+    def test_scan_directory_parallel_matches_serial(self):
+        """Test that a process-pool scan produces the same results in the same order"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for project in ["ProjectA", "ProjectB"]:
+                project_dir = Path(temp_dir) / project
+                project_dir.mkdir()
+                for i in range(5):
+                    write_triangle_stl(project_dir / f"part{i}.stl", scale=1.0 + i)
+
+            serial = ComponentAnalyzer()
+            serial.scan_directory(temp_dir)
+
+            parallel = ComponentAnalyzer()
+            parallel.scan_directory(temp_dir, workers=2, batch_size=3)
+
+            assert parallel.components == serial.components
+            assert list(parallel.geometric_signatures.items()) == list(serial.geometric_signatures.items())
+            assert parallel.errors == []
+
+    def test_scan_directory_with_concurrent_listing(self, monkeypatch):
+        """Test that listing_threads crawls the tree concurrently and finds the same parts"""
+        crawls = []
+        concurrent = FileSystemCrawler._iter_entries_concurrent
+
+        def spy(crawler, root):
+            crawls.append(crawler.listing_threads)
+            return concurrent(crawler, root)
+
+        monkeypatch.setattr(FileSystemCrawler, '_iter_entries_concurrent', spy)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for project in ["ProjectA", "ProjectB", "ProjectB/Sub"]:
+                project_dir = Path(temp_dir) / project
+                project_dir.mkdir()
+                for i in range(3):
+                    write_triangle_stl(project_dir / f"part{i}.stl", scale=1.0 + i)
+
+            serial = ComponentAnalyzer()
+            serial.scan_directory(temp_dir)
+            assert crawls == []
+
+            crawled = ComponentAnalyzer()
+            crawled.scan_directory(temp_dir, listing_threads=4)
+
+            assert crawls == [4]
+            assert len(crawled.geometric_signatures) == 9
+            assert dict(crawled.geometric_signatures) == dict(serial.geometric_signatures)
+            assert crawled.errors == []
+
+    def test_concurrent_listing_gives_serial_groups(self):
+        """Test that a concurrent crawl adds parts in serial order, so greedy groups do not change"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # A chain of near-duplicates, whose greedy groups depend on the order of the parts
+            for i in range(16):
+                project_dir = Path(temp_dir) / f"Project{i % 4}" / f"Assembly{i}"
+                project_dir.mkdir(parents=True)
+                write_triangle_stl(project_dir / "part.stl", scale=1.0 + 0.015 * i)
+
+            serial = ComponentAnalyzer()
+            serial.scan_directory(temp_dir)
+            expected = serial.find_duplicates(threshold=0.95)
+            assert len(expected) > 1
+
+            for _ in range(3):
+                crawled = ComponentAnalyzer()
+                crawled.scan_directory(temp_dir, listing_threads=4)
+                assert list(crawled.geometric_signatures) == list(serial.geometric_signatures)
+                assert crawled.find_duplicates(threshold=0.95) == expected
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_pipelined_scan_matches_serial(self, workers):
+        """Test that a read-ahead pipeline produces the same results in the same order"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for project in ["ProjectA", "ProjectB"]:
+                project_dir = Path(temp_dir) / project
+                project_dir.mkdir()
+                for i in range(5):
+                    write_triangle_stl(project_dir / f"part{i}.stl", scale=1.0 + i)
+            (Path(temp_dir) / "ProjectA" / "corrupt.stl").write_bytes(b"not a mesh")
+
+            serial = ComponentAnalyzer()
+            serial.scan_directory(temp_dir)
+
+            # Room for two prefetched files at a time
+            pipelined = ComponentAnalyzer()
+            pipelined.scan_directory(temp_dir, workers=workers, readers=2, max_inflight_bytes=300)
+
+            assert pipelined.components == serial.components
+            assert list(pipelined.geometric_signatures.items()) == list(serial.geometric_signatures.items())
+            assert [path for path, _ in pipelined.errors] == [path for path, _ in serial.errors]
+
+    def test_pipelined_scan_reads_large_files_directly(self):
+        """Test that files above the in-flight byte cap are left to the handler to read"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i in range(3):
+                write_triangle_stl(Path(temp_dir) / f"part{i}.stl", scale=1.0 + i)
+
+            serial = ComponentAnalyzer()
+            serial.scan_directory(temp_dir)
+
+            pipelined = ComponentAnalyzer()
+            pipelined.handler = BytesRefusingSTLHandler()
+            pipelined.scan_directory(temp_dir, readers=2, max_inflight_bytes=100)
+
+            assert pipelined.errors == []
+            assert pipelined.components == serial.components
+
+    def test_scan_directory_collects_errors(self):
+        """Test that per-file errors are collected instead of raised"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_triangle_stl(Path(temp_dir) / "good.stl")
+            write_triangle_stl(Path(temp_dir) / "corrupt.stl")
+
+            for workers in [1, 2]:
+                analyzer = ComponentAnalyzer()
+                analyzer.handler = FailingSTLHandler()
+                analyzer.scan_directory(temp_dir, workers=workers)
+
+                assert len(analyzer.components) == 1
+                assert len(analyzer.errors) == 1
+                failed_path, message = analyzer.errors[0]
+                assert failed_path.endswith("corrupt.stl")
+                assert "corrupt mesh" in message
+
+    def test_warm_rescan_is_served_from_cache(self):
+        """Test that an unchanged tree is not parsed again on a cached re-scan"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vault = Path(temp_dir) / "vault"
+            (vault / "ProjectA").mkdir(parents=True)
+            for i in range(3):
+                write_triangle_stl(vault / "ProjectA" / f"part{i}.stl", scale=1.0 + i)
+            cache_path = os.path.join(temp_dir, "cache.db")
+
+            with SignatureCache(cache_path) as cache:
+                cold = ComponentAnalyzer(cache=cache)
+                cold.scan_directory(str(vault))
+
+            for workers in [1, 2]:
+                with SignatureCache(cache_path) as cache:
+                    warm = ComponentAnalyzer(cache=cache)
+                    warm.handler = ExplodingSTLHandler()
+                    warm.scan_directory(str(vault), workers=workers)
+
+                    assert warm.errors == []
+                    assert warm.components == cold.components
+                    assert warm.geometric_signatures == cold.geometric_signatures
+                    assert cache.hits == 3
+
+    def test_scan_evicts_deleted_files_from_cache(self):
+        """Test that cache entries of deleted files are dropped after a scan"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vault = Path(temp_dir) / "vault"
+            vault.mkdir()
+            write_triangle_stl(vault / "kept.stl")
+            write_triangle_stl(vault / "deleted.stl")
+
+            with SignatureCache(os.path.join(temp_dir, "cache.db")) as cache:
+                ComponentAnalyzer(cache=cache).scan_directory(str(vault))
+                assert len(cache) == 2
+
+                (vault / "deleted.stl").unlink()
+                ComponentAnalyzer(cache=cache).scan_directory(str(vault))
+                assert len(cache) == 1
+
+    @pytest.mark.parametrize("root", ["./vault", "vault/"])
+    def test_scan_evicts_deleted_files_under_relative_root(self, root, monkeypatch):
+        """Test that eviction matches the crawler's paths when the root is spelled differently"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            monkeypatch.chdir(temp_dir)
+            vault = Path("vault")
+            vault.mkdir()
+            write_triangle_stl(vault / "kept.stl")
+            write_triangle_stl(vault / "deleted.stl")
+
+            with SignatureCache("cache.db") as cache:
+                ComponentAnalyzer(cache=cache).scan_directory(root)
+                assert len(cache) == 2
+
+                (vault / "deleted.stl").unlink()
+                ComponentAnalyzer(cache=cache).scan_directory(root)
+                assert len(cache) == 1
+
+    def test_incremental_add_update_remove(self):
+        """Test that incremental mode keeps duplicate groups current"""
+        analyzer = ComponentAnalyzer()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            write_triangle_stl(Path(temp_dir) / "part1.stl")
+            write_triangle_stl(Path(temp_dir) / "part2.stl", scale=3.0)
+            analyzer.scan_directory(temp_dir)
+            analyzer.enable_incremental(threshold=0.95)
+            assert analyzer.duplicate_groups() == []
+
+            new_part = str(Path(temp_dir) / "part3.stl")
+            write_triangle_stl(new_part)
+            group = analyzer.add_component(new_part, temp_dir)
+            assert sorted(Path(p).name for p in group) == ["part1.stl", "part3.stl"]
+
+            write_triangle_stl(new_part, scale=3.0)
+            group = analyzer.update_component(new_part, temp_dir)
+            assert sorted(Path(p).name for p in group) == ["part2.stl", "part3.stl"]
+            assert len(analyzer.components) == 3
+
+            analyzer.remove_component(new_part)
+            assert analyzer.duplicate_groups() == []
+            assert len(analyzer.components) == 2
+            assert new_part not in analyzer.geometric_signatures
+
+    def test_views_accept_append_and_assignment(self):
+        """Test that components and geometric_signatures still take the old list and dict updates"""
+        analyzer = ComponentAnalyzer()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            part1, part2 = str(Path(temp_dir) / "part1.stl"), str(Path(temp_dir) / "part2.stl")
+            write_triangle_stl(part1)
+            analyzer.scan_directory(temp_dir)
+            analyzer.enable_incremental(threshold=0.95)
+
+            signature = analyzer.geometric_signatures[part1].to_signature()
+            metadata = ComponentMetadata(part2, "part2.stl", "Imported", volume=signature.volume)
+            analyzer.components.append(metadata)
+            analyzer.geometric_signatures[part2] = signature
+
+            assert analyzer.components[-1] == metadata
+            assert sorted(analyzer.duplicate_groups()[0]) == sorted([part1, part2])
+            assert analyzer.find_duplicates(threshold=0.95) == [[part1, part2]]
+
+            del analyzer.geometric_signatures[part2]
+            assert len(analyzer.components) == 1
+            assert analyzer.duplicate_groups() == []
+
+    def test_query_similar_returns_top_matches(self):
+        """Test that similar-part queries rank stored parts and follow table changes"""
+        analyzer = ComponentAnalyzer()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name, scale in [("part1.stl", 1.0), ("part2.stl", 1.02), ("part3.stl", 3.0)]:
+                write_triangle_stl(Path(temp_dir) / name, scale=scale)
+            analyzer.scan_directory(temp_dir)
+
+            query = str(Path(temp_dir) / "part1.stl")
+            matches = analyzer.query_similar(query, k=2)
+            assert [Path(path).name for path, _ in matches] == ["part1.stl", "part2.stl"]
+            assert matches[0][1] == 1.0
+            assert matches[1][1] == analyzer.similarity_detector.calculate_similarity(
+                analyzer.geometric_signatures[matches[0][0]], analyzer.geometric_signatures[matches[1][0]])
+
+            assert [Path(path).name for path, _ in analyzer.query_similar(query, threshold=0.95)] == \
+                ["part1.stl", "part2.stl"]
+
+            analyzer.remove_component(query)
+            signature = analyzer.handler.extract_geometry(query)
+            assert [Path(path).name for path, _ in analyzer.query_similar(signature, k=1)] == ["part2.stl"]
+
+    def test_saved_index_reopens_without_parsing(self):
+        """Test that a saved index gives another analyzer the same components and groups"""
+        analyzer = ComponentAnalyzer()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vault = Path(temp_dir) / "vault"
+            vault.mkdir()
+            for name, scale in [("part1.stl", 1.0), ("part2.stl", 1.0), ("part3.stl", 3.0)]:
+                write_triangle_stl(vault / name, scale=scale)
+            analyzer.scan_directory(str(vault))
+            analyzer.save_index(os.path.join(temp_dir, "index"))
+
+            reopened = ComponentAnalyzer()
+            reopened.load_index(os.path.join(temp_dir, "index"))
+            assert reopened.components == analyzer.components
+            assert reopened.find_duplicates(0.95) == analyzer.find_duplicates(0.95)
+            assert reopened.query_similar(str(vault / "part3.stl"), k=1)[0][1] == 1.0
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_metrics_cover_scan_and_match(self, workers):
+        """Test that a run report has every stage, the throughput and the pair counters"""
+        reports = []
+        metrics = RunMetrics(on_report=reports.append)
+        analyzer = ComponentAnalyzer(metrics=metrics)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i, scale in enumerate([1.0, 1.0, 1.01, 3.0]):
+                project = Path(temp_dir) / f"project{i % 2}"
+                project.mkdir(exist_ok=True)
+                write_triangle_stl(project / f"part{i}.stl", scale=scale)
+            (Path(temp_dir) / "project0" / "corrupt.stl").write_bytes(b"not a mesh")
+
+            analyzer.scan_directory(temp_dir, workers=workers, batch_size=2)
+            analyzer.find_duplicates(0.95)
+
+        report = reports[-1]
+        assert len(reports) == 2
+        for stage in ("scan", "list_directory", "file", "load", "hash", "exact_prepass", "match", "find_duplicates"):
+            assert report['stages'][stage]['count'] >= 1, stage
+        counters = report['counters']
+        assert counters['files'] == 4
+        assert counters['errors'] == 1
+        assert counters['files_discovered'] == 5
+        assert counters['directories_listed'] == 3
+        assert counters['bytes'] == 4 * 134  # binary STL header, count and one triangle
+        assert counters['pairs_scored'] + counters['pairs_pruned'] == 3
+        assert report['rates']['files_per_second'] > 0
+        assert len(report['slowest_files']) == 5
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_dedup_scan_parses_identical_files_once(self, workers):
+        """Test that byte-identical files are analyzed once and keep their own path and project"""
+        metrics = RunMetrics()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vault = Path(temp_dir) / "vault"
+            for project in ["ProjectA", "ProjectB"]:
+                (vault / project).mkdir(parents=True)
+            write_triangle_stl(vault / "ProjectA" / "bracket.stl")
+            write_triangle_stl(vault / "ProjectA" / "plate.stl", scale=2.0)
+            copies = [vault / "ProjectB" / "bracket.stl", vault / "ProjectB" / "bracket_v2.stl"]
+            for copy in copies:
+                copy.write_bytes((vault / "ProjectA" / "bracket.stl").read_bytes())
+            log_path = Path(temp_dir) / "parsed.log"
+
+            analyzer = ComponentAnalyzer(metrics=metrics)
+            analyzer.handler = LoggingSTLHandler(str(log_path))
+            analyzer.scan_directory(str(vault), workers=workers, batch_size=1, dedup_content=True)
+
+            assert analyzer.errors == []
+            assert len(analyzer.components) == 4
+            parsed = log_path.read_text().split()
+            assert len(parsed) == 2
+            assert metrics.counters['content_copies'] == 2
+
+            components = {component.file_path: component for component in analyzer.components}
+            identical = [vault / "ProjectA" / "bracket.stl"] + copies
+            assert len(analyzer.identical_files) == 1
+            group = analyzer.identical_files[0]
+            assert sorted(group) == sorted(str(path) for path in identical)
+            assert group[0] in parsed
+            for path in identical:
+                component = components[str(path)]
+                assert component.file_name == path.name
+                assert component.project_id == path.parent.name
+                assert analyzer.geometric_signatures[str(path)] == analyzer.geometric_signatures[group[0]]
+
+    def test_dedup_scan_reports_copies_of_failed_files(self):
+        """Test that a copy of a file that failed to parse is an error, not a silent skip"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ["a.stl", "b.stl"]:
+                (Path(temp_dir) / name).write_bytes(b"not a mesh")
+
+            for workers in [1, 2]:
+                analyzer = ComponentAnalyzer()
+                analyzer.scan_directory(temp_dir, workers=workers, dedup_content=True)
+
+                assert len(analyzer.components) == 0
+                assert sorted(Path(path).name for path, _ in analyzer.errors) == ["a.stl", "b.stl"]
+                assert "Same content as" in analyzer.errors[1][1]
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_interrupted_scan_resumes_from_journal(self, workers):
+        """Test that a resumed scan parses only what the interrupted run had not completed"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vault = Path(temp_dir) / "vault"
+            (vault / "ProjectA").mkdir(parents=True)
+            for i in range(6):
+                write_triangle_stl(vault / "ProjectA" / f"part{i}.stl", scale=1.0 + i)
+            write_triangle_stl(vault / "ProjectA" / "crash.stl", scale=10.0)
+            (vault / "ProjectA" / "corrupt.stl").write_bytes(b"not a mesh")
+            journal = os.path.join(temp_dir, "scan.journal")
+
+            interrupted = ComponentAnalyzer()
+            interrupted.handler = CrashingSTLHandler()
+            with pytest.raises(KeyboardInterrupt):
+                interrupted.scan_directory(str(vault), journal=journal)
+            completed_before = {component.file_path for component in interrupted.components}
+
+            log_path = Path(temp_dir) / "parsed.log"
+            resumed = ComponentAnalyzer()
+            resumed.handler = LoggingSTLHandler(str(log_path))
+            resumed.scan_directory(str(vault), workers=workers, journal=journal, resume=True)
+
+            clean = ComponentAnalyzer()
+            clean.scan_directory(str(vault))
+
+            assert resumed.components == clean.components
+            assert list(resumed.geometric_signatures.items()) == list(clean.geometric_signatures.items())
+            parsed = set(log_path.read_text().split())
+            assert parsed.isdisjoint(completed_before)
+            assert len(parsed) + len(completed_before) == 8
+            with ScanJournal(journal) as finished:
+                assert finished.complete
+                assert len(finished) == 7
+                assert [Path(path).name for path, _, _ in finished.failures()] == ["corrupt.stl"]
+
+    def test_resume_needs_a_journal_of_the_same_root(self):
+        """Test that resuming without a journal, or with another root's journal, is refused"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ["a", "b"]:
+                (Path(temp_dir) / name).mkdir()
+            journal = os.path.join(temp_dir, "scan.journal")
+            analyzer = ComponentAnalyzer()
+
+            with pytest.raises(ValueError):
+                analyzer.scan_directory(os.path.join(temp_dir, "a"), resume=True)
+            with pytest.raises(ValueError):
+                analyzer.scan_directory(os.path.join(temp_dir, "a"), journal=journal, resume=True)
+            analyzer.scan_directory(os.path.join(temp_dir, "a"), journal=journal)
+            with pytest.raises(ValueError):
+                analyzer.scan_directory(os.path.join(temp_dir, "b"), journal=journal, resume=True)
@@ -0,0 +1,86 @@
+# tests/test_blocked.py
+import pytest
+import sys
+import os
+import warnings
+import numpy as np
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.blocked import EdgeIndex, SharedArrays, SpilledEdges, _tiles, attach_arrays
+from cadRedundancyAnalyzer.core.similarity import WEIGHTS, SimilarityDetector
+from cadRedundancyAnalyzer.core.vectorized import BatchScorer, SignatureStore
+from tests.helpers import random_signatures, with_random_descriptors
+
+
+class TestBlockedScoring:
+
+    def test_shared_arrays_round_trip(self):
+        """Test that attached arrays see the shared data without copying it"""
+        arrays = {'volume': np.arange(5, dtype=np.float64), 'codes': np.array([b'a' * 16] * 3, dtype='V16')}
+        with SharedArrays(arrays) as shared:
+            attached, blocks = attach_arrays(shared.spec)
+            assert np.array_equal(attached['volume'], arrays['volume'])
+            assert attached['codes'].tobytes() == arrays['codes'].tobytes()
+            del attached
+            for block in blocks:
+                block.close()
+
+    def test_edge_index_looks_up_directed_edges(self):
+        """Test that edges are sorted per source and repeated edges are kept once"""
+        index = EdgeIndex(4, np.array([2, 0, 0, 2]), np.array([1, 3, 1, 1]), np.array([0.9, 0.8, 0.95, 0.9]))
+
+        assert len(index) == 3
+        assert index.candidates(0).tolist() == [1, 3]
+        assert index.candidates(1).tolist() == []
+        rows, scores = index.match(0, np.array([3]))
+        assert rows.tolist() == [3] and scores.tolist() == [0.8]
+
+    def test_spilled_edges_read_back_by_row(self):
+        """Test that edges added in any order are read back per source row across spill files"""
+        with SpilledEdges(6, block_rows=2) as edges:
+            edges.add(np.array([4, 0]), np.array([1, 5]), np.array([0.9, 0.8]))
+            edges.add(np.array([0, 3]), np.array([2, 0]), np.array([0.95, 0.85]))
+
+            assert len(edges) == 4
+            assert edges.candidates(0).tolist() == [2, 5]
+            assert edges.candidates(3).tolist() == [0]
+            assert edges.candidates(2).tolist() == []
+            rows, scores = edges.match(4, np.array([1]))
+            assert rows.tolist() == [1] and scores.tolist() == [0.9]
+
+    def test_tiles_with_zero_volumes(self):
+        """Test that tiles of zero-volume parts are tiled without warnings and never pruned together"""
+        count = 40
+        volume = np.concatenate([np.zeros(20), np.linspace(1.0, 1000.0, 20)])
+        store = SignatureStore(volume, np.ones(count), np.ones((count, 3)), np.arange(count, dtype=np.int64))
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            order, starts, pairs = _tiles(store, 0.95, BatchScorer(WEIGHTS), 5)
+
+        assert sorted(order.tolist()) == list(range(count))
+        assert (0, 3) in pairs  # both tiles hold only zero volumes
+        assert (0, 7) not in pairs  # zero against the largest volumes
+
+    @pytest.mark.parametrize("grouping", ["seed", "components"])
+    def test_parallel_tiles_match_single_process_groups(self, grouping):
+        """Test that tiled scoring in worker processes gives the single-process groups"""
+        signatures = random_signatures(300, seed=13)
+        for threshold in (0.5, 0.8, 0.95):
+            for exact_prepass in (True, False):
+                single = SimilarityDetector(grouping=grouping, exact_prepass=exact_prepass)
+                expected = single.find_duplicates(signatures, threshold)
+                detector = SimilarityDetector(grouping=grouping, exact_prepass=exact_prepass,
+                                              workers=2, tile_size=32)
+                assert detector.find_duplicates(signatures, threshold) == expected
+                assert detector.summaries == single.summaries
+
+    def test_parallel_tiles_with_descriptors(self):
+        """Test that descriptor scoring survives the trip through shared memory"""
+        signatures = with_random_descriptors(random_signatures(200, seed=14), seed=14)
+        expected = SimilarityDetector(use_descriptors=True).find_duplicates(signatures, 0.9)
+        detector = SimilarityDetector(use_descriptors=True, workers=2, tile_size=50)
+
+        assert detector.find_duplicates(signatures, 0.9) == expected
+        assert detector.summaries and detector.stats.pairs_scored > 0
@@ -0,0 +1,110 @@
+# tests/test_cache.py
+import pytest
+import sys
+import os
+import math
+from pathlib import Path
+import tempfile
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.cache import SignatureCache
+from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature, ShapeDescriptor
+
+
+def make_entry(file_path, volume=100.0):
+    metadata = ComponentMetadata(file_path=file_path, file_name=Path(file_path).name,
+                                 project_id="ProjectA", volume=volume)
+    signature = GeometricSignature((0.0, 0.0, 0.0, 10.0, 5.0, 2.0), volume, 220.0, "abc123")
+    return metadata, signature
+
+
+class TestSignatureCache:
+
+    def test_put_and_get_round_trip(self):
+        """Test that a cached entry comes back unchanged"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            part = Path(temp_dir) / "bracket.stl"
+            part.write_bytes(b"solid")
+            metadata, signature = make_entry(str(part))
+
+            with SignatureCache(os.path.join(temp_dir, "cache.db")) as cache:
+                cache.put(str(part), 5, 123, metadata, signature)
+                assert cache.get(str(part), 5, 123) == (metadata, signature)
+                assert cache.hits == 1
+
+            # Entries persist across connections
+            with SignatureCache(os.path.join(temp_dir, "cache.db")) as cache:
+                assert cache.get(str(part), 5, 123) == (metadata, signature)
+
+    def test_changed_size_or_mtime_is_a_miss(self):
+        """Test that a modified file is not served from the cache"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            part = Path(temp_dir) / "bracket.stl"
+            part.write_bytes(b"solid")
+
+            with SignatureCache(os.path.join(temp_dir, "cache.db")) as cache:
+                cache.put(str(part), 5, 123, *make_entry(str(part)))
+
+                assert cache.get(str(part), 5, 456) is None
+                assert cache.get(str(part), 6, 123) is None
+                assert cache.get(str(Path(temp_dir) / "other.stl"), 5, 123) is None
+                assert cache.misses == 3
+
+    def test_content_check_survives_touch(self):
+        """Test that verify_content matches on bytes rather than mtime"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            part = Path(temp_dir) / "bracket.stl"
+            part.write_bytes(b"solid")
+
+            with SignatureCache(os.path.join(temp_dir, "cache.db"), verify_content=True) as cache:
+                cache.put(str(part), 5, 123, *make_entry(str(part)))
+                assert cache.get(str(part), 5, 456) is not None
+
+                part.write_bytes(b"SOLID")
+                assert cache.get(str(part), 5, 456) is None
+
+    def test_nan_values_round_trip(self):
+        """Test that NaN volumes survive SQLite's NaN-to-NULL conversion"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            part = str(Path(temp_dir) / "bracket.stl")
+
+            with SignatureCache(os.path.join(temp_dir, "cache.db")) as cache:
+                cache.put(part, 5, 123, *make_entry(part, volume=float('nan')))
+                metadata, signature = cache.get(part, 5, 123)
+
+                assert math.isnan(signature.volume)
+                assert math.isnan(metadata.volume)
+
+    def test_descriptor_round_trip(self):
+        """Test that shape descriptors are cached and required descriptors miss without one"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plain = str(Path(temp_dir) / "plain.stl")
+            described = str(Path(temp_dir) / "described.stl")
+            metadata, signature = make_entry(described)
+            signature.descriptor = ShapeDescriptor((10.0, 5.0, 2.0), (29.0, 104.0, 125.0), (0.25, 0.75))
+
+            with SignatureCache(os.path.join(temp_dir, "cache.db")) as cache:
+                cache.put(plain, 5, 123, *make_entry(plain))
+                cache.put(described, 5, 123, metadata, signature)
+
+                assert cache.get(described, 5, 123, require_descriptor=True) == (metadata, signature)
+                assert cache.get(plain, 5, 123)[1].descriptor is None
+                assert cache.get(plain, 5, 123, require_descriptor=True) is None
+
+    def test_evict_missing_only_touches_root(self):
+        """Test that eviction removes unseen files under the scanned root only"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = os.path.join(temp_dir, "vault")
+            kept, deleted = os.path.join(root, "a.stl"), os.path.join(root, "b.stl")
+            elsewhere = os.path.join(temp_dir, "vault2", "c.stl")
+
+            with SignatureCache(os.path.join(temp_dir, "cache.db")) as cache:
+                for part in [kept, deleted, elsewhere]:
+                    cache.put(part, 5, 123, *make_entry(part))
+
+                assert cache.evict_missing(root, [kept]) == 1
+                assert len(cache) == 2
+                assert cache.get(deleted, 5, 123) is None
+                assert cache.get(elsewhere, 5, 123) is not None
@@ -0,0 +1,63 @@
+# tests/test_candidates.py
+import pytest
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.candidates import CandidateIndex, minimum_ratios
+from cadRedundancyAnalyzer.core.models import GeometricSignature
+from cadRedundancyAnalyzer.core.similarity import SimilarityDetector, WEIGHTS
+from tests.helpers import random_signatures
+
+
+class TestCandidateIndex:
+
+    def test_minimum_ratios_for_default_weights(self):
+        """Test the ratio bounds implied by a 95% threshold"""
+        volume_ratio, area_ratio, dimension_ratio = minimum_ratios(0.95, WEIGHTS)
+
+        assert volume_ratio == pytest.approx(0.9)
+        assert area_ratio == pytest.approx(0.8333333, rel=1e-6)
+        assert dimension_ratio == pytest.approx(0.25)
+
+    def test_low_threshold_has_no_volume_bound(self):
+        """Test that thresholds at or below 0.5 cannot prune on volume"""
+        volume_ratio, _, _ = minimum_ratios(0.5, WEIGHTS)
+        assert volume_ratio <= 0
+
+    def test_candidates_exclude_distant_volumes(self):
+        """Test that parts far apart in volume are pruned"""
+        signatures = [
+            GeometricSignature((0, 0, 0, 10, 5, 2), 100.0, 220.0, "a"),
+            GeometricSignature((0, 0, 0, 10, 5, 2), 101.0, 221.0, "b"),
+            GeometricSignature((0, 0, 0, 100, 50, 20), 100000.0, 22000.0, "c"),
+        ]
+        index = CandidateIndex(signatures, 0.95)
+
+        assert list(index.candidates(0)) == [1]
+        assert list(index.candidates(2)) == []
+
+    def test_identical_hashes_are_always_candidates(self):
+        """Test that hash-identical parts survive pruning whatever their values"""
+        signatures = [
+            GeometricSignature((0, 0, 0, 1, 1, 1), 1.0, 6.0, "same"),
+            GeometricSignature((0, 0, 0, 100, 100, 100), 1000000.0, 60000.0, "same"),
+        ]
+        index = CandidateIndex(signatures, 0.95)
+
+        assert list(index.candidates(0)) == [1]
+
+    def test_candidates_contain_every_matching_pair(self):
+        """Test that no pair reaching the threshold is ever pruned"""
+        detector = SimilarityDetector()
+        signatures = [sig for _, sig in random_signatures(150, seed=3)]
+
+        for threshold in [0.3, 0.8, 0.9, 0.95, 0.99]:
+            index = CandidateIndex(signatures, threshold)
+            for i, sig1 in enumerate(signatures):
+                candidates = set(index.candidates(i).tolist())
+                for j, sig2 in enumerate(signatures):
+                    if i != j and detector.calculate_similarity(sig1, sig2) >= threshold:
+                        assert j in candidates
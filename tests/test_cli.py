@@ -0,0 +1,173 @@
+# tests/test_cli.py
+import pytest
+import sys
+import os
+import csv
+import io
+import json
+import subprocess
+from pathlib import Path
+import tempfile
+import numpy as np
+from stl import mesh
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.cli import main, write_groups
+from cadRedundancyAnalyzer.core.analyzer import ComponentAnalyzer
+from cadRedundancyAnalyzer.core.grouping import GroupSummary
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_triangle_stl(stl_path, scale=1.0):
+    """Write a single-triangle STL file"""
+    triangle = mesh.Mesh(np.zeros(1, dtype=mesh.Mesh.dtype))
+    triangle.vectors[0] = np.array([[0, 0, 0], [scale, 0, 0], [0, scale, 0]])
+    triangle.save(str(stl_path))
+
+
+def write_library(root):
+    """Two projects with an exact copy, a near copy and one unrelated part"""
+    for project in ("ProjectA", "ProjectB"):
+        (Path(root) / project).mkdir()
+    write_triangle_stl(Path(root) / "ProjectA" / "bracket.stl")
+    write_triangle_stl(Path(root) / "ProjectB" / "bracket_copy.stl")
+    write_triangle_stl(Path(root) / "ProjectB" / "bracket_near.stl", scale=1.001)
+    write_triangle_stl(Path(root) / "ProjectA" / "plate.stl", scale=5.0)
+
+
+class TestCommandLine:
+
+    def test_scan_saves_index_and_match_streams_jsonl(self, capsys):
+        """Test that match on a saved index writes one JSON line per group found by the analyzer"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = os.path.join(temp_dir, "library")
+            os.mkdir(root)
+            write_library(root)
+            index = os.path.join(temp_dir, "index")
+
+            assert main(["scan", root, "--index", index]) == 0
+            capsys.readouterr()
+            assert main(["match", "--index", index, "--threshold", "0.95"]) == 0
+            lines = capsys.readouterr().out.splitlines()
+
+            expected = ComponentAnalyzer()
+            expected.scan_directory(root)
+            groups = expected.find_duplicates(threshold=0.95)
+
+        records = [json.loads(line) for line in lines]
+        assert [record['members'] for record in records] == groups
+        assert len(records) == 1
+        assert records[0]['group'] == 1
+        assert records[0]['size'] == 3
+        assert records[0]['representative'] in records[0]['members']
+        assert 0.95 <= records[0]['min_similarity'] <= records[0]['max_similarity'] <= 1.0
+
+    def test_match_directory_writes_csv_file(self):
+        """Test that match can scan a directory itself and write a CSV row per group member"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = os.path.join(temp_dir, "library")
+            os.mkdir(root)
+            write_library(root)
+            output = os.path.join(temp_dir, "groups.csv")
+
+            assert main(["match", root, "--workers", "2", "--format", "csv", "--output", output]) == 0
+            with open(output, newline='') as f:
+                rows = list(csv.reader(f))
+
+        assert rows[0] == ['group', 'path', 'representative', 'min_similarity', 'max_similarity']
+        assert sorted(Path(row[1]).name for row in rows[1:]) == \
+            ["bracket.stl", "bracket_copy.stl", "bracket_near.stl"]
+        assert {row[0] for row in rows[1:]} == {'1'}
+
+    def test_scan_passes_listing_threads_to_the_crawl(self, monkeypatch):
+        """Test that --listing-threads reaches scan_directory"""
+        calls = []
+        scan_directory = ComponentAnalyzer.scan_directory
+
+        def spy(analyzer, root, **kwargs):
+            calls.append(kwargs['listing_threads'])
+            return scan_directory(analyzer, root, **kwargs)
+
+        monkeypatch.setattr(ComponentAnalyzer, 'scan_directory', spy)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = os.path.join(temp_dir, "library")
+            os.mkdir(root)
+            write_library(root)
+
+            assert main(["scan", root, "--listing-threads", "4"]) == 0
+            assert main(["scan", root]) == 0
+
+        assert calls == [4, 1]
+
+    def test_query_lists_most_similar_parts(self, capsys):
+        """Test that query lists the closest stored parts, best first"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = os.path.join(temp_dir, "library")
+            os.mkdir(root)
+            write_library(root)
+            index = os.path.join(temp_dir, "index")
+            query_path = os.path.join(temp_dir, "new_bracket.stl")
+            write_triangle_stl(query_path)
+
+            assert main(["scan", root, "--index", index]) == 0
+            capsys.readouterr()
+            assert main(["query", query_path, "--index", index, "-k", "2"]) == 0
+            matches = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+        assert len(matches) == 2
+        assert {Path(match['path']).name for match in matches} == {"bracket.stl", "bracket_copy.stl"}
+        assert all(match['score'] == 1.0 for match in matches)
+
+    def test_match_needs_exactly_one_source(self):
+        """Test that match refuses to run without a directory or index, or with both"""
+        with pytest.raises(SystemExit):
+            main(["match"])
+        with pytest.raises(SystemExit):
+            main(["match", "library", "--index", "index"])
+
+    def test_missing_index_is_reported(self, capsys):
+        """Test that a bad index path gives an error message and a failing exit status"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            assert main(["match", "--index", os.path.join(temp_dir, "missing")]) == 1
+        assert "error" in capsys.readouterr().err
+
+    def test_groups_are_written_as_they_are_found(self):
+        """Test that each group is written before the next one is asked for"""
+        stream = io.StringIO()
+
+        def groups():
+            yield GroupSummary(["a.stl", "b.stl"], "a.stl", 1.0, 1.0)
+            assert json.loads(stream.getvalue())['members'] == ["a.stl", "b.stl"]
+            yield GroupSummary(["c.stl", "d.stl"], "c.stl", 0.96, 0.96)
+
+        assert write_groups(groups(), stream) == 2
+        assert len(stream.getvalue().splitlines()) == 2
+
+    def test_match_from_index_does_not_import_trimesh_or_pandas(self):
+        """Test that the command line starts without the heavy imports when working from an index"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = os.path.join(temp_dir, "library")
+            os.mkdir(root)
+            write_library(root)
+            index = os.path.join(temp_dir, "index")
+            assert main(["scan", root, "--index", index]) == 0
+
+            script = (
+                "import sys\n"
+                "from cadRedundancyAnalyzer.cli import main\n"
+                f"assert main(['match', '--index', {index!r}]) == 0\n"
+                "assert 'trimesh' not in sys.modules\n"
+                "assert 'pandas' not in sys.modules\n"
+            )
+            result = subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, check=True,
+                                    capture_output=True, text=True)
+        assert len(result.stdout.splitlines()) == 1
+
+    def test_module_entry_point(self):
+        """Test that the package runs as python -m cadRedundancyAnalyzer"""
+        result = subprocess.run([sys.executable, "-m", "cadRedundancyAnalyzer", "--help"], cwd=PROJECT_ROOT,
+                                check=True, capture_output=True, text=True)
+        assert "cad-redundancy" in result.stdout
@@ -94,4 +94,85 @@ class TestFileSystemCrawler:
 
         file_path = Path("/parts/bracket.stl")
         project = crawler.extract_project_info(file_path, "/parts")
-        assert project == "Unknown"  # Should handle gracefully
\ No newline at end of file
+        assert project == "Unknown"  # Should handle gracefully
+
+    def test_iter_entries_reports_size_and_mtime(self):
+        """Test that discovered entries carry the stat data of the file"""
+        crawler = FileSystemCrawler()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            part = Path(temp_dir) / "bracket.stl"
+            part.write_bytes(b"x" * 84)
+
+            entries = list(crawler.iter_entries(temp_dir))
+
+            assert len(entries) == 1
+            assert entries[0].path == str(part)
+            assert entries[0].size == 84
+            assert entries[0].mtime_ns == part.stat().st_mtime_ns
+
+    def test_discover_files_prunes_directories(self):
+        """Test exclude globs, hidden and version control directory skipping"""
+        crawler = FileSystemCrawler(exclude=["archive", "*_backup.stl"], skip_hidden=True)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            for directory in ["parts", "archive", ".cache", ".git", "parts/.hidden"]:
+                (temp_path / directory).mkdir(parents=True)
+                (temp_path / directory / "bolt.stl").touch()
+            (temp_path / "parts" / "bolt_backup.stl").touch()
+
+            found = [f.relative_to(temp_path).as_posix() for f in crawler.discover_files(temp_dir)]
+
+            assert found == ["parts/bolt.stl"]
+
+    def test_discover_files_respects_max_depth(self):
+        """Test that max_depth limits how deep the crawler descends"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            (temp_path / "a" / "b").mkdir(parents=True)
+            (temp_path / "top.stl").touch()
+            (temp_path / "a" / "mid.stl").touch()
+            (temp_path / "a" / "b" / "deep.stl").touch()
+
+            def names(max_depth):
+                crawler = FileSystemCrawler(max_depth=max_depth)
+                return sorted(f.name for f in crawler.discover_files(temp_dir))
+
+            assert names(0) == ["top.stl"]
+            assert names(1) == ["mid.stl", "top.stl"]
+            assert names(None) == ["deep.stl", "mid.stl", "top.stl"]
+
+    def test_concurrent_crawl_finds_same_files(self):
+        """Test that the threaded crawler streams the same files in the same order as the serial walk"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            for project in range(4):
+                for sub in range(3):
+                    directory = temp_path / f"project{project}" / f"assembly{sub}" / "parts"
+                    directory.mkdir(parents=True)
+                    (directory / "bolt.stl").touch()
+                    (directory / "notes.txt").touch()
+                    (directory.parent / "frame.STL").touch()
+
+            serial = FileSystemCrawler()
+            concurrent = FileSystemCrawler(listing_threads=4, queue_size=5)
+
+            expected = list(serial.iter_entries(temp_dir))
+            assert len(expected) == 24
+            assert list(concurrent.iter_entries(temp_dir)) == expected
+
+    def test_concurrent_crawl_can_stop_early(self):
+        """Test that closing the stream early stops the background crawl"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for i in range(20):
+                directory = Path(temp_dir) / f"dir{i}"
+                directory.mkdir()
+                (directory / "part.stl").touch()
+
+            crawler = FileSystemCrawler(listing_threads=4, queue_size=1)
+            stream = crawler.discover_files(temp_dir)
+            first = next(stream)
+            stream.close()
+
+            assert first.name == "part.stl"
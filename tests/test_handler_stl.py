@@ -6,6 +6,7 @@ from pathlib import Path
 import tempfile
 import numpy as np
 from stl import mesh
+from stl import Mode as stl_mode
 
 # Add the project root to Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -113,4 +114,165 @@ class TestSTLFileHandler:
             assert sig1.geometric_hash == sig2.geometric_hash
             assert sig1.volume == sig2.volume
             assert sig1.surface_area == sig2.surface_area
-            assert sig1.bounding_box == sig2.bounding_box
\ No newline at end of file
+            assert sig1.bounding_box == sig2.bounding_box
+
+    def test_analyze_returns_metadata_and_signature(self):
+        """Test that analyze matches the separate metadata/geometry extractors"""
+        handler = STLFileHandler()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stl_path = Path(temp_dir) / "bracket.stl"
+
+            vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+            faces = np.array([[0, 1, 2]])
+
+            triangle = mesh.Mesh(np.zeros(faces.shape[0], dtype=mesh.Mesh.dtype))
+            for i, face in enumerate(faces):
+                for j in range(3):
+                    triangle.vectors[i][j] = vertices[face[j]]
+            triangle.save(str(stl_path))
+
+            metadata, signature = handler.analyze(str(stl_path), "ProjectA")
+
+            assert metadata == handler.get_metadata(str(stl_path), "ProjectA")
+            assert signature == handler.extract_geometry(str(stl_path))
+            assert metadata.project_id == "ProjectA"
+            assert metadata.volume == signature.volume
+
+    def test_analyze_loads_mesh_once(self, monkeypatch):
+        """Test that analyze parses each file only once"""
+        import trimesh
+
+        handler = STLFileHandler(fast_binary=False)
+        calls = []
+        original_load = trimesh.load_mesh
+
+        def counting_load(*args, **kwargs):
+            calls.append(args[0])
+            return original_load(*args, **kwargs)
+
+        monkeypatch.setattr(trimesh, "load_mesh", counting_load)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stl_path = Path(temp_dir) / "bracket.stl"
+
+            vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+            faces = np.array([[0, 1, 2]])
+
+            triangle = mesh.Mesh(np.zeros(faces.shape[0], dtype=mesh.Mesh.dtype))
+            for i, face in enumerate(faces):
+                for j in range(3):
+                    triangle.vectors[i][j] = vertices[face[j]]
+            triangle.save(str(stl_path))
+
+            handler.analyze(str(stl_path), "ProjectA")
+
+            assert calls == [str(stl_path)]
+
+    def test_binary_fast_path_matches_trimesh(self, monkeypatch):
+        """Test that the memory-mapped reader gives trimesh's signature without loading a mesh"""
+        import trimesh
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stl_path = Path(temp_dir) / "sphere.stl"
+            sphere = trimesh.creation.icosphere(subdivisions=3, radius=2.5)
+            sphere.apply_translation([1.0, -2.0, 0.5])
+            sphere.export(str(stl_path))
+
+            expected = STLFileHandler(fast_binary=False).extract_geometry(str(stl_path))
+
+            def no_load(*args, **kwargs):
+                raise AssertionError("binary STL should not be loaded through trimesh")
+
+            monkeypatch.setattr(trimesh, "load_mesh", no_load)
+            signature = STLFileHandler().extract_geometry(str(stl_path))
+
+            assert signature.volume == pytest.approx(expected.volume, rel=1e-12)
+            assert signature.surface_area == pytest.approx(expected.surface_area, rel=1e-12)
+            assert signature.bounding_box == expected.bounding_box
+
+    def test_ascii_stl_falls_back_to_trimesh(self):
+        """Test that ASCII STL files are still read through trimesh"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stl_path = Path(temp_dir) / "ascii.stl"
+
+            vertices = np.array([[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+            faces = np.array([[0, 1, 2]])
+
+            triangle = mesh.Mesh(np.zeros(faces.shape[0], dtype=mesh.Mesh.dtype))
+            for i, face in enumerate(faces):
+                for j in range(3):
+                    triangle.vectors[i][j] = vertices[face[j]]
+            triangle.save(str(stl_path), mode=stl_mode.ASCII)
+
+            signature = STLFileHandler().extract_geometry(str(stl_path))
+
+            assert signature == STLFileHandler(fast_binary=False).extract_geometry(str(stl_path))
+            assert signature.bounding_box == (0.0, 0.0, 0.0, 1.0, 1.0, 0.0)
+
+    def test_analyze_bytes_matches_analyze(self):
+        """Test that parsing prefetched file contents gives the same results as reading the file"""
+        import trimesh
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            binary_path = Path(temp_dir) / "sphere.stl"
+            trimesh.creation.icosphere(subdivisions=2, radius=2.0).export(str(binary_path))
+            ascii_path = Path(temp_dir) / "sphere_ascii.stl"
+            trimesh.creation.icosphere(subdivisions=2, radius=2.0).export(str(ascii_path), file_type='stl_ascii')
+
+            for handler in [STLFileHandler(), STLFileHandler(fast_binary=False), STLFileHandler(descriptors=True)]:
+                for stl_path in [binary_path, ascii_path]:
+                    expected = handler.analyze(str(stl_path), "Project")
+                    assert handler.analyze_bytes(str(stl_path), "Project", stl_path.read_bytes()) == expected
+
+    def test_large_files_switch_to_streaming(self, monkeypatch):
+        """Test that files above the streaming threshold are read in chunks without trimesh"""
+        import trimesh
+        from cadRedundancyAnalyzer.handlers import stl_reader
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stl_path = Path(temp_dir) / "sphere.stl"
+            trimesh.creation.icosphere(subdivisions=3, radius=2.0).export(str(stl_path))
+            expected = STLFileHandler(fast_binary=False).extract_geometry(str(stl_path))
+
+            def no_load(*args, **kwargs):
+                raise AssertionError("large STL should be streamed")
+
+            def no_mmap(*args, **kwargs):
+                raise AssertionError("large STL should not be memory-mapped")
+
+            monkeypatch.setattr(trimesh, "load_mesh", no_load)
+            monkeypatch.setattr(stl_reader, "mapped_chunks", no_mmap)
+            handler = STLFileHandler(streaming_threshold=1024, memory_limit=64 * 1024)
+            metadata, signature = handler.analyze(str(stl_path), "Project")
+
+            assert signature.volume == pytest.approx(expected.volume, rel=1e-12)
+            assert signature.bounding_box == expected.bounding_box
+            assert metadata.volume == signature.volume
+
+    def test_shape_descriptor_is_pose_invariant(self):
+        """Test that rotated and moved copies of a part get the same shape descriptor"""
+        import trimesh
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            box = trimesh.creation.box(extents=(40.0, 20.0, 10.0))
+            original_path = Path(temp_dir) / "bracket.stl"
+            box.export(str(original_path))
+
+            moved = box.copy()
+            moved.apply_transform(trimesh.transformations.euler_matrix(0.3, 1.1, -0.7))
+            moved.apply_translation([250.0, -80.0, 12.5])
+            moved_path = Path(temp_dir) / "bracket_rotated.stl"
+            moved.export(str(moved_path))
+
+            handler = STLFileHandler(descriptors=True)
+            original = handler.extract_geometry(str(original_path)).descriptor
+            rotated = handler.extract_geometry(str(moved_path)).descriptor
+
+            assert STLFileHandler().extract_geometry(str(original_path)).descriptor is None
+            assert original.principal_extents == pytest.approx((40.0, 20.0, 10.0), rel=1e-4)
+            assert rotated.principal_extents == pytest.approx(original.principal_extents, rel=1e-4)
+            assert rotated.inertia == pytest.approx(original.inertia, rel=1e-4)
+            assert sum(original.d2_histogram) == pytest.approx(1.0)
+            intersection = sum(min(a, b) for a, b in zip(original.d2_histogram, rotated.d2_histogram))
+            assert intersection > 0.9
@@ -0,0 +1,63 @@
+# tests/test_incremental.py
+import pytest
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.incremental import IncrementalDuplicateIndex
+from cadRedundancyAnalyzer.core.models import GeometricSignature
+from cadRedundancyAnalyzer.core.similarity import SimilarityDetector
+from tests.helpers import random_signatures, reference_components
+
+
+class TestIncrementalDuplicateIndex:
+
+    def test_groups_match_connected_components(self):
+        """Test that incremental adds give the components of the all-pairs match graph"""
+        signatures = random_signatures(200, seed=11)
+
+        for threshold in [0.5, 0.95]:
+            index = IncrementalDuplicateIndex(SimilarityDetector(), threshold)
+            for name, sig in signatures:
+                index.add(name, sig)
+
+            assert {frozenset(group) for group in index.groups()} == reference_components(signatures, threshold)
+
+    def test_add_returns_group_of_new_part(self):
+        """Test that adding a part reports the group it joined"""
+        index = IncrementalDuplicateIndex(SimilarityDetector(), 0.95)
+
+        assert index.add("part1.stl", GeometricSignature((0, 0, 0, 10, 5, 2), 100.0, 220.0, "a")) == []
+        assert index.add("part2.stl", GeometricSignature((0, 0, 0, 20, 10, 4), 800.0, 880.0, "b")) == []
+        group = index.add("part3.stl", GeometricSignature((0, 0, 0, 10, 5, 2), 100.5, 220.5, "c"))
+
+        assert group == ["part1.stl", "part3.stl"]
+
+    def test_remove_splits_groups(self):
+        """Test that removing a bridging part splits its group"""
+        index = IncrementalDuplicateIndex(SimilarityDetector(), 0.95)
+        # a~b and b~c match, a and c are too far apart to match directly
+        index.add("a.stl", GeometricSignature((0, 0, 0, 10, 5, 2), 100.0, 220.0, "a"))
+        index.add("b.stl", GeometricSignature((0, 0, 0, 10, 5, 2), 106.0, 226.0, "b"))
+        index.add("c.stl", GeometricSignature((0, 0, 0, 10, 5, 2), 112.5, 232.0, "c"))
+        assert index.groups() == [["a.stl", "b.stl", "c.stl"]]
+
+        index.remove("b.stl")
+
+        assert index.groups() == []
+        assert len(index) == 2
+
+    def test_removals_match_rebuilt_index(self):
+        """Test that removing parts leaves the same groups as building without them"""
+        signatures = random_signatures(150, seed=12)
+        index = IncrementalDuplicateIndex(SimilarityDetector(), 0.95)
+        for name, sig in signatures:
+            index.add(name, sig)
+
+        for name, _ in signatures[::3]:
+            index.remove(name)
+
+        remaining = [entry for k, entry in enumerate(signatures) if k % 3]
+        assert {frozenset(group) for group in index.groups()} == reference_components(remaining, 0.95)
@@ -0,0 +1,59 @@
+# tests/test_ingest.py
+import sys
+import os
+from pathlib import Path
+import tempfile
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.ingest import ContentIndex
+from cadRedundancyAnalyzer.discovery.filesystem import FileEntry
+
+
+def write_file(path, content):
+    path.write_bytes(content)
+    return FileEntry(str(path), len(content), 0)
+
+
+class TestContentIndex:
+
+    def test_identical_files_resolve_to_the_first(self):
+        """Test that copies point at the first file with their bytes"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            original = write_file(Path(temp_dir) / "a.stl", b"solid part")
+            copy = write_file(Path(temp_dir) / "b.stl", b"solid part")
+            second_copy = write_file(Path(temp_dir) / "c.stl", b"solid part")
+
+            index = ContentIndex()
+            assert index.original_of(original) is None
+            index.add(original)
+            assert index.original_of(copy) == original.path
+            assert index.original_of(second_copy) == original.path
+            assert index.groups() == [[original.path, copy.path, second_copy.path]]
+
+    def test_files_are_hashed_only_on_size_collisions(self):
+        """Test that files of a unique size are never hashed"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = ContentIndex()
+            for i in range(5):
+                entry = write_file(Path(temp_dir) / f"part{i}.stl", b"x" * (i + 1))
+                assert index.original_of(entry) is None
+                index.add(entry)
+            assert index.files_hashed == 0
+            assert index.groups() == []
+
+    def test_same_size_different_content_is_not_a_copy(self):
+        """Test that equal sizes alone do not make files identical"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            first = write_file(Path(temp_dir) / "a.stl", b"solid one")
+            second = write_file(Path(temp_dir) / "b.stl", b"solid two")
+            copy = write_file(Path(temp_dir) / "c.stl", b"solid two")
+
+            index = ContentIndex()
+            for entry in (first, second):
+                assert index.original_of(entry) is None
+                index.add(entry)
+            assert index.original_of(copy) == second.path
+            # Each file is hashed once
+            assert index.files_hashed == 3
@@ -0,0 +1,103 @@
+# tests/test_journal.py
+import pytest
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.journal import ScanJournal
+from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature
+from cadRedundancyAnalyzer.discovery.filesystem import FileEntry
+
+
+def make_analysis(file_path, descriptor=None):
+    metadata = ComponentMetadata(file_path=file_path, file_name=os.path.basename(file_path),
+                                 project_id="ProjectA", volume=100.0)
+    signature = GeometricSignature((0.0, 0.0, 0.0, 10.0, 5.0, float('nan')), 100.0, 220.0, "abc123",
+                                   descriptor=descriptor)
+    return metadata, signature
+
+
+class TestScanJournal:
+
+    def test_completed_files_are_restored_on_resume(self):
+        """Test that a resumed journal gives back unchanged completed files only"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "scan.journal")
+            entry = FileEntry("/vault/a.stl", 134, 1000)
+            metadata, signature = make_analysis(entry.path)
+
+            with ScanJournal(path) as journal:
+                journal.start("/vault")
+                journal.record(entry, metadata, signature)
+                # A fresh scan restores nothing
+                assert journal.completed(entry) is None
+
+            with ScanJournal(path) as journal:
+                journal.start("/vault", resume=True)
+                restored_metadata, restored_signature = journal.completed(entry)
+                assert restored_metadata == metadata
+                assert restored_signature.bounding_box[:5] == signature.bounding_box[:5]
+                assert restored_signature.volume == signature.volume
+                assert journal.completed(entry._replace(mtime_ns=2000)) is None
+                assert journal.completed(entry, require_descriptor=True) is None
+                assert not journal.complete
+
+    def test_failures_count_attempts_until_completed(self):
+        """Test that the retry list keeps the last error and attempts, and drops files that complete"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with ScanJournal(os.path.join(temp_dir, "scan.journal")) as journal:
+                journal.start("/vault")
+                journal.record_failure("/vault/a.stl", "timed out")
+                journal.record_failure("/vault/a.stl", "connection reset")
+                journal.record_failure("/vault/b.stl", "corrupt mesh")
+                assert journal.failures() == [("/vault/a.stl", "connection reset", 2),
+                                              ("/vault/b.stl", "corrupt mesh", 1)]
+
+                journal.record(FileEntry("/vault/a.stl", 134, 1000), *make_analysis("/vault/a.stl"))
+                assert journal.failures() == [("/vault/b.stl", "corrupt mesh", 1)]
+
+    def test_writes_are_committed_at_checkpoints(self):
+        """Test that journaled files reach the database every checkpoint_every files"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "scan.journal")
+            journal = ScanJournal(path, checkpoint_every=3, checkpoint_seconds=3600)
+            journal.start("/vault")
+
+            def committed():
+                with sqlite3.connect(path) as reader:
+                    return reader.execute("SELECT COUNT(*) FROM completed").fetchone()[0]
+
+            for i in range(5):
+                entry = FileEntry(f"/vault/part{i}.stl", 134, 1000)
+                journal.record(entry, *make_analysis(entry.path))
+            assert committed() == 3
+            journal.close()
+            assert committed() == 5
+
+    def test_resume_checks_the_root(self):
+        """Test that only a journaled scan of the same root can be resumed"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with ScanJournal(os.path.join(temp_dir, "scan.journal")) as journal:
+                with pytest.raises(ValueError):
+                    journal.start("/vault", resume=True)
+                journal.start("/vault")
+                journal.finish()
+                assert journal.complete
+                with pytest.raises(ValueError):
+                    journal.start("/other", resume=True)
+                journal.start("/vault", resume=True)
+                assert journal.root_path == "/vault"
+                assert not journal.complete
+
+    def test_resume_accepts_another_spelling_of_the_root(self):
+        """Test that the same directory given as lib, ./lib or lib/ resumes the same scan"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with ScanJournal(os.path.join(temp_dir, "scan.journal")) as journal:
+                journal.start("./lib")
+                for root in ("lib", "lib/", "./lib"):
+                    journal.start(root, resume=True)
+                    assert journal.root_path == "lib"
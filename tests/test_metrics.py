@@ -0,0 +1,86 @@
+# tests/test_metrics.py
+import json
+import pickle
+import sys
+import os
+import threading
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.metrics import HISTOGRAM_BOUNDS, RunMetrics
+
+
+class TestRunMetrics:
+
+    def test_stage_timers_and_histograms(self):
+        """Test that samples land in the right histogram buckets and summaries"""
+        metrics = RunMetrics()
+        for seconds in (0.00005, 0.005, 0.005, 20.0):
+            metrics.record('load', seconds)
+
+        load = metrics.report()['stages']['load']
+        assert load['count'] == 4
+        assert load['min_seconds'] == 0.00005
+        assert load['max_seconds'] == 20.0
+        assert load['total_seconds'] == sum((0.00005, 0.005, 0.005, 20.0))
+        counts = dict((bound, count) for bound, count in load['histogram'])
+        assert counts[HISTOGRAM_BOUNDS[0]] == 1
+        assert counts[0.01] == 2
+        assert counts[None] == 1
+
+    def test_report_rates_slowest_files_and_hook(self):
+        """Test throughput, the slowest-file list and the report hook"""
+        reports = []
+        metrics = RunMetrics(on_report=reports.append, slowest=2)
+        metrics.record('scan', 2.0)
+        metrics.count('files', 10)
+        metrics.count('bytes', 4000)
+        for path, seconds in [("a.stl", 0.1), ("b.stl", 0.5), ("c.stl", 0.3)]:
+            metrics.file_done(path, seconds)
+        metrics.publish()
+
+        report = json.loads(metrics.to_json())
+        assert report['rates'] == {'files_per_second': 5.0, 'bytes_per_second': 2000.0}
+        assert [entry['path'] for entry in report['slowest_files']] == ["b.stl", "c.stl"]
+        assert report['stages']['file']['count'] == 3
+        assert reports == [metrics.report()]
+
+    def test_pickled_copies_start_empty_and_merge_back(self):
+        """Test that a worker's copy records separately and its snapshot merges"""
+        metrics = RunMetrics(on_report=print, slowest=3)
+        metrics.count('files', 2)
+        metrics.record('load', 0.5)
+
+        worker = pickle.loads(pickle.dumps(metrics))
+        assert worker.report()['counters'] == {} and worker.on_report is None
+        worker.count('files', 3)
+        worker.record('load', 1.5)
+        worker.file_done("slow.stl", 9.0)
+
+        metrics.merge(worker.snapshot(reset=True))
+        assert worker.report()['stages'] == {}
+        report = metrics.report()
+        assert report['counters'] == {'files': 5}
+        assert report['stages']['load']['count'] == 2
+        assert report['stages']['load']['max_seconds'] == 1.5
+        assert report['slowest_files'] == [{'path': "slow.stl", 'seconds': 9.0}]
+
+    def test_recording_is_thread_safe(self):
+        """Test that concurrent counters and timers lose no samples"""
+        metrics = RunMetrics()
+
+        def work():
+            for _ in range(1000):
+                metrics.count('directories_listed')
+                metrics.record('list_directory', 0.001)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        report = metrics.report()
+        assert report['counters']['directories_listed'] == 8000
+        assert report['stages']['list_directory']['count'] == 8000
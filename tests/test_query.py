@@ -0,0 +1,109 @@
+# tests/test_query.py
+import math
+import sys
+import os
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature
+from cadRedundancyAnalyzer.core.query import SimilarityIndex
+from cadRedundancyAnalyzer.core.similarity import WEIGHTS, SimilarityDetector
+from cadRedundancyAnalyzer.core.table import ComponentTable
+from cadRedundancyAnalyzer.core.vectorized import BatchScorer
+from tests.helpers import random_signatures, with_random_descriptors
+
+
+def build_table(signatures):
+    table = ComponentTable()
+    for name, signature in signatures:
+        table.add(name, ComponentMetadata(file_path=name, file_name=name, project_id="p"), signature)
+    return table
+
+
+def as_stored(signature):
+    """A signature with its values rounded to single precision, as the table stores them"""
+    def rounded(value):
+        return float(np.float32(value))
+    return replace(signature, bounding_box=tuple(rounded(value) for value in signature.bounding_box),
+                   volume=rounded(signature.volume), surface_area=rounded(signature.surface_area))
+
+
+def brute_force_top_k(detector, stored, query, k, threshold):
+    """Score every stored part and keep the k best, ties in row order"""
+    scored = []
+    for row, (_, signature) in enumerate(stored):
+        score = detector.calculate_similarity(query, signature)
+        if score >= threshold:
+            scored.append((-score, row))
+    return [(row, -negated) for negated, row in sorted(scored)[:k]]
+
+
+class TestSimilarityIndex:
+
+    @pytest.mark.parametrize("k,threshold", [(1, 0.0), (5, 0.0), (10, 0.9), (50, 0.95), (3, 0.999)])
+    def test_matches_brute_force_top_k(self, k, threshold):
+        """Test that queries return exactly the best k of all-pairs scoring"""
+        stored = random_signatures(800, seed=11)
+        queries = [signature for _, signature in random_signatures(60, seed=12)]
+        # Stored parts too, so same-hash rows and copies are hit
+        queries += [signature for _, signature in stored[::40]]
+
+        table = build_table(stored)
+        index = SimilarityIndex(table.signature_store(), BatchScorer(WEIGHTS))
+        detector = SimilarityDetector()
+        rounded = [(name, as_stored(signature)) for name, signature in stored]
+        for query in queries:
+            expected = brute_force_top_k(detector, rounded, as_stored(query), k, threshold)
+            assert index.query(table.query_store(query), k, threshold) == expected
+
+    def test_matches_brute_force_with_descriptors(self):
+        """Test that descriptor-gated scores are queried like calculate_similarity"""
+        stored = with_random_descriptors(random_signatures(400, seed=13), seed=13)
+        queries = with_random_descriptors(random_signatures(40, seed=14), seed=14)
+
+        table = build_table(stored)
+        detector = SimilarityDetector(use_descriptors=True)
+        index = SimilarityIndex(table.signature_store(), BatchScorer(WEIGHTS, detector.descriptor_threshold))
+        rounded = [(name, as_stored(signature)) for name, signature in stored]
+        for _, query in queries + stored[::50]:
+            expected = brute_force_top_k(detector, rounded, as_stored(query), 8, 0.5)
+            assert index.query(table.query_store(query), 8, 0.5) == expected
+
+    def test_scores_only_a_volume_window(self):
+        """Test that a selective query does not score the whole store"""
+        stored = random_signatures(5000, seed=15)
+        table = build_table(stored)
+        index = SimilarityIndex(table.signature_store(), BatchScorer(WEIGHTS))
+        scored = []
+        original = index._score
+
+        def counting_score(query, rows):
+            scored.append(len(rows))
+            return original(query, rows)
+
+        index._score = counting_score
+        query = next(signature for _, signature in stored if signature.volume > 0)
+        matches = index.query(table.query_store(query), 5, 0.9)
+
+        assert matches and matches[0][1] == 1.0
+        assert sum(scored) < len(stored) // 2
+
+    def test_empty_and_degenerate_queries(self):
+        """Test empty indexes, k=0 and NaN query volumes"""
+        table = build_table(random_signatures(100, seed=16))
+        index = SimilarityIndex(table.signature_store(), BatchScorer(WEIGHTS))
+        query = table.signature(0)
+
+        assert SimilarityIndex(build_table([]).signature_store(), BatchScorer(WEIGHTS)).query(
+            table.query_store(query)) == []
+        assert index.query(table.query_store(query), 0) == []
+
+        nan_query = GeometricSignature(query.bounding_box, float('nan'), query.surface_area, "unseen")
+        matches = index.query(table.query_store(nan_query), 10, 0.0)
+        assert len(matches) == 10
+        assert not any(math.isnan(score) for _, score in matches)
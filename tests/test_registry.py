@@ -0,0 +1,113 @@
+# tests/test_registry.py
+import pytest
+import sys
+import os
+import pickle
+import subprocess
+from importlib import metadata
+from pathlib import Path
+import tempfile
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.analyzer import ComponentAnalyzer
+from cadRedundancyAnalyzer.core.metrics import RunMetrics
+from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature
+from cadRedundancyAnalyzer.handlers import registry as registry_module
+from cadRedundancyAnalyzer.handlers.base import CADFileHandler
+from cadRedundancyAnalyzer.handlers.registry import ENTRY_POINT_GROUP, HandlerRegistry, RegistryHandler
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TextBoxHandler(CADFileHandler):
+    """Handler for '.box' files holding 'width depth height' as text"""
+
+    def __init__(self, descriptors=False, metrics=None):
+        self.descriptors = descriptors
+        self.metrics = metrics
+
+    def can_handle(self, file_path):
+        return file_path.lower().endswith('.box')
+
+    def extract_geometry(self, file_path):
+        width, depth, height = (float(value) for value in Path(file_path).read_text().split())
+        area = 2 * (width * depth + depth * height + width * height)
+        return GeometricSignature((0.0, 0.0, 0.0, width, depth, height), width * depth * height, area,
+                                  f"{width}_{depth}_{height}")
+
+    def get_metadata(self, file_path, project_id):
+        return ComponentMetadata(file_path=file_path, file_name=Path(file_path).name, project_id=project_id,
+                                 volume=self.extract_geometry(file_path).volume)
+
+
+class TestHandlerRegistry:
+
+    def test_builtin_stl_handler_is_imported_on_first_use(self):
+        """Test that the STL handler module and trimesh are not imported until needed"""
+        script = (
+            "import sys\n"
+            "from cadRedundancyAnalyzer.core.analyzer import ComponentAnalyzer\n"
+            "analyzer = ComponentAnalyzer()\n"
+            "assert analyzer.crawler.supported_extensions == ['.stl']\n"
+            "assert 'cadRedundancyAnalyzer.handlers.stl_handler' not in sys.modules\n"
+            "assert 'trimesh' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", script], cwd=PROJECT_ROOT, check=True)
+
+    def test_registered_format_is_discovered_and_parsed(self):
+        """Test that a registered handler's extension is crawled and its files analyzed"""
+        registry = HandlerRegistry(entry_points=False)
+        registry.register("box", TextBoxHandler)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            project = Path(temp_dir) / "ProjectA"
+            project.mkdir()
+            (project / "small.box").write_text("1 2 3")
+            (project / "copy.BOX").write_text("1 2 3")
+            (project / "notes.txt").write_text("not a part")
+
+            metrics = RunMetrics()
+            analyzer = ComponentAnalyzer(registry=registry, metrics=metrics)
+            analyzer.scan_directory(temp_dir)
+
+            assert analyzer.errors == []
+            assert sorted(component.file_name for component in analyzer.components) == ["copy.BOX", "small.box"]
+            assert len(analyzer.find_duplicates(0.99)) == 1
+            assert not registry.is_loaded(".stl")
+            assert analyzer.handler.handler_for("small.box").metrics is metrics
+
+    def test_entry_points_are_loaded_lazily(self, monkeypatch):
+        """Test that installed entry points register their extension without importing it"""
+        entry_point = metadata.EntryPoint(name="box", value="tests.test_registry:TextBoxHandler",
+                                          group=ENTRY_POINT_GROUP)
+        monkeypatch.setattr(registry_module, "_installed_entry_points", lambda group: (entry_point,))
+
+        registry = HandlerRegistry()
+        assert registry.extensions() == [".box", ".stl"]
+        assert not registry.is_loaded(".box")
+        assert registry.load(".box") is TextBoxHandler
+        assert HandlerRegistry(entry_points=False).extensions() == [".stl"]
+
+    def test_unknown_extensions_are_refused(self):
+        """Test that files without a registered handler are not handled"""
+        handler = RegistryHandler(HandlerRegistry(entry_points=False))
+
+        assert not handler.can_handle("drawing.dwg")
+        with pytest.raises(ValueError):
+            handler.analyze("drawing.dwg", "ProjectA")
+
+    def test_pickled_handler_creates_its_handlers_afresh(self):
+        """Test that worker copies carry the registry and options but no created handlers"""
+        registry = HandlerRegistry(entry_points=False)
+        registry.register(".box", TextBoxHandler)
+        handler = RegistryHandler(registry, descriptors=True)
+        created = handler.handler_for("part.box")
+
+        copy = pickle.loads(pickle.dumps(handler))
+
+        assert copy.descriptors
+        assert not copy.registry.is_loaded(".box")
+        assert copy.handler_for("part.box") is not created
+        assert copy.handler_for("part.box").descriptors
@@ -8,6 +8,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from cadRedundancyAnalyzer.core.similarity import SimilarityDetector
 from cadRedundancyAnalyzer.core.models import GeometricSignature
+from cadRedundancyAnalyzer.core.vectorized import SignatureStore
+from tests.helpers import random_signatures, reference_components, reference_find_duplicates, with_random_descriptors
 
 
 class TestSimilarityDetector:
@@ -115,4 +117,190 @@ class TestSimilarityDetector:
 
         # The largest group should have 3 parts
         largest_group = max(duplicate_groups, key=len)
-        assert len(largest_group) == 3
\ No newline at end of file
+        assert len(largest_group) == 3
+
+    def test_find_duplicates_matches_all_pairs_grouping(self):
+        """Test that candidate pruning gives exactly the all-pairs groups"""
+        detector = SimilarityDetector()
+
+        for seed in range(3):
+            signatures = random_signatures(200, seed=seed)
+            for threshold in [0.5, 0.9, 0.95, 0.99]:
+                expected = reference_find_duplicates(signatures, threshold)
+                assert detector.find_duplicates(signatures, threshold) == expected
+
+    def test_scalar_and_vectorized_engines_agree(self):
+        """Test that both scoring engines produce identical groups"""
+        scalar = SimilarityDetector(engine="scalar")
+        vectorized = SimilarityDetector(engine="vectorized")
+        signatures = random_signatures(200, seed=7)
+        # Repeated names may only join one group
+        signatures += [("part3.stl", sig) for _, sig in signatures[:5]]
+
+        for threshold in [0.5, 0.9, 0.95]:
+            expected = reference_find_duplicates(signatures, threshold)
+            assert scalar.find_duplicates(signatures, threshold) == expected
+            assert vectorized.find_duplicates(signatures, threshold) == expected
+
+    def test_unknown_engine_rejected(self):
+        """Test that an unknown engine name raises ValueError"""
+        with pytest.raises(ValueError):
+            SimilarityDetector(engine="gpu")
+
+    def test_exact_prepass_matches_full_matching(self):
+        """Test that folding hash buckets gives the same groups as matching every part"""
+        with_prepass = SimilarityDetector(exact_prepass=True)
+        without_prepass = SimilarityDetector(exact_prepass=False)
+
+        for seed in range(3):
+            signatures = random_signatures(200, seed=seed)
+            for threshold in [0.5, 0.95, 0.99]:
+                expected = reference_find_duplicates(signatures, threshold)
+                assert without_prepass.find_duplicates(signatures, threshold) == expected
+                assert with_prepass.find_duplicates(signatures, threshold) == expected
+
+    def test_exact_prepass_reports_skipped_pairs(self):
+        """Test that the pre-pass groups hash copies and counts the pairs it skipped"""
+        detector = SimilarityDetector()
+
+        signatures = [
+            ("part1.stl", GeometricSignature((0, 0, 0, 10, 5, 2), 100.0, 220.0, "hash1")),
+            ("part2.stl", GeometricSignature((0, 0, 0, 10, 5, 2), 100.0, 220.0, "hash1")),
+            ("part3.stl", GeometricSignature((0, 0, 0, 20, 10, 4), 800.0, 880.0, "hash2")),
+            ("part4.stl", GeometricSignature((0, 0, 0, 10, 5, 2), 100.0, 220.0, "hash1")),
+        ]
+
+        duplicate_groups = detector.find_duplicates(signatures, threshold=0.95)
+
+        assert duplicate_groups == [["part1.stl", "part2.stl", "part4.stl"]]
+        assert detector.stats.exact_groups == 1
+        assert detector.stats.exact_copies == 2
+        # 6 pairs among 4 parts, 1 pair among the 2 representatives
+        assert detector.stats.pairs_skipped == 5
+
+    def test_descriptor_scoring_matches_all_pairs_grouping(self):
+        """Test that both engines give the all-pairs groups when scoring on descriptors"""
+        for seed in range(3):
+            signatures = with_random_descriptors(random_signatures(150, seed=seed), seed=seed)
+            for threshold in (0.8, 0.9, 0.95):
+                reference = SimilarityDetector(use_descriptors=True, engine="scalar")
+                expected = reference_find_duplicates(signatures, threshold, reference)
+                for engine in ("vectorized", "scalar"):
+                    detector = SimilarityDetector(engine=engine, use_descriptors=True)
+                    assert detector.find_duplicates(signatures, threshold) == expected
+
+    def test_descriptors_make_rotated_copies_match(self):
+        """Test that principal extents replace the bbox and dissimilar shapes are rejected"""
+        from cadRedundancyAnalyzer.core.models import ShapeDescriptor
+
+        descriptor = ShapeDescriptor((40.0, 20.0, 10.0), (500.0, 420.0, 120.0), (0.25, 0.5, 0.25))
+        lying = GeometricSignature((0, 0, 0, 40, 20, 10), 8000.0, 2800.0, "lying", descriptor)
+        standing = GeometricSignature((0, 0, 0, 10, 20, 40), 8000.0, 2800.0, "standing", descriptor)
+        other_shape = GeometricSignature((0, 0, 0, 40, 20, 10), 8000.0, 2800.0, "other",
+                                         ShapeDescriptor((40.0, 20.0, 10.0), (500.0, 420.0, 120.0), (1.0, 0.0, 0.0)))
+
+        plain = SimilarityDetector()
+        described = SimilarityDetector(use_descriptors=True)
+
+        assert plain.calculate_similarity(lying, standing) < 0.95
+        assert described.calculate_similarity(lying, standing) == pytest.approx(1.0)
+        assert plain.calculate_similarity(lying, other_shape) == pytest.approx(1.0)
+        assert described.calculate_similarity(lying, other_shape) == 0.0
+
+    def test_cascade_orders_match_full_scoring(self):
+        """Test that every cascade order gives the groups of scoring every candidate in full"""
+        signatures = with_random_descriptors(random_signatures(200, seed=7), seed=7)
+        cascades = [(), ("volume", "area", "bbox", "descriptor"), ("descriptor", "bbox", "volume"), ("area",)]
+        for use_descriptors in (False, True):
+            for threshold in (0.0, 0.8, 0.95):
+                expected = SimilarityDetector(use_descriptors=use_descriptors, cascade=()) \
+                    .find_duplicates(signatures, threshold)
+                for engine in ("vectorized", "scalar"):
+                    for cascade in cascades:
+                        detector = SimilarityDetector(engine=engine, use_descriptors=use_descriptors,
+                                                      cascade=cascade)
+                        assert detector.find_duplicates(signatures, threshold) == expected
+
+    def test_cascade_counts_stage_rejections(self):
+        """Test that each stage reports the pairs it dropped, the same for both engines"""
+        signatures = random_signatures(200, seed=8)
+        counts = []
+        for engine in ("vectorized", "scalar"):
+            detector = SimilarityDetector(engine=engine, exact_prepass=False)
+            detector.find_duplicates(signatures, 0.9)
+            counts.append(detector.stats.stage_rejections)
+
+        assert counts[0] == counts[1]
+        assert counts[0]["volume"] > 0
+        assert sum(counts[0].values()) <= detector.stats.pairs_scored
+
+        with pytest.raises(ValueError):
+            SimilarityDetector(cascade=("volume", "colour"))
+
+    def test_component_grouping_matches_connected_components(self):
+        """Test that components grouping gives the connected components of all matching pairs"""
+        signatures = random_signatures(200, seed=10)
+        for threshold in (0.8, 0.95):
+            expected = reference_components(signatures, threshold)
+            for engine in ("vectorized", "scalar"):
+                for exact_prepass in (True, False):
+                    detector = SimilarityDetector(engine=engine, exact_prepass=exact_prepass,
+                                                  grouping="components")
+                    groups = detector.find_duplicates(signatures, threshold)
+                    assert {frozenset(group) for group in groups} == expected
+                    assert all(group == sorted(group, key=lambda name: int(name[4:-4])) for group in groups)
+
+    def test_canonical_order_is_independent_of_input_order(self):
+        """Test that shuffled inputs give identical groups with canonical_order"""
+        import random
+
+        signatures = random_signatures(200, seed=11)
+        shuffled = list(signatures)
+        random.Random(11).shuffle(shuffled)
+        for grouping in ("seed", "components"):
+            detector = SimilarityDetector(grouping=grouping, canonical_order=True)
+            assert detector.find_duplicates(signatures, 0.9) == detector.find_duplicates(shuffled, 0.9)
+
+        with pytest.raises(ValueError):
+            SimilarityDetector(grouping="cliques")
+
+    def test_group_summaries_report_match_scores(self):
+        """Test that seed group summaries hold the seed and the range of its match scores"""
+        signatures = random_signatures(200, seed=12)
+        by_name = dict(signatures)
+        reference = SimilarityDetector()
+        # Without the pre-pass every member is matched by the seed itself
+        detector = SimilarityDetector(exact_prepass=False)
+        groups = detector.find_duplicates(signatures, 0.9)
+
+        assert [summary.members for summary in detector.summaries] == groups
+        for summary in detector.summaries:
+            seed = summary.members[0]
+            scores = [reference.calculate_similarity(by_name[seed], by_name[name]) for name in summary.members[1:]]
+            assert summary.representative == seed
+            assert summary.min_similarity == pytest.approx(min(scores))
+            assert summary.max_similarity == pytest.approx(max(scores))
+
+        detector = SimilarityDetector(grouping="components")
+        detector.find_duplicates(signatures, 0.9)
+        for summary in detector.summaries:
+            assert summary.representative in summary.members
+            assert 0.9 <= summary.min_similarity <= summary.max_similarity
+
+    def test_iter_duplicates_streams_the_same_groups(self):
+        """Test that iter_duplicates_in_store yields find_duplicates' summaries, seed groups before matching ends"""
+        signatures = random_signatures(300, seed=13)
+        names = [name for name, _ in signatures]
+        store = SignatureStore.from_signatures([sig for _, sig in signatures])
+
+        for grouping in ("components", "seed"):
+            detector = SimilarityDetector(grouping=grouping)
+            detector.find_duplicates_in_store(names, store, 0.9)
+            expected, pairs_scored = detector.summaries, detector.stats.pairs_scored
+            assert list(detector.iter_duplicates_in_store(names, store, 0.9)) == expected
+            assert detector.stats.pairs_scored == pairs_scored
+
+        # The first seed group comes out after only part of the pairs are scored
+        detector = SimilarityDetector()
+        assert next(detector.iter_duplicates_in_store(names, store, 0.9)) == expected[0]
+        assert detector.stats.pairs_scored < pairs_scored
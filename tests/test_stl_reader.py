@@ -0,0 +1,97 @@
+# tests/test_stl_reader.py
+import pytest
+import sys
+import os
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import trimesh
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.handlers.stl_reader import (
+    accumulate, buffer_triangle_source, read_binary_stl, stream_ascii_stl, stream_binary_stl, stream_stl
+)
+
+
+def write_sphere(path: Path, ascii: bool = False, subdivisions: int = 3):
+    """Write an off-centre icosphere as binary or ASCII STL, returning the mesh"""
+    sphere = trimesh.creation.icosphere(subdivisions=subdivisions, radius=3.0)
+    sphere.apply_translation([2.0, -1.0, 0.5])
+    sphere.export(str(path), file_type='stl_ascii' if ascii else 'stl')
+    return sphere
+
+
+class TestStreamingSTLReader:
+
+    def test_stream_binary_matches_mmap_reader(self):
+        """Test that chunked streaming agrees with the memory-mapped reader"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stl_path = str(Path(temp_dir) / "sphere.stl")
+            write_sphere(Path(stl_path))
+
+            expected = read_binary_stl(stl_path)
+            streamed = stream_binary_stl(stl_path, chunk_triangles=97)
+
+            assert streamed.triangle_count == expected.triangle_count
+            assert streamed.volume == pytest.approx(expected.volume, rel=1e-12)
+            assert streamed.surface_area == pytest.approx(expected.surface_area, rel=1e-12)
+            assert streamed.bounds == expected.bounds
+
+    def test_stream_ascii_matches_trimesh(self):
+        """Test that ASCII STL files are streamed to the same properties trimesh computes"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stl_path = str(Path(temp_dir) / "sphere_ascii.stl")
+            write_sphere(Path(stl_path), ascii=True)
+            loaded = trimesh.load_mesh(stl_path)
+
+            streamed = stream_ascii_stl(stl_path, chunk_triangles=100)
+
+            assert streamed.triangle_count == len(loaded.faces)
+            assert streamed.volume == pytest.approx(loaded.volume, rel=1e-9)
+            assert streamed.surface_area == pytest.approx(loaded.area, rel=1e-9)
+            assert streamed.bounds == pytest.approx(tuple(loaded.bounds.ravel()))
+
+    def test_buffer_reader_matches_mmap_reader(self):
+        """Test that binary STL contents held in memory reduce to the memory-mapped reader's properties"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stl_path = Path(temp_dir) / "sphere.stl"
+            write_sphere(stl_path)
+            ascii_path = Path(temp_dir) / "sphere_ascii.stl"
+            write_sphere(ascii_path, ascii=True)
+
+            source = buffer_triangle_source(stl_path.read_bytes())
+
+            assert accumulate(source()) == read_binary_stl(str(stl_path))
+            assert buffer_triangle_source(ascii_path.read_bytes()) is None
+            assert buffer_triangle_source(b"short") is None
+
+    def test_invalid_files_are_rejected(self):
+        """Test that files that are neither binary nor ASCII STL give None"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            garbage = Path(temp_dir) / "garbage.stl"
+            garbage.write_bytes(b"not an stl file at all")
+            truncated = Path(temp_dir) / "truncated.stl"
+            truncated.write_text("solid part\nfacet normal 0 0 1\nouter loop\nvertex 0 0 0\nvertex 1 0 x\n")
+
+            assert stream_stl(str(garbage)) is None
+            assert stream_stl(str(truncated)) is None
+
+    def test_memory_limit_bounds_working_memory(self):
+        """Test that streaming a file keeps allocations far below the file size"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stl_path = str(Path(temp_dir) / "large.stl")
+            write_sphere(Path(stl_path), subdivisions=6)
+            file_size = os.path.getsize(stl_path)
+
+            tracemalloc.start()
+            try:
+                stream_stl(stl_path, memory_limit=256 * 1024)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            assert file_size > 4 * 1000 * 1000
+            assert peak < 1024 * 1024
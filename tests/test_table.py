@@ -0,0 +1,285 @@
+# tests/test_table.py
+import hashlib
+import math
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pytest
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.models import ComponentMetadata, GeometricSignature
+from cadRedundancyAnalyzer.core.similarity import SimilarityDetector
+from cadRedundancyAnalyzer.core.table import ComponentTable
+from tests.helpers import random_signatures, with_random_descriptors
+
+
+def make_component(i: int):
+    """A (path, metadata, signature) triple as the STL handler would produce it"""
+    path = f"/library/project_{i % 7}/assembly/part_{i:06d}.stl"
+    volume = 10.0 + i
+    metadata = ComponentMetadata(file_path=path, file_name=f"part_{i:06d}.stl",
+                                 project_id=f"project_{i % 7}", volume=volume)
+    signature = GeometricSignature(
+        bounding_box=(0.5 * i, -1.0, 0.0, 0.5 * i + 2.0, 1.5, 3.25),
+        volume=volume,
+        surface_area=20.0 + i,
+        geometric_hash=hashlib.md5(path.encode()).hexdigest()
+    )
+    return path, metadata, signature
+
+
+class TestComponentTable:
+
+    def test_rows_round_trip(self):
+        """Test that metadata and signatures read back equal to what was added"""
+        table = ComponentTable()
+        components = [make_component(i) for i in range(3000)]
+        odd = ComponentMetadata(file_path="relative/odd.stl", file_name="renamed.stl", project_id="Unknown",
+                                part_number="PN-7", material="Steel", weight=1.5, volume=None)
+        odd_signature = GeometricSignature((0, 0, 0, 1, 1, 0), float('nan'), 0.0, "hash_not_md5")
+        components.append(("relative/odd.stl", odd, odd_signature))
+
+        for path, metadata, signature in components:
+            table.add(path, metadata, signature)
+
+        assert len(table) == len(components)
+        for row, (path, metadata, signature) in enumerate(components[:-1]):
+            assert table.row_of(path) == row
+            assert table.metadata(row) == metadata
+            assert table.signature(row) == signature
+
+        assert table.metadata(len(components) - 1) == odd
+        read_back = table.signature(len(components) - 1)
+        assert read_back.geometric_hash == "hash_not_md5"
+        assert math.isnan(read_back.volume)
+        assert read_back.bounding_box == (0, 0, 0, 1, 1, 0)
+
+    def test_views_behave_like_list_and_dict(self):
+        """Test the list-like and dict-like views against plain containers"""
+        table = ComponentTable()
+        components = [make_component(i) for i in range(10)]
+        for path, metadata, signature in components:
+            table.add(path, metadata, signature)
+
+        assert table.components() == [metadata for _, metadata, _ in components]
+        assert table.components()[-1].file_name == "part_000009.stl"
+        assert table.signatures() == {path: signature for path, _, signature in components}
+        assert "/library/missing.stl" not in table.signatures()
+
+    def test_views_accept_append_and_assignment(self):
+        """Test that the views take appends, assignments and deletions like the old list and dict"""
+        table = ComponentTable()
+        components = [make_component(i) for i in range(4)]
+        path, metadata, signature = components[0]
+
+        # Metadata waits for its signature, as a row needs both
+        table.components().append(metadata)
+        assert len(table) == 0
+        table.signatures()[path] = signature
+        assert table.components() == [metadata]
+        assert table.signatures()[path] == signature
+
+        # A signature alone gets metadata of its file name
+        other_path, _, other_signature = components[1]
+        table.signatures()[other_path] = other_signature
+        assert table.components()[1] == ComponentMetadata(other_path, "part_000001.stl", "Unknown")
+
+        renamed = ComponentMetadata(path, metadata.file_name, "renamed", material="Steel")
+        table.components().extend([renamed])
+        table.signatures().update({path: components[2][2]})
+        assert table.components()[0] == renamed
+        assert table.signatures()[path] == components[2][2]
+        assert len(table) == 2
+
+        del table.signatures()[other_path]
+        assert other_path not in table
+        with pytest.raises(KeyError):
+            del table.signatures()[other_path]
+
+    def test_add_replaces_and_remove_keeps_rows(self):
+        """Test that an existing path is replaced in place and removal leaves other rows where they are"""
+        table = ComponentTable()
+        components = [make_component(i) for i in range(5000)]
+        for path, metadata, signature in components:
+            table.add(path, metadata, signature)
+
+        path, metadata, _ = components[10]
+        changed = GeometricSignature((0, 0, 0, 9, 9, 9), 729.0, 486.0, hashlib.md5(b"changed").hexdigest())
+        assert table.add(path, metadata, changed) == 10
+        assert len(table) == 5000
+        assert table.signature(10) == changed
+
+        assert table.remove(components[3][0]) is None
+        assert len(table) == 4999
+        assert components[3][0] not in table
+        assert table.row_of(components[4][0]) == 4
+        assert table.rows()[:5].tolist() == [0, 1, 2, 4, 5]
+        assert table.paths()[3] == components[4][0]
+        assert table.components()[3] == components[4][1]
+        assert table.add(*components[3]) == 5000
+
+    def test_removing_many_rows_compacts(self):
+        """Test that the table renumbers its rows once a quarter of them are removed"""
+        table = ComponentTable()
+        components = [make_component(i) for i in range(4000)]
+        for path, metadata, signature in components:
+            table.add(path, metadata, signature)
+
+        renumberings = [table.remove(path) for path, _, _ in components[::3]]
+        renumbered = next(mapping for mapping in renumberings if mapping is not None)
+        kept = [component for i, component in enumerate(components) if i % 3]
+
+        assert renumbered[0] == -1 and renumbered[1] == 0
+        assert len(table) == len(kept) and table.end < len(components)
+        assert table.components() == [metadata for _, metadata, _ in kept]
+        assert all(table.path(table.row_of(path)) == path for path, _, _ in kept)
+        assert all(path not in table for path, _, _ in components[::3])
+
+    def test_signature_store_shares_columns_and_matches(self):
+        """Test that the similarity columns come from the table and group like the signature list"""
+        signatures = random_signatures(300, seed=4)
+        table = ComponentTable()
+        for name, signature in signatures:
+            table.add(name, ComponentMetadata(name, name, "Project", volume=signature.volume), signature)
+
+        store = table.signature_store()
+        assert store.volume.dtype == np.float64 and np.array_equal(store.volume, table.volume, equal_nan=True)
+        assert np.shares_memory(store.hash_codes, table.hashes)
+
+        detector = SimilarityDetector()
+        for threshold in (0.8, 0.95):
+            assert detector.find_duplicates_in_store(table.paths(), store, threshold) == \
+                detector.find_duplicates(signatures, threshold)
+
+    def test_descriptors_round_trip_and_group_like_signatures(self):
+        """Test that shape descriptors of any length survive rows moving and reach the store"""
+        signatures = with_random_descriptors(random_signatures(300, seed=5), seed=5)
+        table = ComponentTable()
+        for name, signature in signatures:
+            table.add(name, ComponentMetadata(name, name, "Project", volume=signature.volume), signature)
+
+        table.remove(signatures[0][0])
+        signatures = signatures[1:]
+        assert [table.signature(row).descriptor for row in table.rows()] == \
+            [signature.descriptor for _, signature in signatures]
+
+        detector = SimilarityDetector(use_descriptors=True)
+        assert detector.find_duplicates_in_store(table.paths(), table.signature_store(), 0.9) == \
+            detector.find_duplicates(signatures, 0.9)
+
+    def test_saved_index_round_trips(self):
+        """Test that a saved index loads back with the same rows, extras, descriptors and lookups"""
+        components = [make_component(i) for i in range(2000)]
+        odd = ComponentMetadata(file_path="relative/odd.stl", file_name="renamed.stl", project_id=None,
+                                part_number="PN-7", weight=1.5, volume=None)
+        components.append(("relative/odd.stl", odd,
+                           GeometricSignature((0, 0, 0, 1, 1, 0), float('nan'), 0.0, "hash_not_md5")))
+        described = with_random_descriptors(random_signatures(50, seed=6), seed=6)
+        components += [(f"/described/{name}", ComponentMetadata(f"/described/{name}", name, "D"), signature)
+                       for name, signature in described]
+
+        table = ComponentTable()
+        for path, metadata, signature in components:
+            table.add(path, metadata, signature)
+
+        with tempfile.TemporaryDirectory() as directory:
+            table.save(directory)
+            for mmap in (True, False):
+                loaded = ComponentTable.load(directory, mmap=mmap)
+                assert len(loaded) == len(components)
+                assert loaded.components() == table.components()
+                assert all(loaded.row_of(path) == row for row, (path, _, _) in enumerate(components))
+                # Row 2000 has a NaN volume, which never compares equal
+                assert all(loaded.signature(row) == table.signature(row)
+                           for row in range(len(components)) if row != 2000)
+                assert math.isnan(loaded.signature(2000).volume)
+                assert loaded.signature(2000).geometric_hash == "hash_not_md5"
+
+            # Changes to a mapped table stay in memory
+            loaded = ComponentTable.load(directory)
+            loaded.remove(components[0][0])
+            loaded.add(*make_component(5000))
+            assert loaded.compact()[1] == 0
+            assert loaded.row_of(components[1][0]) == 0
+            assert loaded.metadata(loaded.row_of(make_component(5000)[0])) == make_component(5000)[1]
+            assert ComponentTable.load(directory).components() == table.components()
+
+            # Removed rows are dropped on save
+            table.remove(components[5][0])
+            table.save(directory)
+            loaded = ComponentTable.load(directory)
+            assert loaded.end == len(components) - 1
+            assert components[5][0] not in loaded
+            assert loaded.row_of(components[6][0]) == 5
+
+    def test_saved_index_rejects_other_formats(self):
+        """Test that empty directories and other versions are refused"""
+        with tempfile.TemporaryDirectory() as directory:
+            with pytest.raises(ValueError):
+                ComponentTable.load(directory)
+
+            ComponentTable().save(directory)
+            assert len(ComponentTable.load(directory)) == 0
+
+            header_path = os.path.join(directory, "header.json")
+            with open(header_path) as f:
+                header = json.load(f)
+            header["version"] += 1
+            with open(header_path, "w") as f:
+                json.dump(header, f)
+            with pytest.raises(ValueError, match="version"):
+                ComponentTable.load(directory)
+
+    def test_trim_keeps_rows_and_accepts_more(self):
+        """Test that trimming drops spare room only, and the table grows again afterwards"""
+        table = ComponentTable()
+        components = [make_component(i) for i in range(1500)]
+        for path, metadata, signature in components[:1000]:
+            table.add(path, metadata, signature)
+        table.remove(components[0][0])
+
+        table.trim()
+        assert table.nbytes < 100 * len(table)
+        for path, metadata, signature in components[1000:]:
+            table.add(path, metadata, signature)
+
+        assert table.components() == [metadata for _, metadata, _ in components[1:]]
+        assert all(table.row_of(path) is not None for path, _, _ in components[1:])
+
+    def test_memory_per_component_is_compact(self):
+        """Test that a trimmed table needs a tenth of the memory of dataclass lists"""
+        components = [make_component(i) for i in range(20000)]
+
+        tracemalloc.start()
+        try:
+            # Each component with its own strings, as the handler and crawler create them
+            metadata_list = []
+            signature_dict = {}
+            for path, metadata, signature in components:
+                path = path.encode().decode()
+                metadata_list.append(ComponentMetadata(path, path[path.rfind('/') + 1:], path.split('/')[2],
+                                                       volume=metadata.volume + 0.0))
+                signature_dict[path] = GeometricSignature(tuple(value + 0.0 for value in signature.bounding_box),
+                                                          signature.volume + 0.0, signature.surface_area + 0.0,
+                                                          signature.geometric_hash.encode().decode())
+            dataclass_bytes = tracemalloc.get_traced_memory()[0]
+            del metadata_list, signature_dict
+
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            table = ComponentTable()
+            for path, metadata, signature in components:
+                table.add(path, metadata, signature)
+            table.trim()
+            table_bytes = tracemalloc.get_traced_memory()[0] - start
+        finally:
+            tracemalloc.stop()
+
+        assert table_bytes * 10 < dataclass_bytes
+        assert table.components() == [metadata for _, metadata, _ in components]
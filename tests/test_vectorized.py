@@ -0,0 +1,81 @@
+# tests/test_vectorized.py
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cadRedundancyAnalyzer.core.models import GeometricSignature
+from cadRedundancyAnalyzer.core.similarity import SimilarityDetector
+from cadRedundancyAnalyzer.core.vectorized import BatchScorer, SignatureStore, ratio_similarity
+from tests.helpers import random_signatures
+
+
+class TestSignatureStore:
+
+    def test_store_columns_from_signatures(self):
+        """Test that the store holds float64 volume, area and dimension columns"""
+        store = SignatureStore.from_signatures([
+            GeometricSignature((0, 0, 0, 10, 5, 2), 100.0, 220.0, "abc"),
+            GeometricSignature((1, 1, 1, 2, 3, 4), 2.0, 22.0, "abc"),
+        ])
+
+        assert len(store) == 2
+        assert store.volume.dtype == np.float64
+        assert store.dims.shape == (2, 3)
+        assert store.dims[1].tolist() == [1.0, 2.0, 3.0]
+        assert store.hash_codes[0] == store.hash_codes[1]
+
+
+class TestBatchScorer:
+
+    def test_ratio_similarity_zero_cases(self):
+        """Test the zero-value rules of the scalar property similarity"""
+        values1 = np.array([0.0, 0.0, 5.0, 4.0])
+        values2 = np.array([0.0, 3.0, 0.0, 2.0])
+
+        assert ratio_similarity(values1, values2).tolist() == [1.0, 0.0, 0.0, 0.5]
+
+    def test_one_vs_many_matches_scalar_scores_exactly(self):
+        """Test that batched scores are bit-identical to calculate_similarity"""
+        detector = SimilarityDetector()
+        signatures = [sig for _, sig in random_signatures(120, seed=5)]
+        store = SignatureStore.from_signatures(signatures)
+        scorer = BatchScorer()
+
+        for row in range(0, len(signatures), 7):
+            scores = scorer.score_one_vs_many(store, row)
+            expected = [detector.calculate_similarity(signatures[row], sig) for sig in signatures]
+            assert np.array_equal(scores, np.array(expected), equal_nan=True)
+
+    def test_cascade_matches_thresholded_scores(self):
+        """Test that the staged match returns exactly the rows scoring above the threshold"""
+        signatures = [sig for _, sig in random_signatures(150, seed=9)]
+        store = SignatureStore.from_signatures(signatures)
+        scorer = BatchScorer()
+        rows = np.arange(len(signatures))
+        rejections = {}
+
+        for row in range(0, len(signatures), 5):
+            scores = scorer.score_one_vs_many(store, row, rows)
+            for threshold in (0.5, 0.9, 0.99):
+                matched = scorer.match_one_vs_many(store, row, rows, threshold, rejections=rejections)
+                assert matched.tolist() == rows[scores >= threshold].tolist()
+
+        assert rejections["volume"] > 0
+
+    def test_block_matches_one_vs_many(self):
+        """Test that a many-vs-many block equals stacked one-vs-many rows"""
+        signatures = [sig for _, sig in random_signatures(60, seed=6)]
+        store = SignatureStore.from_signatures(signatures)
+        scorer = BatchScorer()
+        rows1 = np.arange(0, 20)
+        rows2 = np.arange(10, 60)
+
+        block = scorer.score_block(store, rows1, rows2)
+
+        assert block.shape == (20, 50)
+        for k, row in enumerate(rows1):
+            assert np.array_equal(block[k], scorer.score_one_vs_many(store, row, rows2), equal_nan=True)